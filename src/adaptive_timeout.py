@@ -0,0 +1,72 @@
+"""Per-file timeouts derived from media duration and measured decode speed."""
+
+from typing import Any, Dict, Optional
+
+
+class AdaptiveTimeout:
+    """Tracks decode speed during a run and turns it into per-file timeouts."""
+
+    def __init__(self, factor: float = 3.0, floor: float = 30, ceiling: float = 3600):
+        self.factor = factor
+        self.floor = floor
+        self.ceiling = ceiling
+        self.media_seconds = 0.0
+        self.wall_seconds = 0.0
+
+    def record(self, details: Dict[str, Any]) -> None:
+        """
+        Fold a completed (not timed out) verification into the speed estimate.
+
+        A file decoded in concurrent segments counts an average segment, since
+        the estimate is per ffmpeg process.
+        """
+        if details.get('timed_out') or not details.get('media_seconds') or not details.get('elapsed'):
+            return
+        self.media_seconds += details['media_seconds'] / details.get('segments', 1)
+        self.wall_seconds += details['elapsed']
+
+    def decode_speed(self) -> Optional[float]:
+        """Seconds of media verified per wall-clock second, if measured yet."""
+        if self.wall_seconds <= 0:
+            return None
+        return self.media_seconds / self.wall_seconds
+
+    def policy(self) -> Dict[str, Any]:
+        """Settings handed to workers so they can size their own timeout."""
+        return {
+            'decode_speed': self.decode_speed(),
+            'factor': self.factor,
+            'floor': self.floor,
+            'ceiling': self.ceiling
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Summarise the estimate for the final report."""
+        speed = self.decode_speed()
+        return {
+            'decode_speed': f"{speed:.1f}x realtime" if speed else 'not measured',
+            'safety_factor': self.factor,
+            'floor_seconds': self.floor,
+            'ceiling_seconds': self.ceiling
+        }
+
+    @staticmethod
+    def compute(
+        media_seconds: Optional[float],
+        decode_speed: Optional[float],
+        factor: float,
+        floor: float,
+        ceiling: float,
+        fallback: Optional[float] = None
+    ) -> float:
+        """
+        Compute a timeout as expected decode time times a safety factor, clamped to floor and ceiling.
+
+        Until a speed estimate and the duration are known (before the first
+        files finish, or for files ffprobe cannot read), the fixed fallback
+        timeout (the -t value) is used, or the ceiling without one.
+        """
+        if not media_seconds or not decode_speed:
+            return min(max(fallback, floor), ceiling) if fallback else ceiling
+        expected = media_seconds / decode_speed
+        return min(max(expected * factor, floor), ceiling)
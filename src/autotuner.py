@@ -0,0 +1,160 @@
+"""Throughput autotuning of concurrency and ffmpeg decoder threads."""
+
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# (concurrent verifications, ffmpeg -threads)
+Config = Tuple[int, int]
+
+
+class Autotuner:
+    """
+    Hill-climbs the worker count and ffmpeg thread count during a run.
+
+    Throughput is measured over windows of at least window_seconds and
+    min_window_files completions. A window only starts once every file
+    dispatched under the previous configuration has finished, so each
+    measurement reflects a single configuration. From the best configuration
+    so far, neighbours (more/fewer workers, more/fewer threads) are tried one
+    at a time; a neighbour that beats it by min_gain becomes the new base.
+    When no neighbour improves, the tuner settles on the base.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        threads: int,
+        max_workers: int,
+        max_threads: int,
+        window_seconds: float = 30.0,
+        min_window_files: int = 4,
+        min_gain: float = 0.05
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_threads = max(1, max_threads)
+        self.workers = min(max(1, workers), self.max_workers)
+        self.threads = min(max(1, threads), self.max_threads)
+        self.window_seconds = window_seconds
+        self.min_window_files = min_window_files
+        self.min_gain = min_gain
+
+        self.base: Config = (self.workers, self.threads)
+        self.base_score: Optional[float] = None
+        self.candidates: List[Config] = []
+        self.converged = False
+        self.curve: List[Dict[str, Any]] = []
+
+        self.generation = 0
+        self.in_flight: Counter = Counter()
+        self._reset_window()
+
+    def job_started(self) -> int:
+        """Note a dispatched file; returns the tag to pass back to record()."""
+        self.in_flight[self.generation] += 1
+        return self.generation
+
+    def options(self) -> Dict[str, Any]:
+        """Per-file verification options for the current configuration."""
+        return {'threads': self.threads}
+
+    def record(self, generation: int, file_size: int, details: Dict[str, Any]) -> None:
+        """Fold a completed file into the current window, moving on when it is full."""
+        self.in_flight[generation] -= 1
+        if generation != self.generation:
+            self._maybe_start_window()
+            return
+
+        self._maybe_start_window()
+        if self.window_start is None:
+            return
+        self.window_files += 1
+        self.window_bytes += file_size
+        self.window_media_seconds += details.get('media_seconds') or 0.0
+
+        elapsed = time.monotonic() - self.window_start
+        if elapsed >= self.window_seconds and self.window_files >= self.min_window_files:
+            self._finish_window(elapsed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Summarise the search for the final report."""
+        workers, threads = self.base
+        return {
+            'best_jobs': workers,
+            'best_threads': threads,
+            'best_throughput': f"{self.base_score / 1e6:.2f} MB/s" if self.base_score else 'not measured',
+            'converged': self.converged,
+            'pin_with': f"-j {workers} --threads {threads}",
+            'throughput_curve': self.curve
+        }
+
+    def _finish_window(self, elapsed: float) -> None:
+        """Score the window and pick the next configuration to try."""
+        score = self.window_bytes / elapsed
+        self.curve.append({
+            'jobs': self.workers,
+            'threads': self.threads,
+            'files': self.window_files,
+            'mb_per_second': round(score / 1e6, 2),
+            'media_seconds_per_second': round(self.window_media_seconds / elapsed, 1)
+        })
+
+        current = (self.workers, self.threads)
+        if self.base_score is None:
+            self.base_score = score
+            self.candidates = self._neighbours(current, None)
+        elif current != self.base and score > self.base_score * (1 + self.min_gain):
+            move = (current[0] - self.base[0], current[1] - self.base[1])
+            self.base, self.base_score = current, score
+            self.candidates = self._neighbours(current, move)
+        elif current == self.base:
+            self.base_score = score  # Re-measured after converging
+
+        if self.candidates:
+            self._apply(self.candidates.pop(0))
+        else:
+            self.converged = True
+            self._apply(self.base)
+
+    def _neighbours(self, config: Config, move: Optional[Tuple[int, int]]) -> List[Config]:
+        """Adjacent configurations, continuing the last successful move first."""
+        workers, threads = config
+        options = [
+            (max(workers + 1, int(workers * 1.5)), threads),
+            (max(1, min(workers - 1, int(workers / 1.5))), threads),
+            (workers, threads * 2),
+            (workers, max(1, threads // 2)),
+        ]
+        neighbours = []
+        for w, t in options:
+            candidate = (min(w, self.max_workers), min(t, self.max_threads))
+            if candidate != config and candidate not in neighbours:
+                neighbours.append(candidate)
+
+        if move:
+            # Keep going in a direction that paid off
+            neighbours.sort(key=lambda c: (c[0] - workers) * move[0] + (c[1] - threads) * move[1] <= 0)
+        return neighbours
+
+    def _apply(self, config: Config) -> None:
+        """Switch configuration and wait for older files to drain before measuring."""
+        if config != (self.workers, self.threads):
+            self.workers, self.threads = config
+            self.generation += 1
+        self._reset_window()
+        self._maybe_start_window()
+
+    def _reset_window(self) -> None:
+        """Clear the measurement window."""
+        self.window_start: Optional[float] = None
+        self.window_files = 0
+        self.window_bytes = 0
+        self.window_media_seconds = 0.0
+
+    def _maybe_start_window(self) -> None:
+        """Start measuring once only current-configuration files are running."""
+        if self.window_start is not None:
+            return
+        if all(count == 0 for generation, count in self.in_flight.items() if generation != self.generation):
+            self.window_start = time.monotonic()
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Decode benchmark over a generated MP4 corpus.
+
+Builds a synthetic corpus with ffmpeg's lavfi sources plus damaged copies,
+verifies it in each mode and worker count through VerificationRunner, and
+writes throughput and detection accuracy as JSON for comparison across commits.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import statistics
+import struct
+import subprocess
+import sys
+import time
+from datetime import datetime
+from multiprocessing import cpu_count
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from video_verifier import VideoVerifier, VERIFICATION_MODES
+from file_scanner import FileScanner
+from signal_handlers import InterruptHandler
+from verification_runner import VerificationRunner
+from result_store import VerificationResults
+
+
+# (name, video encoder, frame size, duration in seconds); the long clip is the one that
+# sampled mode actually samples rather than decoding whole
+CORPUS_SPECS = (
+    ('h264_360p_10s', 'libx264', '640x360', 10),
+    ('h264_720p_30s', 'libx264', '1280x720', 30),
+    ('h264_1080p_60s', 'libx264', '1920x1080', 60),
+    ('hevc_720p_30s', 'libx265', '1280x720', 30),
+    ('mpeg4_480p_20s', 'mpeg4', '854x480', 20),
+    ('h264_360p_300s', 'libx264', '640x360', 300),
+)
+
+# Sampling settings for sampled mode, also used to count the media it covers
+SAMPLES = 5
+SAMPLE_DURATION = 10.0
+
+# Damage applied to a copy of every clean file
+DAMAGE_KINDS = ('truncated', 'zeroed', 'no_moov', 'bitflip')
+
+MANIFEST_NAME = 'corpus.json'
+
+# Share of the file kept by 'truncated', share of mdat cleared by 'zeroed', bytes hit by 'bitflip'
+TRUNCATE_FRACTION = 0.6
+ZERO_FRACTION = 0.05
+BITFLIP_COUNT = 64
+
+CorpusFile = Dict[str, Any]
+
+
+class CorpusBuilder:
+    """Generates the clean and damaged benchmark files and their manifest."""
+
+    @staticmethod
+    def build(corpus_dir: Path, seed: int = 0, regenerate: bool = False) -> List[CorpusFile]:
+        """
+        Return the corpus manifest, generating missing files.
+
+        An existing manifest with the same specs and seed is reused, so repeated
+        runs (e.g. on different commits) measure identical files.
+        """
+        manifest_file = corpus_dir / MANIFEST_NAME
+        settings = {'specs': [list(spec) for spec in CORPUS_SPECS], 'damage': list(DAMAGE_KINDS), 'seed': seed}
+        if manifest_file.exists() and not regenerate:
+            with open(manifest_file, 'r') as f:
+                manifest = json.load(f)
+            if manifest['settings'] == settings and all(Path(entry['path']).exists() for entry in manifest['files']):
+                return manifest['files']
+
+        corpus_dir.mkdir(parents=True, exist_ok=True)
+        encoders = CorpusBuilder._available_encoders()
+        rng = random.Random(seed)
+        files: List[CorpusFile] = []
+        for name, encoder, frame_size, duration in CORPUS_SPECS:
+            if encoder not in encoders:
+                print(f"Skipping {name}: ffmpeg has no {encoder} encoder")
+                continue
+            clean_path = corpus_dir / f"{name}.mp4"
+            print(f"Generating {clean_path.name}...")
+            CorpusBuilder._generate(clean_path, encoder, frame_size, duration)
+            entry = {'name': name, 'codec': encoder, 'duration': duration, 'damage': None}
+            files.append({**entry, 'path': str(clean_path), 'size': clean_path.stat().st_size, 'expected_valid': True})
+
+            data = clean_path.read_bytes()
+            for damage in DAMAGE_KINDS:
+                damaged_path = corpus_dir / f"{name}.{damage}.mp4"
+                damaged_path.write_bytes(CorpusBuilder.damage(data, damage, rng))
+                files.append({**entry, 'damage': damage, 'path': str(damaged_path),
+                              'size': damaged_path.stat().st_size, 'expected_valid': False})
+
+        with open(manifest_file, 'w') as f:
+            json.dump({'settings': settings, 'files': files}, f, indent=2)
+        return files
+
+    @staticmethod
+    def damage(data: bytes, kind: str, rng: random.Random) -> bytes:
+        """Return a damaged copy of an MP4 file's bytes."""
+        damaged = bytearray(data)
+        _, mdat_start, mdat_end = CorpusBuilder._box_range(data, b'mdat')
+        if kind == 'truncated':
+            return bytes(damaged[:int(len(damaged) * TRUNCATE_FRACTION)])
+        if kind == 'zeroed':
+            length = max(1, int((mdat_end - mdat_start) * ZERO_FRACTION))
+            start = (mdat_start + mdat_end - length) // 2
+            damaged[start:start + length] = bytes(length)
+        elif kind == 'no_moov':
+            moov_box, moov_start, moov_end = CorpusBuilder._box_range(data, b'moov')
+            damaged[moov_start:moov_end] = bytes(moov_end - moov_start)
+            damaged[moov_box + 4:moov_box + 8] = b'free'  # Keep the file walkable, just without a moov
+        elif kind == 'bitflip':
+            for offset in rng.sample(range(mdat_start, mdat_end), min(BITFLIP_COUNT, mdat_end - mdat_start)):
+                damaged[offset] ^= 1 << rng.randrange(8)
+        else:
+            raise ValueError(f"unknown damage kind '{kind}'")
+        return bytes(damaged)
+
+    @staticmethod
+    def _box_range(data: bytes, box_type: bytes) -> Tuple[int, int, int]:
+        """(box start, payload start, end) of the first top-level box of a type."""
+        offset = 0
+        while offset + 8 <= len(data):
+            size, found_type = struct.unpack_from('>I4s', data, offset)
+            header = 8
+            if size == 1:
+                size = struct.unpack_from('>Q', data, offset + 8)[0]
+                header = 16
+            elif size == 0:
+                size = len(data) - offset
+            if found_type == box_type:
+                return offset, offset + header, min(offset + size, len(data))
+            offset += max(size, header)
+        raise ValueError(f"no '{box_type.decode()}' box")
+
+    @staticmethod
+    def _generate(output: Path, encoder: str, frame_size: str, duration: int) -> None:
+        """Encode test pattern video with a sine tone audio track."""
+        subprocess.run([
+            'ffmpeg', '-v', 'error', '-y',
+            '-f', 'lavfi', '-i', f'testsrc2=size={frame_size}:rate=30:duration={duration}',
+            '-f', 'lavfi', '-i', f'sine=frequency=440:sample_rate=48000:duration={duration}',
+            '-c:v', encoder, '-pix_fmt', 'yuv420p', '-c:a', 'aac', '-shortest', str(output)
+        ], check=True, capture_output=True)
+
+    @staticmethod
+    def _available_encoders() -> str:
+        """Output of `ffmpeg -encoders`, for checking which encoders exist."""
+        return subprocess.run(['ffmpeg', '-hide_banner', '-encoders'], capture_output=True, text=True).stdout
+
+
+class Benchmark:
+    """Verifies a corpus per mode and worker count, measuring speed and accuracy."""
+
+    @staticmethod
+    def run(
+        corpus: List[CorpusFile],
+        modes: List[str],
+        jobs: List[int],
+        repeat: int = 1,
+        timeout: int = 300
+    ) -> List[Dict[str, Any]]:
+        """One measurement per (mode, jobs) pair; wall time is the median of repeat runs."""
+        measurements = []
+        for mode in modes:
+            for num_workers in jobs:
+                print(f"Benchmarking mode={mode} jobs={num_workers}...")
+                timings = []
+                for attempt in range(repeat):
+                    elapsed, results = Benchmark._verify(corpus, mode, num_workers, timeout)
+                    timings.append(elapsed)
+                    if attempt < repeat - 1:
+                        results.close()
+                measurements.append(Benchmark._measure(corpus, results, mode, num_workers, statistics.median(timings)))
+                results.close()
+        return measurements
+
+    @staticmethod
+    def _verify(
+        corpus: List[CorpusFile],
+        mode: str,
+        num_workers: int,
+        timeout: int
+    ) -> Tuple[float, VerificationResults]:
+        """Verify every corpus file once, returning (wall seconds, results)."""
+        video_files = FileScanner.describe_files(Path(entry['path']) for entry in corpus)
+        options = {'timeout': timeout, 'mode': mode, 'samples': SAMPLES, 'sample_duration': SAMPLE_DURATION}
+        start = time.monotonic()
+        with contextlib.redirect_stdout(io.StringIO()):  # Progress display
+            results = VerificationRunner.run_parallel_verification(
+                video_files, num_workers, None, InterruptHandler(), verify_options=options
+            )
+        return time.monotonic() - start, results
+
+    @staticmethod
+    def _measure(
+        corpus: List[CorpusFile],
+        results: VerificationResults,
+        mode: str,
+        num_workers: int,
+        elapsed: float
+    ) -> Dict[str, Any]:
+        """
+        Throughput and detection figures for one configuration.
+
+        Media seconds count only the span each mode processes: none for the
+        container check, the windows in sampled mode.
+        """
+        detected = {damage: 0 for damage in DAMAGE_KINDS}
+        damaged = {damage: 0 for damage in DAMAGE_KINDS}
+        false_positives = []
+        for entry in corpus:
+            is_valid = results[Path(entry['path'])][0]
+            if entry['expected_valid']:
+                if not is_valid:
+                    false_positives.append(entry['name'])
+            else:
+                damaged[entry['damage']] += 1
+                detected[entry['damage']] += not is_valid
+
+        clean_files = len(corpus) - sum(damaged.values())
+        total_bytes = sum(entry['size'] for entry in corpus)
+        media_seconds = sum(
+            VideoVerifier._media_seconds(mode, entry['duration'], SAMPLES, SAMPLE_DURATION) for entry in corpus
+        )
+        return {
+            'mode': mode,
+            'jobs': num_workers,
+            'files': len(corpus),
+            'seconds': round(elapsed, 3),
+            'files_per_second': round(len(corpus) / elapsed, 2),
+            'mb_per_second': round(total_bytes / elapsed / 1e6, 2),
+            'media_seconds_per_second': round(media_seconds / elapsed, 1),
+            'detection_rate': round(sum(detected.values()) / max(1, sum(damaged.values())), 3),
+            'false_positive_rate': round(len(false_positives) / max(1, clean_files), 3),
+            'detected_by_damage': {damage: f"{detected[damage]}/{damaged[damage]}" for damage in DAMAGE_KINDS},
+            'false_positives': false_positives
+        }
+
+    @staticmethod
+    def check_clean_files(measurements: List[Dict[str, Any]]) -> bool:
+        """Warn about clean files reported as corrupted; True when there were none."""
+        sane = True
+        for run in measurements:
+            if run['false_positives']:
+                sane = False
+                print(f"Warning: mode={run['mode']} jobs={run['jobs']} failed clean file(s): "
+                      f"{', '.join(run['false_positives'])}")
+        if not sane:
+            print("Clean corpus files should always pass; these results are not a valid baseline")
+        return sane
+
+    @staticmethod
+    def environment() -> Dict[str, Any]:
+        """What the numbers depend on besides the code: commit, ffmpeg build, machine."""
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=Path(__file__).parent)
+        return {
+            'generated': datetime.now().isoformat(),
+            'commit': commit.stdout.strip() or None,
+            'ffmpeg': VideoVerifier.get_ffmpeg_version(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': cpu_count()
+        }
+
+    @staticmethod
+    def print_summary(measurements: List[Dict[str, Any]], baseline: Optional[Dict[str, Any]] = None) -> None:
+        """Print one line per configuration, with the change against a baseline run if given."""
+        previous = {(run['mode'], run['jobs']): run for run in baseline['runs']} if baseline else {}
+        print(f"\n{'MODE':<10} {'JOBS':>4} {'FILES/S':>8} {'MB/S':>8} {'MEDIA S/S':>10} {'DETECTED':>9} {'FALSE +':>8}")
+        for run in measurements:
+            line = (f"{run['mode']:<10} {run['jobs']:>4} {run['files_per_second']:>8.2f} {run['mb_per_second']:>8.2f} "
+                    f"{run['media_seconds_per_second']:>10.1f} {run['detection_rate']:>9.1%} "
+                    f"{run['false_positive_rate']:>8.1%}")
+            old = previous.get((run['mode'], run['jobs']))
+            if old:
+                change = run['mb_per_second'] / old['mb_per_second'] - 1 if old['mb_per_second'] else 0.0
+                line += f"  ({change:+.1%} MB/s vs {baseline['environment']['commit'] or 'baseline'})"
+            print(line)
+
+
+def parse_arguments():
+    """Parse benchmark arguments."""
+    parser = argparse.ArgumentParser(description='Benchmark verification speed and accuracy on a generated corpus')
+    parser.add_argument('corpus', help='Directory for the generated corpus (reused when present)')
+    parser.add_argument('-o', '--output', default='benchmark.json', help='JSON results file (default: benchmark.json)')
+    parser.add_argument('--modes', default=','.join(VERIFICATION_MODES),
+                        help=f'Comma-separated verification modes (default: {",".join(VERIFICATION_MODES)})')
+    parser.add_argument('--jobs', default=f'1,{cpu_count()}',
+                        help=f'Comma-separated worker counts (default: 1,{cpu_count()})')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per configuration; median is kept (default: 1)')
+    parser.add_argument('-t', '--timeout', type=int, default=300,
+                        help='Per-file verification timeout in seconds (default: 300)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for damage placement (default: 0)')
+    parser.add_argument('--regenerate', action='store_true', help='Rebuild the corpus even if present')
+    parser.add_argument('--compare', default=None, help='Earlier benchmark JSON to compare against')
+    args = parser.parse_args()
+
+    modes = [mode for mode in args.modes.split(',') if mode]
+    unknown = [mode for mode in modes if mode not in VERIFICATION_MODES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+    try:
+        args.jobs = [int(count) for count in args.jobs.split(',') if count]
+    except ValueError:
+        parser.error(f"--jobs expects comma-separated integers, got '{args.jobs}'")
+    args.modes = modes
+    return args
+
+
+def main():
+    """Build or reuse the corpus, benchmark it and save the results."""
+    args = parse_arguments()
+    if not VideoVerifier.check_ffmpeg_available():
+        print("Error: ffmpeg is not installed or not in PATH")
+        return 1
+
+    corpus = CorpusBuilder.build(Path(args.corpus), args.seed, args.regenerate)
+    if not corpus:
+        print("Error: no corpus files could be generated")
+        return 1
+    print(f"Corpus: {len(corpus)} file(s), {sum(entry['size'] for entry in corpus) / 1e6:.1f} MB")
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+
+    measurements = Benchmark.run(corpus, args.modes, args.jobs, args.repeat, args.timeout)
+    report = {
+        'environment': Benchmark.environment(),
+        'corpus': [{key: entry[key] for key in ('name', 'codec', 'damage', 'size', 'duration')} for entry in corpus],
+        'runs': measurements
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    Benchmark.print_summary(measurements, baseline)
+    print(f"\nResults saved to: {args.output}")
+    return 0 if Benchmark.check_clean_files(measurements) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,47 +1,177 @@
 """Checkpoint save and load functionality."""
 
 import json
+import os
 from pathlib import Path
-from typing import Dict, Tuple, Optional
+from typing import Iterator, Tuple
 
-
-VerificationResults = Dict[Path, Tuple[bool, Optional[str], int]]
+from json_stream import JsonStream
+from result_store import ResultStore, VerificationResult, VerificationResults
 
 
 class CheckpointManager:
     """Manages checkpoint persistence for verification state."""
 
+    @staticmethod
+    def journal_path(checkpoint_file: Path) -> Path:
+        """Return the write-ahead journal that accompanies a checkpoint snapshot."""
+        return checkpoint_file.with_name(checkpoint_file.name + '.journal')
+
     @staticmethod
     def save_checkpoint(checkpoint_file: Path, results: VerificationResults) -> None:
-        """Save current results to checkpoint file."""
+        """Atomically save results as a snapshot and clear the journal."""
         checkpoint_data = {
-            str(path): (is_valid, error_msg, file_size)
-            for path, (is_valid, error_msg, file_size) in results.items()
+            str(path): (is_valid, error_msg, file_size, details)
+            for path, (is_valid, error_msg, file_size, details) in results.items()
         }
-        with open(checkpoint_file, 'w') as f:
+        tmp_file = checkpoint_file.with_name(checkpoint_file.name + '.tmp')
+        with open(tmp_file, 'w') as f:
             json.dump(checkpoint_data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, checkpoint_file)
+
+        # Snapshot now contains everything the journal held
+        with open(CheckpointManager.journal_path(checkpoint_file), 'w'):
+            pass
 
     @staticmethod
     def load_checkpoint(checkpoint_file: Path) -> VerificationResults:
-        """Load results from checkpoint file."""
-        if not checkpoint_file.exists():
-            return {}
+        """Load results from checkpoint snapshot, then replay the journal tail."""
+        return ResultStore.from_items(CheckpointManager.iter_checkpoint(checkpoint_file))
+
+    @staticmethod
+    def iter_checkpoint(checkpoint_file: Path) -> Iterator[Tuple[Path, VerificationResult]]:
+        """
+        Stream snapshot entries, then journal entries, without loading the file whole.
+
+        A path may appear more than once; later entries supersede earlier ones.
+        """
+        for path, result in CheckpointManager.iter_checkpoint_entries(checkpoint_file):
+            yield Path(path), result
+
+    @staticmethod
+    def iter_checkpoint_entries(checkpoint_file: Path) -> Iterator[Tuple[str, VerificationResult]]:
+        """Like iter_checkpoint, with paths left as stored strings."""
+        if checkpoint_file.exists():
+            with open(checkpoint_file, 'r') as f:
+                for path, data in JsonStream.iter_items(f):
+                    yield path, CheckpointManager._parse_entry(data)
+
+        for path, data in CheckpointManager._iter_journal(CheckpointManager.journal_path(checkpoint_file)):
+            yield path, CheckpointManager._parse_entry(data)
+
+    @staticmethod
+    def _parse_entry(data: list) -> VerificationResult:
+        """Parse a stored entry, handling old formats (2-tuple, 3-tuple) and new format (4-tuple)."""
+        details = {}
+        if len(data) == 2:
+            # Old format: (is_valid, error_msg)
+            is_valid, error_msg = data
+            file_size = 0  # Default size for old checkpoints
+        elif len(data) == 3:
+            # Old format: (is_valid, error_msg, file_size)
+            is_valid, error_msg, file_size = data
+        else:
+            # New format: (is_valid, error_msg, file_size, details)
+            is_valid, error_msg, file_size, details = data
+
+        return (is_valid, error_msg, file_size, details)
+
+    @staticmethod
+    def _iter_journal(journal_file: Path) -> Iterator[Tuple[str, list]]:
+        """Yield journal records, skipping a torn final line left by a crash."""
+        if not journal_file.exists():
+            return
+
+        with open(journal_file, 'r') as f:
+            for line in f:
+                try:
+                    path, *data = json.loads(line)
+                except (ValueError, TypeError):
+                    continue
+                yield path, data
+
+
+class CheckpointJournal:
+    """
+    Append-only checkpoint writer.
+
+    Each completed file is one JSON line in the journal, fsynced in batches.
+    When the journal outgrows the snapshot it is compacted into a new snapshot
+    (written to a temp file and atomically renamed), so the cost per file stays
+    O(1) and a SIGKILL at any point leaves a loadable checkpoint.
+    """
+
+    def __init__(
+        self,
+        checkpoint_file: Path,
+        resume: bool = False,
+        fsync_every: int = 10,
+        min_compact_records: int = 1000
+    ):
+        self.checkpoint_file = checkpoint_file
+        self.fsync_every = fsync_every
+        self.min_compact_records = min_compact_records
+        self.journal_file = CheckpointManager.journal_path(checkpoint_file)
+
+        self.snapshot_records = 0
+        self.journal_records = 0
+        if resume:
+            loaded = CheckpointManager.load_checkpoint(checkpoint_file)
+            self.snapshot_records = len(loaded)
+            loaded.close()
+            self.journal_records = CheckpointJournal._reopen_journal(self.journal_file)
+        else:
+            CheckpointManager.save_checkpoint(checkpoint_file, {})
+        self.unsynced = 0
+        self._journal = open(self.journal_file, 'a')
+
+    @staticmethod
+    def _reopen_journal(journal_file: Path) -> int:
+        """Count a resumed journal's records, ending a torn last line so new records start cleanly."""
+        if not journal_file.exists():
+            return 0
+        with open(journal_file, 'rb+') as f:
+            if f.seek(0, 2):
+                f.seek(-1, 2)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+        return sum(1 for _ in CheckpointManager._iter_journal(journal_file))
 
-        with open(checkpoint_file, 'r') as f:
-            checkpoint_data = json.load(f)
+    def append(self, video_path: Path, result: VerificationResult) -> None:
+        """Record one completed file."""
+        is_valid, error_msg, file_size, details = result
+        self._journal.write(json.dumps([str(video_path), is_valid, error_msg, file_size, details]) + '\n')
+        self._journal.flush()
+        self.journal_records += 1
+        self.unsynced += 1
 
-        # Handle both old format (2-tuple) and new format (3-tuple)
-        result = {}
-        for path, data in checkpoint_data.items():
-            if len(data) == 2:
-                # Old format: (is_valid, error_msg)
-                is_valid, error_msg = data
-                file_size = 0  # Default size for old checkpoints
-            else:
-                # New format: (is_valid, error_msg, file_size)
-                is_valid, error_msg, file_size = data
+        if self.unsynced >= self.fsync_every:
+            self.sync()
+        if self.journal_records >= max(self.min_compact_records, self.snapshot_records):
+            self.compact()
 
-            result[Path(path)] = (is_valid, error_msg, file_size)
+    def sync(self) -> None:
+        """Force journal records to disk."""
+        if self._journal.closed:
+            return
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self.unsynced = 0
 
-        return result
+    def compact(self) -> None:
+        """Fold the journal into a fresh snapshot."""
+        self.sync()
+        results = CheckpointManager.load_checkpoint(self.checkpoint_file)
+        self._journal.close()
+        CheckpointManager.save_checkpoint(self.checkpoint_file, results)
+        self.snapshot_records = len(results)
+        results.close()
+        self.journal_records = 0
+        self._journal = open(self.journal_file, 'a')
 
+    def close(self) -> None:
+        """Sync outstanding records and stop writing."""
+        self.sync()
+        self._journal.close()
@@ -4,6 +4,12 @@ import argparse
 from pathlib import Path
 from multiprocessing import cpu_count
 
+from video_verifier import VERIFICATION_MODES
+from job_scheduler import SCHEDULING_POLICIES
+from ffmpeg_process import DEFAULT_FATAL_PATTERNS
+from verification_engines import ENGINES
+from error_taxonomy import ErrorTaxonomy
+
 
 class CLI:
     """Command-line interface handler."""
@@ -24,10 +30,126 @@ class CLI:
                            help='Resume from checkpoint file')
         parser.add_argument('-t', '--timeout', type=int, default=300,
                            help='Verification timeout in seconds (default: 300)')
+        parser.add_argument('--adaptive-timeout', action='store_true',
+                           help='Derive per-file timeouts from duration and measured decode speed')
+        parser.add_argument('--timeout-factor', type=float, default=3.0,
+                           help='Adaptive timeout safety factor over expected time (default: 3.0)')
+        parser.add_argument('--timeout-floor', type=float, default=30,
+                           help='Minimum adaptive timeout in seconds (default: 30)')
+        parser.add_argument('--timeout-ceiling', type=float, default=3600,
+                           help='Maximum adaptive timeout in seconds (default: 3600)')
+        parser.add_argument('--retry-timeouts', type=CLI._parse_timeouts, default=None, metavar='SECONDS[,SECONDS...]',
+                           help='Queue timed-out files again in the same run, with each of these timeouts '
+                                'in turn; each must be longer than -t, or than --timeout-ceiling with '
+                                '--adaptive-timeout (e.g. 900,2700)')
+        parser.add_argument('--retry-transient', action='store_true',
+                           help='With --retry-timeouts, also retry files that failed with I/O errors')
+        parser.add_argument('--retry-jobs', type=int, default=None,
+                           help='Maximum retries verifying at once (default: a quarter of -j)')
+        parser.add_argument('--fatal-pattern', action='append', default=[],
+                           help='Extra stderr regex that aborts ffmpeg immediately (repeatable)')
+        parser.add_argument('--no-early-abort', action='store_true',
+                           help='Always decode to the end, even after fatal errors')
+        parser.add_argument('--mode', choices=VERIFICATION_MODES, default='full',
+                           help='Verification tier: container, demux, sampled or full (default: full)')
+        parser.add_argument('--samples', type=int, default=5,
+                           help='Number of decoded windows in sampled mode (default: 5)')
+        parser.add_argument('--sample-duration', type=float, default=10.0,
+                           help='Length of each sampled window in seconds (default: 10)')
+        parser.add_argument('--split-size', type=float, default=None, metavar='MB',
+                           help='In full mode, decode files of at least MB megabytes as concurrent time segments')
+        parser.add_argument('--segments', type=int, default=4,
+                           help='Maximum time segments per split file, each counting as one of -j jobs (default: 4)')
+        parser.add_argument('--scan-threads', type=int, default=8,
+                           help='Threads used to walk the directory tree (default: 8)')
+        parser.add_argument('--schedule', choices=SCHEDULING_POLICIES, default='sorted',
+                           help='Order in which files are dispatched to workers (default: sorted)')
+        parser.add_argument('--per-device-jobs', type=int, default=None,
+                           help='Maximum files verifying at once on each storage device (st_dev)')
+        parser.add_argument('--device-limit', action='append', default=[], type=CLI._parse_device_limit,
+                           metavar='PREFIX=N',
+                           help='Treat files under PREFIX as one device capped at N jobs (repeatable)')
+        parser.add_argument('--threads', type=int, default=None,
+                           help='ffmpeg decoder threads per verification (default: ffmpeg decides)')
+        parser.add_argument('--autotune', action='store_true',
+                           help='Tune parallel jobs and ffmpeg threads for throughput during the run, '
+                                'starting from -j/--threads')
+        parser.add_argument('--max-jobs', type=int, default=cpu_count() * 2,
+                           help=f'Upper bound on parallel jobs when autotuning (default: {cpu_count() * 2})')
+        parser.add_argument('--autotune-window', type=float, default=30.0,
+                           help='Seconds of throughput measured per autotune step (default: 30)')
+        parser.add_argument('--engine', choices=ENGINES, default='pool',
+                           help='Run ffmpeg from worker processes (pool) or from one asyncio '
+                                'event loop (asyncio) (default: pool)')
+        parser.add_argument('--shard', type=CLI._parse_shard, default=None, metavar='I/N',
+                           help='Verify only shard I of N (1-based), split by path hash '
+                                'across hosts sharing the library')
+        parser.add_argument('--merge', nargs='+', default=None, metavar='FILE',
+                           help='Merge checkpoints or JSON reports (latest result per file wins) into one report and exit')
+        parser.add_argument('--diff', nargs=2, default=None, metavar=('OLD', 'NEW'),
+                           help='Compare two runs (each a report or checkpoint, or a comma-separated list '
+                                'merged by timestamp) and exit')
         parser.add_argument('--reverify', help='Re-verify files from report.json', default=None)
+        parser.add_argument('--error-code', type=CLI._parse_error_codes, default=None, metavar='CODE[,CODE...]',
+                           help='With --reverify, only files with one of these error codes '
+                                f'({", ".join(ErrorTaxonomy.known_codes())})')
+        parser.add_argument('--cache', help='Persistent verification cache file (SQLite)', default=None)
+        parser.add_argument('--cache-hash', action='store_true',
+                           help='Include a partial content hash in cache keys')
+        parser.add_argument('--dedup', action='store_true',
+                           help='Verify only one copy of files with identical content')
+        parser.add_argument('--prune-cache', action='store_true',
+                           help='Remove cache entries for deleted or changed files and exit')
+        parser.add_argument('--watch', action='store_true',
+                           help='Keep running and verify new or rewritten MP4 files once they stop growing')
+        parser.add_argument('--settle', type=float, default=10.0,
+                           help='Seconds a watched file must stay unchanged before it is verified (default: 10)')
+        parser.add_argument('--poll-interval', type=float, default=5.0,
+                           help='Seconds between tree walks when inotify is unavailable (default: 5)')
+        parser.add_argument('--metrics', default=None, metavar='FILE',
+                           help='Export per-file timing and ffmpeg resource usage: a Prometheus textfile '
+                                'if FILE ends in .prom, JSON lines otherwise')
 
         return parser.parse_args()
 
+    @staticmethod
+    def _parse_shard(value: str):
+        """Parse an I/N shard specification."""
+        index, _, count = value.partition('/')
+        if not (index.isdigit() and count.isdigit() and 1 <= int(index) <= int(count)):
+            raise argparse.ArgumentTypeError(f"expected I/N with 1 <= I <= N, got '{value}'")
+        return (int(index), int(count))
+
+    @staticmethod
+    def _parse_timeouts(value: str):
+        """Parse a comma-separated list of increasing timeouts in seconds."""
+        try:
+            timeouts = [float(part) for part in value.split(',') if part.strip()]
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"expected seconds separated by commas, got '{value}'")
+        if not timeouts or timeouts[0] <= 0 or any(b <= a for a, b in zip(timeouts, timeouts[1:])):
+            raise argparse.ArgumentTypeError(f"expected increasing positive timeouts, got '{value}'")
+        return timeouts
+
+    @staticmethod
+    def _parse_error_codes(value: str):
+        """Parse a comma-separated list of error codes."""
+        codes = [code.strip() for code in value.split(',') if code.strip()]
+        unknown = [code for code in codes if code not in ErrorTaxonomy.known_codes()]
+        if not codes:
+            raise argparse.ArgumentTypeError("expected at least one error code")
+        if unknown:
+            raise argparse.ArgumentTypeError(f"unknown error code(s): {', '.join(unknown)}")
+        return codes
+
+    @staticmethod
+    def _parse_device_limit(value: str):
+        """Parse a PREFIX=N device limit."""
+        prefix, _, limit = value.rpartition('=')
+        if not prefix or not limit.isdigit() or int(limit) < 1:
+            raise argparse.ArgumentTypeError(f"expected PREFIX=N with N >= 1, got '{value}'")
+        return (str(Path(prefix).expanduser().absolute()), int(limit))
+
     @staticmethod
     def validate_directory(directory: str) -> Path:
         """Validate that directory exists and is a directory."""
@@ -49,8 +171,44 @@ class CLI:
             'output': Path(args.output) if args.output else None,
             'checkpoint': Path(args.checkpoint) if args.checkpoint else None,
             'reverify': Path(args.reverify) if args.reverify else None,
+            'error_codes': args.error_code,
+            'shard': args.shard,
+            'merge': [Path(merge_file) for merge_file in args.merge] if args.merge else None,
+            'diff': tuple(
+                [Path(part) for part in side.split(',') if part] for side in args.diff
+            ) if args.diff else None,
+            'cache': Path(args.cache) if args.cache else None,
+            'cache_hash': args.cache_hash,
+            'prune_cache': args.prune_cache,
+            'metrics': Path(args.metrics) if args.metrics else None,
+            'watch': args.watch,
+            'settle': args.settle,
+            'poll_interval': args.poll_interval,
+            'dedup': args.dedup,
             'jobs': args.jobs,
             'resume': args.resume,
-            'timeout': args.timeout
+            'timeout': args.timeout,
+            'adaptive_timeout': args.adaptive_timeout,
+            'retry_timeouts': args.retry_timeouts,
+            'retry_transient': args.retry_transient,
+            'retry_jobs': args.retry_jobs,
+            'timeout_factor': args.timeout_factor,
+            'timeout_floor': args.timeout_floor,
+            'timeout_ceiling': args.timeout_ceiling,
+            'mode': args.mode,
+            'samples': args.samples,
+            'sample_duration': args.sample_duration,
+            'split_size': int(args.split_size * 1e6) if args.split_size else None,
+            'segments': max(1, args.segments),
+            'schedule': args.schedule,
+            'engine': args.engine,
+            'threads': args.threads,
+            'per_device_jobs': args.per_device_jobs,
+            'device_limits': dict(args.device_limit),
+            'autotune': args.autotune,
+            'max_jobs': max(args.max_jobs, args.jobs),
+            'autotune_window': args.autotune_window,
+            'scan_threads': args.scan_threads,
+            'fatal_patterns': () if args.no_early_abort else DEFAULT_FATAL_PATTERNS + tuple(args.fatal_pattern)
         }
 
@@ -0,0 +1,136 @@
+"""Content fingerprinting to verify identical copies only once."""
+
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from checkpoint_manager import VerificationResults
+from file_scanner import ScannedFile
+
+
+# Bytes hashed from the head, middle and tail of a file for its fingerprint
+FINGERPRINT_BLOCK = 64 * 1024
+
+# Read size for full-content hashes
+FULL_HASH_CHUNK = 1024 * 1024
+
+
+class Deduplicator:
+    """
+    Detects files with identical content so only one copy is decoded.
+
+    Files are compared only against earlier files of the same size. A match
+    needs equal fingerprints (hashes of the head, middle and tail blocks) and
+    then an equal full-content hash, so cheap fingerprints never cause a false
+    duplicate. Hard links (same device and inode) are duplicates without
+    reading anything. The first file of each content group is its
+    representative; the others receive its result after verification.
+    """
+
+    def __init__(self):
+        self.by_size: Dict[int, List[ScannedFile]] = {}
+        self.by_inode: Dict[Tuple[int, int], Path] = {}
+        self.duplicates: Dict[Path, Path] = {}
+        self.duplicate_bytes = 0
+        self.hashed_files = 0
+        self.decode_seconds_saved = 0.0
+        self._fingerprints: Dict[Path, Optional[str]] = {}
+        self._full_hashes: Dict[Path, Optional[str]] = {}
+
+    def filter_duplicates(self, video_files: Iterable[ScannedFile]) -> Iterator[ScannedFile]:
+        """Yield files needing verification, recording duplicates of earlier files."""
+        for scanned in video_files:
+            representative = self._find_representative(scanned)
+            if representative is None:
+                yield scanned
+            else:
+                self.duplicates[scanned.path] = representative
+                self.duplicate_bytes += scanned.size
+
+    def propagate(self, results: VerificationResults) -> None:
+        """Copy each representative's result to its duplicates."""
+        for duplicate, representative in self.duplicates.items():
+            if representative not in results:
+                continue  # Representative was not verified (e.g. interrupted)
+            is_valid, error_msg, file_size, details = results[representative]
+            duplicate_details = {key: value for key, value in details.items() if key != 'elapsed'}
+            duplicate_details['duplicate_of'] = str(representative)
+            duplicate_details['decode_seconds_saved'] = details.get('elapsed', 0.0)
+            self.decode_seconds_saved += duplicate_details['decode_seconds_saved']
+            results[duplicate] = (is_valid, error_msg, file_size, duplicate_details)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Summarise deduplication for the final report."""
+        return {
+            'duplicate_groups': len(set(self.duplicates.values())),
+            'duplicate_files': len(self.duplicates),
+            'bytes_skipped': self.duplicate_bytes,
+            'fingerprinted_files': self.hashed_files,
+            'decode_seconds_saved': round(self.decode_seconds_saved, 1)
+        }
+
+    def _find_representative(self, scanned: ScannedFile) -> Optional[Path]:
+        """Return the earlier file with the same content, registering new content."""
+        if scanned.size == 0:
+            return None  # Missing or empty; nothing worth sharing
+
+        inode_key = (scanned.device, scanned.inode)
+        if inode_key in self.by_inode:
+            return self.by_inode[inode_key]
+
+        same_size = self.by_size.setdefault(scanned.size, [])
+        for candidate in same_size:
+            if self._same_content(candidate.path, scanned.path):
+                return candidate.path
+
+        same_size.append(scanned)
+        self.by_inode[inode_key] = scanned.path
+        return None
+
+    def _same_content(self, first: Path, second: Path) -> bool:
+        """Compare fingerprints, escalating to full hashes when they match."""
+        first_print = self._fingerprint(first)
+        if first_print is None or first_print != self._fingerprint(second):
+            return False
+        first_hash = self._full_hash(first)
+        return first_hash is not None and first_hash == self._full_hash(second)
+
+    def _fingerprint(self, video_path: Path) -> Optional[str]:
+        """Hash of the head, middle and tail blocks (cached per file)."""
+        if video_path not in self._fingerprints:
+            self._fingerprints[video_path] = Deduplicator.compute_fingerprint(video_path)
+            self.hashed_files += 1
+        return self._fingerprints[video_path]
+
+    def _full_hash(self, video_path: Path) -> Optional[str]:
+        """Hash of the whole file (cached per file)."""
+        if video_path not in self._full_hashes:
+            self._full_hashes[video_path] = Deduplicator.compute_full_hash(video_path)
+        return self._full_hashes[video_path]
+
+    @staticmethod
+    def compute_fingerprint(video_path: Path) -> Optional[str]:
+        """Size plus SHA-1 of three sampled blocks, or None if unreadable."""
+        hasher = hashlib.sha1()
+        try:
+            with open(video_path, 'rb') as f:
+                size = f.seek(0, 2)
+                hasher.update(str(size).encode())
+                for offset in (0, max(0, size // 2 - FINGERPRINT_BLOCK // 2), max(0, size - FINGERPRINT_BLOCK)):
+                    f.seek(offset)
+                    hasher.update(f.read(FINGERPRINT_BLOCK))
+        except OSError:
+            return None
+        return hasher.hexdigest()
+
+    @staticmethod
+    def compute_full_hash(video_path: Path) -> Optional[str]:
+        """SHA-1 of the entire file, or None if unreadable."""
+        hasher = hashlib.sha1()
+        try:
+            with open(video_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(FULL_HASH_CHUNK), b''):
+                    hasher.update(chunk)
+        except OSError:
+            return None
+        return hasher.hexdigest()
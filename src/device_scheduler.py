@@ -0,0 +1,154 @@
+"""Per-device job queues with separate concurrency caps."""
+
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from file_scanner import ScannedFile
+from job_scheduler import JobScheduler
+
+
+class DeviceQueue:
+    """Files waiting on one device, with its cap and throughput counters."""
+
+    def __init__(self, label: str, limit: int, policy: str):
+        self.label = label
+        self.limit = limit
+        self.queue = JobScheduler(policy)
+        self.running = 0
+        self.files = 0
+        self.bytes = 0
+        self.peak_queue = 0
+        self.first_dispatch: Optional[float] = None
+        self.last_completion: Optional[float] = None
+
+    def throughput(self) -> float:
+        """Bytes per second verified on this device so far."""
+        if self.first_dispatch is None or self.last_completion is None:
+            return 0.0
+        elapsed = self.last_completion - self.first_dispatch
+        return self.bytes / elapsed if elapsed > 0 else 0.0
+
+
+class DeviceScheduler:
+    """
+    Groups files by storage device and dispatches round-robin between them.
+
+    Files are grouped by st_dev, or by the longest matching prefix in
+    prefix_limits (useful for NFS shares or several mounts on one disk).
+    Each group has its own cap on files verifying at once, so a slow USB
+    disk is not thrashed by every worker while faster devices sit idle.
+    Within a device, files are ordered by the scheduling policy.
+    """
+
+    def __init__(
+        self,
+        policy: str = 'sorted',
+        default_limit: Optional[int] = None,
+        prefix_limits: Optional[Dict[str, int]] = None
+    ):
+        self.policy = policy
+        self.default_limit = default_limit
+        self.prefix_limits = prefix_limits or {}
+        self.devices: Dict[Any, DeviceQueue] = {}
+        self.order: List[Any] = []
+        self.next_index = 0
+        self.running: Dict[Path, Any] = {}
+        self.queued = 0
+
+    def add(self, scanned: ScannedFile, attempt: int = 1) -> None:
+        """Queue a file on its device."""
+        device = self._device_for(scanned)
+        device.queue.add(scanned, attempt)
+        device.peak_queue = max(device.peak_queue, len(device.queue))
+        self.queued += 1
+
+    def add_all(self, scanned_files) -> None:
+        """Queue several files."""
+        for scanned in scanned_files:
+            self.add(scanned)
+
+    def pop(self, allow_retries: bool = True) -> Optional[ScannedFile]:
+        """Take the next file from the next device below its cap, or None if all are busy."""
+        for offset in range(len(self.order)):
+            key = self.order[(self.next_index + offset) % len(self.order)]
+            device = self.devices[key]
+            if device.queue.has_ready(allow_retries) and (device.limit is None or device.running < device.limit):
+                self.next_index = (self.next_index + offset + 1) % len(self.order)
+                scanned = device.queue.pop()
+                device.running += 1
+                if device.first_dispatch is None:
+                    device.first_dispatch = time.monotonic()
+                self.running[scanned.path] = key
+                self.queued -= 1
+                return scanned
+        return None
+
+    def complete(self, video_path: Path, file_size: int) -> None:
+        """Release a finished file's device slot."""
+        key = self.running.pop(video_path, None)
+        if key is None:
+            return
+        device = self.devices[key]
+        device.running -= 1
+        device.files += 1
+        device.bytes += file_size
+        device.last_completion = time.monotonic()
+
+    def __len__(self) -> int:
+        return self.queued
+
+    def format_progress(self) -> str:
+        """One-line per-device summary: running/cap, queue depth and throughput."""
+        return "  ".join(
+            f"{device.label}: {device.running}/{device.limit or '-'} q{len(device.queue)} "
+            f"{device.throughput() / 1e6:.1f}MB/s"
+            for device in self.devices.values()
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-device totals for the final report."""
+        return {
+            'default_limit': self.default_limit or 'none',
+            'per_device': [
+                {
+                    'device': device.label,
+                    'limit': device.limit or 'none',
+                    'files': device.files,
+                    'mb_per_second': round(device.throughput() / 1e6, 2),
+                    'peak_queue': device.peak_queue
+                }
+                for device in self.devices.values()
+            ]
+        }
+
+    def _device_for(self, scanned: ScannedFile) -> DeviceQueue:
+        """Find or create the queue for a file's device."""
+        prefix = self._matching_prefix(scanned.path)
+        key = ('prefix', prefix) if prefix else ('dev', scanned.device)
+        if key not in self.devices:
+            if prefix:
+                label, limit = prefix, self.prefix_limits[prefix]
+            else:
+                label, limit = DeviceScheduler._mount_point(scanned.path), self.default_limit
+            self.devices[key] = DeviceQueue(label, limit, self.policy)
+            self.order.append(key)
+        return self.devices[key]
+
+    def _matching_prefix(self, video_path: Path) -> Optional[str]:
+        """Longest configured prefix containing the path (prefixes are absolute; paths may not be)."""
+        path = os.path.abspath(video_path)
+        matches = [
+            prefix for prefix in self.prefix_limits
+            if path == prefix or path.startswith(prefix.rstrip(os.sep) + os.sep)
+        ]
+        return max(matches, key=len) if matches else None
+
+    @staticmethod
+    def _mount_point(video_path: Path) -> str:
+        """Mount point holding a file, used to label its device."""
+        path = video_path.parent
+        while not os.path.ismount(path) and path != path.parent:
+            path = path.parent
+        return os.fspath(path)
@@ -0,0 +1,123 @@
+"""Classification of verification errors into structured records."""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Severity levels, most serious first
+SEVERITIES = ('fatal', 'error', 'warning')
+
+# (code, severity, pattern) tried in order against each error line; the first match wins
+ERROR_RULES = (
+    ('timeout', 'fatal', r'Verification timed out'),
+    ('missing_file', 'fatal', r'^File does not exist'),
+    ('ffmpeg_missing', 'fatal', r'ffmpeg not found'),
+    ('io_error', 'fatal', r'Input/output error|Stale file handle|Transport endpoint is not connected'),
+    ('moov_missing', 'fatal', r'moov atom not found'),
+    ('stderr_truncated', 'warning', r'^\[stderr truncated\]$'),  # FfmpegProcess's cap, not a damaged file
+    ('truncated', 'fatal', r'truncated|partial file'),
+    ('container_structure', 'fatal', r'^Container structure error'),
+    ('invalid_data', 'fatal', r'Invalid data found when processing input'),
+    ('duration_unknown', 'fatal', r'^Could not determine duration'),
+    ('invalid_nal', 'error', r'Invalid NAL unit|NAL unit type \d+|no frame!'),
+    ('missing_reference', 'error', r'[Mm]issing reference picture|reference picture missing|mmco: unref'),
+    ('macroblock_error', 'error', r'error while decoding MB|concealing \d+ DC|block unavailable'),
+    ('slice_error', 'error', r'slice header|decode_slice|[Ii]nvalid slice|corrupted slice'),
+    ('audio_decode', 'error', r'AAC frame|channel element|Input buffer exhausted|band type|Reserved bit set'),
+    ('corrupt_packet', 'error', r'[Cc]orrupt (?:decoded )?(?:frame|packet)|Packet corrupt'),
+    ('decode_error', 'error', r'Error while decoding stream|[Ee]rror decoding'),
+    ('non_monotonic_dts', 'warning', r'non monotonically increasing dts'),
+)
+
+# Code for lines no rule recognises
+UNKNOWN_CODE = ('other', 'error')
+
+_RULES = tuple((code, severity, re.compile(pattern)) for code, severity, pattern in ERROR_RULES)
+_WINDOW = re.compile(r'^\[(?:window|segment) @ (\d+(?:\.\d+)?)s\] ')
+# 'Stream #0:1' or 'stream 1', but not 'bytestream 6060' in decoder positions
+_STREAM = re.compile(r'\b[Ss]tream (?:#\d+:(\d+)|(\d+)\b)')
+_OFFSET = re.compile(r'offset (0x[0-9a-fA-F]+|\d+)')
+
+# Characters of the first matching line kept as a record's example message
+MESSAGE_LIMIT = 200
+
+ErrorRecord = Dict[str, Any]
+
+
+class ErrorTaxonomy:
+    """
+    Turns error text (ffmpeg stderr, pre-check and timeout messages) into records.
+
+    Each line is matched against ERROR_RULES. Lines with the same code and
+    stream collapse into one record that keeps the first line's position
+    (stream index, byte offset, sampled-window timestamp) and a count, so
+    consumers can select files by code without reading the raw text.
+    """
+
+    @staticmethod
+    def classify(error_msg: Optional[str]) -> List[ErrorRecord]:
+        """Structured records for an error message, most severe first."""
+        records: Dict[Tuple[str, Optional[int]], ErrorRecord] = {}
+        for line in (error_msg or '').splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            timestamp = None
+            window = _WINDOW.match(line) if line.startswith(('[window', '[segment')) else None
+            if window:
+                timestamp = float(window.group(1))
+                line = line[window.end():]
+
+            code, severity = ErrorTaxonomy.match_rule(line)
+            # Literal checks first: most lines name no stream, and regex search is the costly part
+            stream = _STREAM.search(line) if 'tream' in line else None
+            stream_index = int(stream.group(1) or stream.group(2)) if stream else None
+            key = (code, stream_index)
+            if key in records:
+                records[key]['count'] += 1
+                continue
+
+            offset = _OFFSET.search(line)
+            records[key] = {
+                'code': code,
+                'severity': severity,
+                'stream': stream_index,
+                'offset': int(offset.group(1), 0) if offset else None,
+                'timestamp': timestamp,
+                'count': 1,
+                'message': line[:MESSAGE_LIMIT]
+            }
+
+        return sorted(records.values(), key=lambda record: SEVERITIES.index(record['severity']))
+
+    @staticmethod
+    def records_for(error_msg: Optional[str], details: Dict[str, Any]) -> List[ErrorRecord]:
+        """A result's stored records, classifying its text if it predates them."""
+        if 'errors' in details:
+            return details['errors']
+        return ErrorTaxonomy.classify(error_msg)
+
+    @staticmethod
+    def known_codes() -> List[str]:
+        """Every code the rules can produce."""
+        return [code for code, _, _ in ERROR_RULES] + [UNKNOWN_CODE[0]]
+
+    @staticmethod
+    def match_rule(line: str) -> Tuple[str, str]:
+        """(code, severity) of the first rule matching a line."""
+        for code, severity, pattern in _RULES:
+            if pattern.search(line):
+                return code, severity
+        return UNKNOWN_CODE
+
+    @staticmethod
+    def codes(records: List[ErrorRecord]) -> List[str]:
+        """Distinct codes in a list of records."""
+        return list(dict.fromkeys(record['code'] for record in records))
+
+    @staticmethod
+    def worst_severity(records: List[ErrorRecord]) -> Optional[str]:
+        """Most serious severity among records, or None if there are none."""
+        if not records:
+            return None
+        return min((record['severity'] for record in records), key=SEVERITIES.index)
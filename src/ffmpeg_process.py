@@ -0,0 +1,243 @@
+"""Streaming ffmpeg execution with early abort on fatal errors."""
+
+import asyncio
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Pattern, Sequence
+
+
+# stderr lines that mean the rest of the decode cannot change the verdict
+DEFAULT_FATAL_PATTERNS = (
+    r'moov atom not found',
+    r'Invalid data found when processing input',
+    r'Invalid NAL unit size',
+    r'error reading header',
+    r'partial file',
+)
+
+# Cap on stderr kept in memory per process; the verdict only needs the first errors
+MAX_STDERR_CHARS = 64 * 1024
+
+# Line appended once the cap is reached (classified as the stderr_truncated warning)
+STDERR_TRUNCATED = "[stderr truncated]"
+
+# Start of the note added to stderr when ffmpeg was killed on a fatal line
+ABORT_NOTE = "Verification aborted early on fatal error"
+
+# Seconds between checks of a cancel event while ffmpeg runs
+CANCEL_POLL_INTERVAL = 0.2
+
+# asyncio stream buffer; readline() fails on longer lines
+STREAM_LINE_LIMIT = 1024 * 1024
+
+# ru_maxrss is in kilobytes on Linux and bytes on macOS
+RSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+class FfmpegCancelled(Exception):
+    """Raised when ffmpeg was killed because its cancel event was set."""
+
+
+class FfmpegProcess:
+    """Runs ffmpeg while reading stderr incrementally."""
+
+    @staticmethod
+    def run(
+        command: List[str],
+        timeout: float,
+        fatal_patterns: Optional[Sequence[str]] = None,
+        usage: Optional[Dict[str, Any]] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> subprocess.CompletedProcess:
+        """
+        Run ffmpeg, killing it as soon as a fatal error line appears.
+
+        Benign warnings (e.g. non-monotonic DTS) are collected but decoding
+        continues. Raises subprocess.TimeoutExpired if ffmpeg runs too long,
+        and FfmpegCancelled if cancel is set first (e.g. by a sibling segment).
+        The child's CPU time and peak memory are added to usage, if given
+        (cpu_user, cpu_system, max_rss), also when it timed out.
+
+        Returns:
+            CompletedProcess with the (possibly truncated) stderr text
+        """
+        collector = _StderrCollector(FfmpegProcess._fatal_regex(fatal_patterns))
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+        reader = threading.Thread(
+            target=FfmpegProcess._read_stderr,
+            args=(process, collector),
+            daemon=True
+        )
+        reader.start()
+        deadline = time.monotonic() + timeout
+        while reader.is_alive() and not (cancel is not None and cancel.is_set()):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            reader.join(min(remaining, CANCEL_POLL_INTERVAL) if cancel is not None else remaining)
+
+        if reader.is_alive():
+            process.kill()
+            reader.join()
+            FfmpegProcess._wait(process, usage)
+            if cancel is not None and cancel.is_set():
+                raise FfmpegCancelled(command)
+            raise subprocess.TimeoutExpired(command, timeout)
+
+        returncode = FfmpegProcess._wait(process, usage)
+        return subprocess.CompletedProcess(command, returncode, None, collector.text())
+
+    @staticmethod
+    async def run_async(
+        command: List[str],
+        timeout: float,
+        fatal_patterns: Optional[Sequence[str]] = None
+    ) -> subprocess.CompletedProcess:
+        """
+        Asyncio counterpart of run() for the in-process engine.
+
+        The child is killed on timeout and also when the awaiting task is
+        cancelled, so cancelling a verification never leaves ffmpeg running.
+        """
+        collector = _StderrCollector(FfmpegProcess._fatal_regex(fatal_patterns))
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            limit=STREAM_LINE_LIMIT
+        )
+        try:
+            await asyncio.wait_for(FfmpegProcess._read_stderr_async(process, collector), timeout)
+            returncode = await process.wait()
+        except asyncio.TimeoutError:
+            raise subprocess.TimeoutExpired(command, timeout)
+        finally:
+            await FfmpegProcess._reap(process)
+        return subprocess.CompletedProcess(command, returncode, None, collector.text())
+
+    @staticmethod
+    def aborted(result: subprocess.CompletedProcess) -> bool:
+        """Whether ffmpeg was killed on a fatal stderr line."""
+        return ABORT_NOTE in (result.stderr or '')
+
+    @staticmethod
+    async def communicate_async(command: List[str], timeout: float) -> subprocess.CompletedProcess:
+        """Run a short command (e.g. ffprobe) capturing text output, like subprocess.run."""
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            raise subprocess.TimeoutExpired(command, timeout)
+        finally:
+            await FfmpegProcess._reap(process)
+        return subprocess.CompletedProcess(
+            command, process.returncode,
+            stdout.decode('utf-8', errors='replace'), stderr.decode('utf-8', errors='replace')
+        )
+
+    @staticmethod
+    def _wait(process: subprocess.Popen, usage: Optional[Dict[str, Any]]) -> int:
+        """Reap the child with wait4, adding its resource usage to usage (left alone where wait4 is missing)."""
+        if not hasattr(os, 'wait4'):
+            return process.wait()
+        _, status, rusage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        if usage is not None:
+            usage['cpu_user'] = round(usage.get('cpu_user', 0.0) + rusage.ru_utime, 3)
+            usage['cpu_system'] = round(usage.get('cpu_system', 0.0) + rusage.ru_stime, 3)
+            usage['max_rss'] = max(usage.get('max_rss', 0), rusage.ru_maxrss * RSS_UNIT)
+        return process.returncode
+
+    @staticmethod
+    def _read_stderr(process: subprocess.Popen, collector: '_StderrCollector') -> None:
+        """Collect stderr lines, killing the process on the first fatal one."""
+        for raw_line in process.stderr:
+            if collector.feed(raw_line):
+                process.kill()
+        process.stderr.close()
+
+    @staticmethod
+    async def _read_stderr_async(process: asyncio.subprocess.Process, collector: '_StderrCollector') -> None:
+        """Collect stderr lines from an asyncio child, killing it on the first fatal one."""
+        while True:
+            raw_line = await process.stderr.readline()
+            if not raw_line:
+                return
+            if collector.feed(raw_line):
+                process.kill()
+
+    @staticmethod
+    async def _reap(process: asyncio.subprocess.Process) -> None:
+        """Kill an asyncio child that is still running and wait for it to exit."""
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+            await process.wait()
+
+    @staticmethod
+    def _fatal_regex(fatal_patterns: Optional[Sequence[str]]) -> Optional[Pattern]:
+        """Compile the fatal patterns, falling back to the defaults when None."""
+        return FfmpegProcess._compile(tuple(DEFAULT_FATAL_PATTERNS if fatal_patterns is None else fatal_patterns))
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _compile(patterns: tuple) -> Optional[Pattern]:
+        """Combine fatal patterns into one case-insensitive regex."""
+        if not patterns:
+            return None
+        return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), re.IGNORECASE)
+
+
+class _StderrCollector:
+    """Accumulates capped stderr text and spots the first fatal line."""
+
+    def __init__(self, fatal_re: Optional[Pattern]):
+        self.fatal_re = fatal_re
+        self.lines: List[str] = []
+        self.kept = 0
+        self.fatal: Optional[str] = None
+
+    def feed(self, raw_line: bytes) -> bool:
+        """Record a line; True when it is the first fatal one (the caller kills ffmpeg)."""
+        line = raw_line.decode('utf-8', errors='replace')
+        if self.kept < MAX_STDERR_CHARS:
+            if self.kept + len(line) <= MAX_STDERR_CHARS:
+                self.lines.append(line)
+                self.kept += len(line)
+            else:
+                # Whole lines only, so a cut-off line is not classified as an error of its own
+                if not self.lines:
+                    self.lines.append(line[:MAX_STDERR_CHARS] + "\n")
+                self.lines.append(f"{STDERR_TRUNCATED}\n")
+                self.kept = MAX_STDERR_CHARS
+
+        match = self.fatal_re.search(line) if self.fatal_re else None
+        if match and self.fatal is None:
+            self.fatal = match.group(0)
+            return True
+        return False
+
+    def text(self) -> str:
+        """Collected stderr, noting an early abort."""
+        stderr = "".join(self.lines)
+        if self.fatal is not None:
+            stderr += f"{ABORT_NOTE}: {self.fatal}\n"
+        return stderr
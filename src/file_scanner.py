@@ -1,7 +1,20 @@
 """File scanning utilities."""
 
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Iterable, Iterator, List, NamedTuple
+
+
+class ScannedFile(NamedTuple):
+    """A discovered video file with metadata from a single stat call."""
+    path: Path
+    size: int
+    mtime_ns: int
+    inode: int
+    device: int
 
 
 class FileScanner:
@@ -10,7 +23,41 @@ class FileScanner:
     @staticmethod
     def find_mp4_files(root_dir: Path) -> List[Path]:
         """Recursively find all MP4 files in the directory."""
-        return sorted(root_dir.rglob('*.mp4'))
+        return sorted(scanned.path for scanned in FileScanner.scan_mp4_files(root_dir))
+
+    @staticmethod
+    def scan_mp4_files(root_dir: Path, num_threads: int = 8) -> Iterator[ScannedFile]:
+        """
+        Stream MP4 files as they are discovered.
+
+        Directories are walked concurrently with os.scandir, and each file is
+        yielded as soon as it is found, so verification can start before the
+        walk of a large (or network-mounted) tree finishes. Order is not defined.
+        """
+        walker = _ParallelWalker(num_threads)
+        return walker.walk(root_dir)
+
+    @staticmethod
+    def describe(video_path: Path) -> ScannedFile:
+        """Build a scan record for a known path (e.g. from a report)."""
+        try:
+            st = video_path.stat()
+        except OSError:
+            return ScannedFile(video_path, 0, 0, 0, 0)
+        return ScannedFile(video_path, st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev)
+
+    @staticmethod
+    def describe_files(video_paths: Iterable[Path]) -> List[ScannedFile]:
+        """Build scan records for a list of known paths."""
+        return [FileScanner.describe(video_path) for video_path in video_paths]
+
+    @staticmethod
+    def relative_path(video_path: Path, root_dir: Path) -> Path:
+        """Path within the library, or the path itself if outside root_dir."""
+        try:
+            return video_path.relative_to(root_dir)
+        except ValueError:
+            return video_path
 
     @staticmethod
     def get_course_name(video_path: Path, root_dir: Path) -> str:
@@ -21,3 +68,57 @@ class FileScanner:
         except ValueError:
             return "Unknown"
 
+
+class _ParallelWalker:
+    """Walks a directory tree with a thread pool, one task per directory."""
+
+    def __init__(self, num_threads: int):
+        self.num_threads = num_threads
+        self.found: queue.Queue = queue.Queue()
+        self.pending_dirs = 0
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def walk(self, root_dir: Path) -> Iterator[ScannedFile]:
+        """Yield MP4 records until every directory has been scanned."""
+        with ThreadPoolExecutor(max_workers=self.num_threads) as executor:
+            self.executor = executor
+            self._schedule(root_dir)
+            while True:
+                scanned = self.found.get()
+                if scanned is None:
+                    return
+                yield scanned
+
+    def _schedule(self, directory: Path) -> None:
+        """Queue a directory for scanning."""
+        with self.lock:
+            self.pending_dirs += 1
+        self.executor.submit(self._scan_directory, directory)
+
+    def _scan_directory(self, directory: Path) -> None:
+        """Scan one directory, queueing subdirectories and reporting MP4 files."""
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    self._handle_entry(directory, entry)
+        except OSError:
+            pass  # Unreadable directory - skipped, like Path.rglob
+        finally:
+            with self.lock:
+                self.pending_dirs -= 1
+                if self.pending_dirs == 0:
+                    self.found.put(None)
+
+    def _handle_entry(self, directory: Path, entry: os.DirEntry) -> None:
+        """Recurse into directories, record MP4 files."""
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                self._schedule(directory / entry.name)
+            elif entry.name.endswith('.mp4') and entry.is_file():
+                st = entry.stat()
+                self.found.put(ScannedFile(
+                    directory / entry.name, st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev
+                ))
+        except OSError:
+            pass
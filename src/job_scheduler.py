@@ -0,0 +1,69 @@
+"""Job ordering policies for the verification pool."""
+
+import heapq
+import os
+from typing import Any, Iterable, List, Optional, Tuple
+
+from file_scanner import ScannedFile
+
+
+SCHEDULING_POLICIES = ('sorted', 'largest-first', 'locality')
+
+
+class JobScheduler:
+    """
+    Queue of files waiting for a worker, ordered by a scheduling policy.
+
+    Policies:
+        sorted: Path order, reproducible across runs
+        largest-first: Longest-processing-time-first by file size, so big files
+            don't start last and leave most workers idle at the end
+        locality: Group by device, directory and inode to reduce seek thrash
+
+    Files can be added while the queue is being drained (e.g. by a streaming
+    scan); ordering then applies among the files discovered so far. Retried
+    files (later attempts) queue behind every first attempt.
+    """
+
+    def __init__(self, policy: str = 'sorted'):
+        self.policy = policy
+        self._heap: List[Tuple[int, Any, int, ScannedFile]] = []
+        self._counter = 0
+
+    def add(self, scanned: ScannedFile, attempt: int = 1) -> None:
+        """Queue a file."""
+        heapq.heappush(self._heap, (attempt, JobScheduler._sort_key(scanned, self.policy), self._counter, scanned))
+        self._counter += 1
+
+    def add_all(self, scanned_files: Iterable[ScannedFile]) -> None:
+        """Queue several files."""
+        for scanned in scanned_files:
+            self.add(scanned)
+
+    def pop(self, allow_retries: bool = True) -> Optional[ScannedFile]:
+        """Take the next file to verify, or None if only retries are left and they are not allowed."""
+        if not self.has_ready(allow_retries):
+            return None
+        return heapq.heappop(self._heap)[3]
+
+    def has_ready(self, allow_retries: bool = True) -> bool:
+        """Whether pop() would return a file."""
+        return bool(self._heap) and (allow_retries or self._heap[0][0] == 1)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @staticmethod
+    def order(scanned_files: Iterable[ScannedFile], policy: str = 'sorted') -> List[ScannedFile]:
+        """Return files in the order the policy would dispatch them."""
+        return sorted(scanned_files, key=lambda scanned: JobScheduler._sort_key(scanned, policy))
+
+    @staticmethod
+    def _sort_key(scanned: ScannedFile, policy: str) -> tuple:
+        """Sort key for a file under the given policy."""
+        if policy == 'largest-first':
+            return (-scanned.size, scanned.path)
+        if policy == 'locality':
+            # Approximates on-disk placement
+            return (scanned.device, os.fspath(scanned.path.parent), scanned.inode)
+        return (scanned.path,)
@@ -2,11 +2,14 @@
 
 import json
 from pathlib import Path
-from typing import Dict, Tuple, Optional
+from typing import Any, Dict, Iterable, Iterator, List, TextIO, Tuple, Optional
 from datetime import datetime
 
-
-VerificationResults = Dict[Path, Tuple[bool, Optional[str], int]]
+from json_stream import JsonStream
+from report_stats import ResultsAggregator
+from error_taxonomy import ErrorTaxonomy
+from metrics import MetricsCollector
+from result_store import ResultStore, VerificationResult, VerificationResults
 
 
 class JsonReportGenerator:
@@ -16,48 +19,86 @@ class JsonReportGenerator:
     def generate_json_report(
         results: VerificationResults,
         root_dir: Path,
-        output_file: Path
+        output_file: Path,
+        run_stats: Optional[Dict[str, Any]] = None,
+        aggregator: Optional[ResultsAggregator] = None
     ) -> None:
         """Generate and save JSON report."""
-        report_data = JsonReportGenerator._build_json_data(results, root_dir)
-        JsonReportGenerator._save_json_report(output_file, report_data)
+        built = aggregator is None
+        aggregator = aggregator or ResultsAggregator.from_results(results, root_dir)
+        with open(output_file, 'w') as f:
+            JsonReportGenerator._write_json_report(f, aggregator, run_stats)
+        if built:
+            aggregator.close()
         print(f"JSON report saved to: {output_file}")
 
     @staticmethod
-    def _build_json_data(
-        results: VerificationResults,
-        root_dir: Path
-    ) -> Dict:
-        """Build JSON report data structure (only failed files)."""
-        files = []
-        total_size = 0
-        corrupted_count = 0
-        total_files = len(results)
-
-        for video_path, (is_valid, error_msg, file_size) in results.items():
-            total_size += file_size
-            if not is_valid:
-                corrupted_count += 1
-                files.append({
-                    'path': str(video_path),
-                    'relative_path': str(JsonReportGenerator._get_relative_path(video_path, root_dir)),
-                    'size': file_size,
-                    'is_valid': is_valid,
-                    'error': error_msg
-                })
+    def _write_json_report(
+        f: TextIO,
+        aggregator: ResultsAggregator,
+        run_stats: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Write the report incrementally (only failed files, plus duplicate groups).
 
+        Metadata comes first so readers can stream the file, and each file
+        entry is serialised on its own. The layout matches json.dump(indent=2).
+        """
+        stats = aggregator.get_stats()
+        metadata = {
+            'generated': datetime.now().isoformat(),
+            'root_directory': str(aggregator.root_dir),
+            'total_files': stats['total'],
+            'corrupted_files': stats['corrupted'],
+            'valid_files': stats['valid'],
+            'total_size': aggregator.total_size,
+            'run_stats': run_stats or {},
+            'duplicate_groups': len(aggregator.duplicate_groups),
+            'decode_seconds_saved': round(aggregator.decode_seconds_saved, 1),
+            'error_codes': {code: info['files'] for code, info in aggregator.get_error_codes().items()}
+        }
+        f.write('{\n')
+        JsonReportGenerator._write_member(f, 'metadata', metadata)
+        f.write(',\n')
+        JsonReportGenerator._write_array(f, 'files', (
+            JsonReportGenerator._file_entry(video_path, aggregator.failures[video_path], aggregator.root_dir)
+            for video_path in aggregator.failed_paths()
+        ))
+        f.write(',\n')
+        JsonReportGenerator._write_array(f, 'duplicate_groups', aggregator.get_duplicate_groups())
+        f.write('\n}')
+
+    @staticmethod
+    def _file_entry(video_path: Path, result: VerificationResult, root_dir: Path) -> Dict[str, Any]:
+        """JSON entry for one failed file."""
+        is_valid, error_msg, file_size, details = result
         return {
-            'metadata': {
-                'generated': datetime.now().isoformat(),
-                'root_directory': str(root_dir),
-                'total_files': total_files,
-                'corrupted_files': corrupted_count,
-                'valid_files': total_files - corrupted_count,
-                'total_size': total_size
-            },
-            'files': sorted(files, key=lambda x: x['path'])
+            'path': str(video_path),
+            'relative_path': str(JsonReportGenerator._get_relative_path(video_path, root_dir)),
+            'size': file_size,
+            'is_valid': is_valid,
+            'error': error_msg,
+            'mode': details.get('mode', 'full'),
+            'verified_at': details.get('verified_at'),
+            'errors': ErrorTaxonomy.records_for(error_msg, details),
+            'metrics': MetricsCollector.file_metrics(details)
         }
 
+    @staticmethod
+    def _write_member(f: TextIO, key: str, value: Any) -> None:
+        """Write one top-level member at indent level 1."""
+        f.write(f'  {json.dumps(key)}: ' + json.dumps(value, indent=2).replace('\n', '\n  '))
+
+    @staticmethod
+    def _write_array(f: TextIO, key: str, items: Iterable[Any]) -> None:
+        """Write a top-level array member one element at a time."""
+        f.write(f'  {json.dumps(key)}: [')
+        empty = True
+        for item in items:
+            f.write(('\n' if empty else ',\n') + '    ' + json.dumps(item, indent=2).replace('\n', '\n    '))
+            empty = False
+        f.write(']' if empty else '\n  ]')
+
     @staticmethod
     def _get_relative_path(video_path: Path, root_dir: Path) -> Path:
         """Get path relative to root, or return original if not possible."""
@@ -66,28 +107,76 @@ class JsonReportGenerator:
         except ValueError:
             return video_path
 
-    @staticmethod
-    def _save_json_report(output_file: Path, report_data: Dict) -> None:
-        """Save JSON report to file."""
-        with open(output_file, 'w') as f:
-            json.dump(report_data, f, indent=2)
-
     @staticmethod
     def load_files_from_json(json_file: Path) -> list[Path]:
         """Load file paths from JSON report."""
-        with open(json_file, 'r') as f:
-            data = json.load(f)
+        return [Path(file_info['path']) for file_info in JsonReportGenerator._iter_file_entries(json_file)]
 
-        return [Path(file_info['path']) for file_info in data['files']]
+    @staticmethod
+    def load_results_from_json(json_file: Path) -> VerificationResults:
+        """Load the failed files of a JSON report as verification results."""
+        return ResultStore.from_items(JsonReportGenerator.iter_results_from_json(json_file))
 
     @staticmethod
-    def load_corrupted_files_from_json(json_file: Path) -> list[Path]:
-        """Load only corrupted file paths from JSON report."""
+    def iter_results_from_json(json_file: Path) -> Iterator[Tuple[Path, VerificationResult]]:
+        """
+        Stream a report's file entries as verification results.
+
+        Entries from reports written before per-file timestamps were recorded
+        get the report's generation time as verified_at.
+        """
+        generated = None
         with open(json_file, 'r') as f:
-            data = json.load(f)
+            for key, value in JsonStream.iter_items(f, expand=('files',)):
+                if key == 'metadata':
+                    generated = JsonReportGenerator._parse_timestamp(value.get('generated'))
+                elif key == 'files':
+                    details = {
+                        'mode': value.get('mode', 'full'),
+                        'verified_at': value.get('verified_at') or generated
+                    }
+                    if 'errors' in value:
+                        details['errors'] = value['errors']
+                    details.update(value.get('metrics', {}))
+                    yield Path(value['path']), (value['is_valid'], value['error'], value.get('size', 0), details)
+
+    @staticmethod
+    def read_metadata(json_file: Path) -> Dict[str, Any]:
+        """A report's metadata object (written first, so the file entries are not read)."""
+        with open(json_file, 'r') as f:
+            for key, value in JsonStream.iter_items(f):
+                return value if key == 'metadata' else {}
+        return {}
+
+    @staticmethod
+    def load_corrupted_files_from_json(json_file: Path, error_codes: Optional[List[str]] = None) -> list[Path]:
+        """
+        Load only corrupted file paths from JSON report.
 
+        With error_codes, keep files having at least one of those codes; reports
+        written before error records existed are classified from their text.
+        """
         return [
             Path(file_info['path'])
-            for file_info in data['files']
-            if not file_info['is_valid']
+            for file_info in JsonReportGenerator._iter_file_entries(json_file)
+            if not file_info['is_valid'] and (
+                not error_codes
+                or set(error_codes) & set(ErrorTaxonomy.codes(ErrorTaxonomy.records_for(file_info['error'], file_info)))
+            )
         ]
+
+    @staticmethod
+    def _iter_file_entries(json_file: Path) -> Iterator[Dict[str, Any]]:
+        """Stream the entries of a report's files array."""
+        with open(json_file, 'r') as f:
+            for key, value in JsonStream.iter_items(f, expand=('files',)):
+                if key == 'files':
+                    yield value
+
+    @staticmethod
+    def _parse_timestamp(generated: Optional[str]) -> Optional[float]:
+        """Convert an ISO 'generated' time to a Unix timestamp."""
+        try:
+            return datetime.fromisoformat(generated).timestamp() if generated else None
+        except ValueError:
+            return None
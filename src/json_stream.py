@@ -0,0 +1,126 @@
+"""Incremental parsing of large JSON reports and checkpoints."""
+
+import json
+import re
+from typing import Any, Collection, Iterator, TextIO, Tuple
+
+
+# Characters read per refill; a single entry larger than this just grows the buffer
+CHUNK_SIZE = 1024 * 1024
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# A separator or closing bracket with the whitespace around it
+_SEPARATOR = re.compile(r'[ \t\n\r]*([,:}\]])[ \t\n\r]*')
+
+
+class JsonStream:
+    """
+    Walks the top-level object of a JSON file without loading it whole.
+
+    Each member value is decoded on its own with JSONDecoder.raw_decode, and
+    arrays under the keys in `expand` are yielded element by element, so
+    memory stays proportional to the largest single entry.
+    """
+
+    def __init__(self, f: TextIO, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    @staticmethod
+    def iter_items(f: TextIO, expand: Collection[str] = ()) -> Iterator[Tuple[str, Any]]:
+        """Yield (key, value) for each member of the top-level object."""
+        return JsonStream(f)._iter_object(expand)
+
+    def _iter_object(self, expand: Collection[str]) -> Iterator[Tuple[str, Any]]:
+        """Parse `{ "key": value, ... }`, expanding the selected arrays."""
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._decode()
+            self._separator(':')
+            if key in expand and self._peek() == '[':
+                for element in self._iter_array():
+                    yield key, element
+            else:
+                yield key, self._decode()
+
+            if self._separator(',}') == '}':
+                return
+
+    def _iter_array(self) -> Iterator[Any]:
+        """Parse `[ value, ... ]` one element at a time."""
+        self._expect('[')
+        if self._peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self._decode()
+            if self._separator(',]') == ']':
+                return
+
+    def _decode(self) -> Any:
+        """Decode the JSON value at the current position, reading more input as needed."""
+        if self.pos >= len(self.buffer) or self.buffer[self.pos] in ' \t\n\r':
+            self._peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self._fill()
+                continue
+            if end == len(self.buffer) and not self.eof:
+                self._fill()  # A number may continue in the next chunk
+                continue
+            self.pos = end
+            return value
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character without consuming it."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if self.eof:
+                raise ValueError("Unexpected end of JSON input")
+            self._fill()
+
+    def _next_char(self) -> str:
+        """Consume and return the next non-whitespace character."""
+        char = self._peek()
+        self.pos += 1
+        return char
+
+    def _separator(self, allowed: str) -> str:
+        """Consume one of the allowed separators and the whitespace after it."""
+        match = _SEPARATOR.match(self.buffer, self.pos)
+        if match and match.end() < len(self.buffer) and match.group(1) in allowed:
+            self.pos = match.end()
+            return match.group(1)
+
+        # Near the end of the buffer, or malformed input
+        char = self._next_char()
+        if char not in allowed:
+            raise ValueError(f"Expected one of '{allowed}' in JSON input, found '{char}'")
+        return char
+
+    def _expect(self, expected: str) -> None:
+        """Consume a structural character, failing on anything else."""
+        char = self._next_char()
+        if char != expected:
+            raise ValueError(f"Expected '{expected}' in JSON input, found '{char}'")
+
+    def _fill(self) -> None:
+        """Drop consumed input and append the next chunk."""
+        chunk = self.f.read(self.chunk_size)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        if not chunk:
+            self.eof = True
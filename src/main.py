@@ -3,16 +3,30 @@
 Main entry point for video integrity verification.
 """
 
+import os
 import sys
+from pathlib import Path
+from multiprocessing import cpu_count
 
 from cli import CLI
 from video_verifier import VideoVerifier
 from file_scanner import FileScanner
-from checkpoint_manager import CheckpointManager
+from checkpoint_manager import CheckpointManager, CheckpointJournal
 from report_generator import ReportGenerator
 from json_report_generator import JsonReportGenerator
 from signal_handlers import InterruptHandler
 from verification_runner import VerificationRunner
+from verification_cache import VerificationCache
+from adaptive_timeout import AdaptiveTimeout
+from autotuner import Autotuner
+from deduplicator import Deduplicator
+from sharding import ShardPlanner
+from result_merger import ResultMerger, OLD, NEW
+from report_stats import ResultsAggregator
+from metrics import MetricsCollector
+from watcher import DirectoryWatcher, RollingReport
+from retry_policy import RetryPolicy
+from result_store import ResultStore
 
 
 def main():
@@ -20,34 +34,200 @@ def main():
     args = CLI.parse_arguments()
     paths = CLI.prepare_paths(args)
 
+    if paths['merge']:
+        return merge_shards(paths)
+
+    if paths['diff']:
+        return diff_runs(paths)
+
     validate_prerequisites()
 
+    if paths['error_codes'] and not paths['reverify']:
+        print("Error: --error-code requires --reverify")
+        return 1
+
+    if paths['retry_transient'] and not paths['retry_timeouts']:
+        print("Error: --retry-transient requires --retry-timeouts")
+        return 1
+
+    ladder_error = retry_ladder_error(paths)
+    if ladder_error:
+        print(f"Error: --retry-timeouts: {ladder_error}")
+        return 1
+
+    if paths['prune_cache']:
+        return prune_cache(paths)
+
+    if paths['watch']:
+        return watch_directory(paths)
+
     if paths['reverify']:
-        video_files = load_files_from_json(paths['reverify'])
-        root_dir = determine_root_directory(video_files)
+        video_paths = load_files_from_json(paths['reverify'], paths['error_codes'])
+        root_dir = determine_root_directory(video_paths)
+        video_files = FileScanner.describe_files(video_paths)
     else:
         if not paths['directory']:
             print("Error: directory argument is required when not using --reverify")
             return 1
         root_dir = paths['directory']
-        video_files = scan_for_videos(root_dir)
+        video_files = scan_for_videos(root_dir, paths['scan_threads'])
+
+    run_stats = {}
+    if paths['shard']:
+        video_files = select_shard(video_files, root_dir, paths['shard'], run_stats)
+    if not paths['reverify']:
         video_files = filter_already_verified(video_files, paths)
 
-    if not video_files:
+    cache = open_cache(paths)
+    cached_results = ResultStore()
+    if cache:
+        video_files = apply_cache(video_files, cache, cached_results)
+
+    dedup = Deduplicator() if paths['dedup'] else None
+    if dedup:
+        video_files = apply_dedup(video_files, dedup)
+
+    # A streaming scan is only known to be empty once it has finished
+    nothing_pending = isinstance(video_files, list) and not video_files
+    if nothing_pending and not cached_results:
         print("No files to verify.")
+        cached_results.close()
         return 0
 
-    results = execute_verification(video_files, paths)
-    ReportGenerator.generate_report(results, root_dir, paths['output'])
+    aggregator = ResultsAggregator(root_dir)
+    metrics = MetricsCollector(root_dir, paths['metrics'])
+    try:
+        results = ResultStore() if nothing_pending else execute_verification(
+            video_files, paths, run_stats, aggregator, metrics, cache.add if cache else None
+        )
+    finally:
+        if cache:
+            cache.flush()  # Also when interrupted, so the next run skips what this one verified
+    metrics.close()
+    resources = metrics.get_stats()
+    if resources['files']:
+        run_stats['resources'] = resources
+    if paths['metrics']:
+        print(f"Metrics saved to: {paths['metrics']}")
+    if dedup:
+        dedup.propagate(results)
+        aggregator.add_all((duplicate, results[duplicate]) for duplicate in dedup.duplicates if duplicate in results)
+        run_stats['dedup'] = dedup.get_stats()
+        print(f"Dedup: {len(dedup.duplicates)} duplicate file(s) took the result of an identical copy")
+    if 'autotune' in run_stats:
+        print(f"Autotune: best configuration {run_stats['autotune']['pin_with']} "
+              f"({run_stats['autotune']['best_throughput']})")
+
+    if cache:
+        if dedup:
+            # Duplicates take their result after the run, so they were not cached as results arrived
+            cache.store_results({duplicate: results[duplicate] for duplicate in dedup.duplicates
+                                 if duplicate in results})
+        cache.close()
+        print(f"Cache: {len(cached_results)} unchanged file(s) skipped")
+        results.update(cached_results)
+        aggregator.add_all(cached_results.items())
+        run_stats['cache'] = cache.get_stats()
+    cached_results.close()
+
+    if not results:
+        print("No MP4 files found in the specified directory")
+        results.close()
+        aggregator.close()
+        return 0
 
-    return calculate_exit_code(results)
+    ReportGenerator.generate_report(results, root_dir, paths['output'], run_stats, aggregator)
+    results.close()
+    aggregator.close()
+
+    return calculate_exit_code(aggregator)
+
+
+def watch_directory(paths):
+    """Verify files as downloads finish, appending each result to a rolling report, until interrupted."""
+    if not paths['directory']:
+        print("Error: --watch requires a directory")
+        return 1
+    if paths['autotune'] or paths['reverify'] or paths['shard']:
+        print("Error: --watch cannot be combined with --autotune, --reverify or --shard")
+        return 1
+
+    root_dir = paths['directory']
+    watcher = DirectoryWatcher(root_dir, paths['settle'], paths['poll_interval'])
+    report = RollingReport(paths['output'])
+    print(f"Watching {root_dir} for finished MP4 downloads (settle time {paths['settle']:g}s)")
+    if paths['output']:
+        print(f"Appending results to: {paths['output']}")
+    print("Press Ctrl+C to stop.")
+
+    metrics = MetricsCollector(root_dir, paths['metrics']) if paths['metrics'] else None
+    try:
+        execute_verification(watcher.watch(), paths, {}, None, metrics, report.add).close()
+    finally:
+        report.close()
+        if metrics:
+            metrics.close()
+    return 1 if report.corrupted else 0
+
+
+def select_shard(video_files, root_dir, shard, run_stats):
+    """Keep this host's share of the library (the statistics need the complete scan)."""
+    video_files, run_stats['shard'] = ShardPlanner.select(video_files, root_dir, shard)
+    stats = run_stats['shard']
+    print(f"Shard {stats['shard']}: {stats['files']} of {stats['total_files']} file(s), "
+          f"{stats['bytes'] / 1e9:.1f} of {stats['total_bytes'] / 1e9:.1f} GB")
+    return video_files
 
 
-def load_files_from_json(json_file):
-    """Load file paths from JSON report."""
+def merge_shards(paths):
+    """Combine per-shard checkpoints or JSON reports into one report."""
+    print(f"Merging {len(paths['merge'])} result file(s)")
+    merger = ResultMerger()
+    for merge_file in paths['merge']:
+        merger.add_file(merge_file)
+    results = ResultStore.from_items(merger.iter_results())
+    unlisted_files, unlisted_bytes = merger.unlisted_valid[OLD]
+    merge_stats = {
+        'inputs': len(paths['merge']),
+        'complete': merger.complete[OLD],
+        'merged_files': len(results),
+        'unlisted_valid_files': unlisted_files
+    }
+    merger.close()
+    if not results and not unlisted_files:
+        print("No results found in the merged files")
+        results.close()
+        return 0
+
+    root_dir = paths['directory'] or Path(os.path.commonpath([str(path.parent) for path in results] or ['.']))
+    aggregator = ResultsAggregator.from_results(results, root_dir)
+    aggregator.add_unlisted_valid(unlisted_files, unlisted_bytes)
+    ReportGenerator.generate_report(results, root_dir, paths['output'], {'merge': merge_stats}, aggregator)
+    results.close()
+    aggregator.close()
+    return calculate_exit_code(aggregator)
+
+
+def diff_runs(paths):
+    """Compare two runs: newly corrupted, newly fixed, still failing, disappeared."""
+    old_files, new_files = paths['diff']
+    merger = ResultMerger()
+    for old_file in old_files:
+        merger.add_file(old_file, OLD)
+    for new_file in new_files:
+        merger.add_file(new_file, NEW)
+
+    counts = ReportGenerator.generate_diff(merger, paths['output'])
+    merger.close()
+    return 1 if counts['newly_corrupted'] else 0
+
+
+def load_files_from_json(json_file, error_codes=None):
+    """Load file paths from JSON report, optionally only those with given error codes."""
     print(f"Loading files from JSON report: {json_file}")
-    files = JsonReportGenerator.load_corrupted_files_from_json(json_file)
-    print(f"Loaded {len(files)} file(s) to re-verify")
+    files = JsonReportGenerator.load_corrupted_files_from_json(json_file, error_codes)
+    selection = f" with error code {', '.join(error_codes)}" if error_codes else ""
+    print(f"Loaded {len(files)} file(s){selection} to re-verify")
     return files
 
 
@@ -68,17 +248,51 @@ def validate_prerequisites():
         sys.exit(1)
 
 
-def scan_for_videos(directory):
-    """Scan directory for MP4 files."""
+def scan_for_videos(directory, num_threads):
+    """Start a streaming scan for MP4 files; verification begins as files are found."""
     print(f"Scanning for MP4 files in: {directory}")
-    video_files = FileScanner.find_mp4_files(directory)
+    return FileScanner.scan_mp4_files(directory, num_threads)
 
-    if not video_files:
-        print("No MP4 files found in the specified directory")
-        sys.exit(0)
 
-    print(f"Found {len(video_files)} MP4 file(s)")
-    return video_files
+def open_cache(paths):
+    """Open the persistent verification cache if configured."""
+    if not paths['cache']:
+        return None
+
+    return VerificationCache(
+        paths['cache'],
+        VideoVerifier.get_ffmpeg_version(),
+        VideoVerifier.describe_mode(
+            paths['mode'], paths['samples'], paths['sample_duration'], paths['fatal_patterns'],
+            split_size(paths), paths['segments']
+        ),
+        paths['cache_hash']
+    )
+
+
+def apply_cache(video_files, cache, cached_results):
+    """Skip files whose verification outcome is already cached."""
+    remaining = cache.filter_uncached(video_files, cached_results)
+    return list(remaining) if isinstance(video_files, list) else remaining
+
+
+def apply_dedup(video_files, dedup):
+    """Verify one copy of each distinct file content; duplicates are resolved afterwards."""
+    remaining = dedup.filter_duplicates(video_files)
+    return list(remaining) if isinstance(video_files, list) else remaining
+
+
+def prune_cache(paths):
+    """Evict cache entries for deleted or modified files."""
+    if not paths['cache']:
+        print("Error: --prune-cache requires --cache")
+        return 1
+
+    cache = open_cache(paths)
+    removed = cache.prune()
+    cache.close()
+    print(f"Pruned {removed} stale cache entr{'y' if removed == 1 else 'ies'} from {paths['cache']}")
+    return 0
 
 
 def filter_already_verified(video_files, paths):
@@ -89,36 +303,133 @@ def filter_already_verified(video_files, paths):
     results = CheckpointManager.load_checkpoint(paths['checkpoint'])
     if results:
         print(f"Resumed from checkpoint: {len(results)} files already verified")
-        remaining = [f for f in video_files if f not in results]
-        print(f"Remaining files to verify: {len(remaining)}")
-        return remaining
+        return skip_verified(video_files, results)
 
+    results.close()
     return video_files
 
 
-def execute_verification(video_files, paths):
+def skip_verified(video_files, verified):
+    """Yield files without a checkpointed result, closing the checkpoint's store once the scan ends."""
+    try:
+        for scanned in video_files:
+            if scanned.path not in verified:
+                yield scanned
+    finally:
+        verified.close()
+
+
+def execute_verification(video_files, paths, run_stats, aggregator, metrics=None, on_result=None):
     """Execute parallel verification."""
-    actual_workers = min(paths['jobs'], len(video_files))
-    print(f"Using {actual_workers} parallel worker(s)")
-    print(f"Verification timeout: {paths['timeout']} seconds")
+    actual_workers = min(paths['jobs'], len(video_files)) if isinstance(video_files, list) else paths['jobs']
+    print(f"Using {actual_workers} parallel worker(s) ({paths['engine']} engine)")
+    if paths['autotune']:
+        print(f"Autotune: enabled, up to {paths['max_jobs']} jobs, "
+              f"{paths['autotune_window']:.0f}s measurement windows")
+    print(f"Verification mode: {paths['mode']}")
+    if split_size(paths):
+        print(f"Segmented decode: files of {paths['split_size'] / 1e6:g} MB or more "
+              f"in up to {paths['segments']} concurrent segments")
+    print(f"Scheduling policy: {paths['schedule']}")
+    if paths['per_device_jobs'] or paths['device_limits']:
+        limits = [f"{prefix}={limit}" for prefix, limit in paths['device_limits'].items()]
+        print(f"Per-device limits: {paths['per_device_jobs'] or 'none'} per device"
+              + (f", {', '.join(limits)}" if limits else ""))
+    if paths['adaptive_timeout']:
+        print(f"Verification timeout: adaptive ({paths['timeout_factor']}x expected, "
+              f"{paths['timeout_floor']:.0f}-{paths['timeout_ceiling']:.0f} seconds)")
+    else:
+        print(f"Verification timeout: {paths['timeout']} seconds")
+    retry_policy = build_retry_policy(paths)
+    if retry_policy:
+        print(f"Retries: {'timed-out and I/O-failed' if retry_policy.transient else 'timed-out'} files again "
+              f"with {', then '.join(f'{timeout:g}' for timeout in retry_policy.timeouts)} second timeouts, "
+              f"at most {retry_policy.max_running} at once")
     print("Starting parallel verification...\n")
 
+    checkpoint = CheckpointJournal(paths['checkpoint'], paths['resume']) if paths['checkpoint'] else None
     interrupt_handler = InterruptHandler()
-    interrupt_handler.setup(paths['checkpoint'], {})
+    interrupt_handler.setup(checkpoint)
 
     return VerificationRunner.run_parallel_verification(
         video_files,
         paths['jobs'],
-        paths['checkpoint'],
+        checkpoint,
         interrupt_handler,
-        paths['timeout']
+        verify_options=build_verify_options(paths),
+        schedule=paths['schedule'],
+        run_stats=run_stats,
+        adaptive_timeout=build_adaptive_timeout(paths),
+        engine=paths['engine'],
+        autotuner=build_autotuner(paths),
+        per_device_jobs=paths['per_device_jobs'],
+        device_limits=paths['device_limits'],
+        aggregator=aggregator,
+        metrics=metrics,
+        on_result=on_result,
+        split_size=split_size(paths),
+        max_segments=paths['segments'],
+        retry_policy=retry_policy
+    )
+
+
+def split_size(paths):
+    """File size from which files are decoded in segments, if splitting applies to the mode."""
+    return paths['split_size'] if paths['mode'] == 'full' else None
+
+
+def build_adaptive_timeout(paths):
+    """Create the adaptive timeout estimator if enabled."""
+    if not paths['adaptive_timeout']:
+        return None
+
+    return AdaptiveTimeout(paths['timeout_factor'], paths['timeout_floor'], paths['timeout_ceiling'])
+
+
+def retry_ladder_error(paths):
+    """Why --retry-timeouts is unusable, or None (an adaptive first attempt may run up to the ceiling)."""
+    if not paths['retry_timeouts']:
+        return None
+    first_timeout = paths['timeout_ceiling'] if paths['adaptive_timeout'] else paths['timeout']
+    return RetryPolicy.check_timeouts(paths['retry_timeouts'], first_timeout)
+
+
+def build_retry_policy(paths):
+    """Create the in-run retry ladder if enabled."""
+    if not paths['retry_timeouts']:
+        return None
+
+    max_running = paths['retry_jobs'] or max(1, paths['jobs'] // 4)
+    return RetryPolicy(paths['retry_timeouts'], paths['retry_transient'], max_running)
+
+
+def build_autotuner(paths):
+    """Create the throughput autotuner if enabled."""
+    if not paths['autotune']:
+        return None
+
+    threads = paths['threads'] or max(1, cpu_count() // paths['jobs'])
+    return Autotuner(
+        paths['jobs'], threads, paths['max_jobs'], cpu_count(),
+        window_seconds=paths['autotune_window']
     )
 
 
-def calculate_exit_code(results):
-    """Calculate exit code based on verification results."""
-    corrupted_count = sum(1 for is_valid, _, __ in results.values() if not is_valid)
-    return 0 if corrupted_count == 0 else 1
+def build_verify_options(paths):
+    """Collect per-file verification settings passed to VideoVerifier."""
+    return {
+        'timeout': paths['timeout'],
+        'mode': paths['mode'],
+        'samples': paths['samples'],
+        'sample_duration': paths['sample_duration'],
+        'fatal_patterns': paths['fatal_patterns'],
+        'threads': paths['threads']
+    }
+
+
+def calculate_exit_code(aggregator):
+    """Calculate exit code based on aggregated verification results."""
+    return 0 if aggregator.corrupted == 0 else 1
 
 
 if __name__ == '__main__':
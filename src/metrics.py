@@ -0,0 +1,214 @@
+"""Per-file resource metrics: histograms, per-course totals and exports."""
+
+import json
+import os
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, TextIO, Tuple
+
+from file_scanner import FileScanner
+from result_store import VerificationResult
+
+
+# Details keys describing how a verification performed (see VideoVerifier.verify_video)
+RESOURCE_KEYS = (
+    'elapsed', 'queue_wait', 'cpu_user', 'cpu_system', 'max_rss', 'media_seconds', 'segments',
+    'attempt', 'total_elapsed'
+)
+
+MIB = 1024 * 1024
+SECONDS_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+# (name, help text, bucket upper bounds)
+HISTOGRAMS = (
+    ('wall_seconds', 'Wall-clock verification time per file.', SECONDS_BUCKETS),
+    ('queue_wait_seconds', 'Time between dispatching a file and its verification starting.', SECONDS_BUCKETS),
+    ('cpu_seconds', 'ffmpeg user plus system CPU time per file.', SECONDS_BUCKETS),
+    ('max_rss_bytes', 'Peak ffmpeg resident memory per file.',
+     tuple(size * MIB for size in (32, 64, 128, 256, 512, 1024, 2048, 4096))),
+    ('file_bytes', 'Size of each verified file.', (1e6, 1e7, 1e8, 2.5e8, 5e8, 1e9, 2e9, 4e9, 8e9)),
+)
+
+PROMETHEUS_PREFIX = 'video_verify_'
+
+# Courses listed in the run statistics, by total verification time
+SLOWEST_COURSES = 5
+
+
+class Histogram:
+    """Counts of observations per bucket, reported cumulatively as Prometheus does."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add one observation."""
+        self.count += 1
+        self.sum += value
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(upper bound, observations at or below it) pairs, ending with +Inf."""
+        pairs = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            pairs.append((str(float(bound)), total))
+        pairs.append(('+Inf', self.count))
+        return pairs
+
+
+class MetricsCollector:
+    """
+    Accumulates the resource usage of files verified in this run.
+
+    VerificationRunner adds each result as it completes. The collector keeps
+    histograms, run totals and per-course totals (to find the courses that
+    are slow to verify). With an output file it either streams one JSON line
+    per file plus a final summary line, or, for a .prom file, writes a
+    Prometheus textfile-collector file when closed.
+    """
+
+    def __init__(self, root_dir: Path, output_file: Optional[Path] = None):
+        self.root_dir = root_dir
+        self.output_file = output_file
+        self.histograms = {name: Histogram(buckets) for name, _, buckets in HISTOGRAMS}
+        self.files = {'valid': 0, 'corrupted': 0}
+        self.totals = {'bytes': 0, 'media_seconds': 0.0, 'cpu_user': 0.0, 'cpu_system': 0.0}
+        self.media_files = 0  # Files whose duration was probed; media seconds are unknown for the rest
+        self.peak_rss = 0
+        self.courses: Dict[str, Dict[str, float]] = {}
+        self.prometheus = output_file is not None and output_file.suffix == '.prom'
+        self._lines: Optional[TextIO] = open(output_file, 'w') if output_file and not self.prometheus else None
+
+    @staticmethod
+    def file_metrics(details: Dict[str, Any]) -> Dict[str, Any]:
+        """The resource keys present in a result's details."""
+        return {key: details[key] for key in RESOURCE_KEYS if key in details}
+
+    def add(self, video_path: Path, result: VerificationResult) -> None:
+        """Record one verified file."""
+        is_valid, _, file_size, details = result
+        metrics = MetricsCollector.file_metrics(details)
+        cpu = metrics['cpu_user'] + metrics['cpu_system'] if 'cpu_user' in metrics else None
+        observed = {
+            'wall_seconds': metrics.get('elapsed'),
+            'queue_wait_seconds': metrics.get('queue_wait'),
+            'cpu_seconds': cpu,
+            'max_rss_bytes': metrics.get('max_rss'),
+            'file_bytes': file_size
+        }
+        for name, value in observed.items():
+            if value is not None:
+                self.histograms[name].observe(value)
+
+        self.files['valid' if is_valid else 'corrupted'] += 1
+        self.totals['bytes'] += file_size
+        if 'media_seconds' in metrics:
+            self.media_files += 1
+            self.totals['media_seconds'] += metrics['media_seconds']
+        self.totals['cpu_user'] += metrics.get('cpu_user', 0.0)
+        self.totals['cpu_system'] += metrics.get('cpu_system', 0.0)
+        self.peak_rss = max(self.peak_rss, metrics.get('max_rss', 0))
+
+        course = FileScanner.get_course_name(video_path, self.root_dir)
+        course_totals = self.courses.setdefault(course, {'files': 0, 'bytes': 0, 'seconds': 0.0, 'cpu': 0.0})
+        course_totals['files'] += 1
+        course_totals['bytes'] += file_size
+        course_totals['seconds'] += metrics.get('elapsed', 0.0)
+        course_totals['cpu'] += cpu or 0.0
+
+        if self._lines:
+            self._lines.write(json.dumps({
+                'path': str(video_path),
+                'course': course,
+                'is_valid': is_valid,
+                'mode': details.get('mode'),
+                'size': file_size,
+                **metrics
+            }) + '\n')
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Run totals and the slowest courses, for the reports' run statistics.
+
+        media_seconds is left out when no file had its duration probed.
+        """
+        wall = self.histograms['wall_seconds']
+        queue_wait = self.histograms['queue_wait_seconds']
+        slowest = sorted(self.courses.items(), key=lambda item: -item[1]['seconds'])[:SLOWEST_COURSES]
+        stats = {
+            'files': sum(self.files.values()),
+            'verify_seconds': round(wall.sum, 1),
+            'cpu_user_seconds': round(self.totals['cpu_user'], 1),
+            'cpu_system_seconds': round(self.totals['cpu_system'], 1),
+            'peak_rss_mb': round(self.peak_rss / MIB, 1),
+            'mean_queue_wait_seconds': round(queue_wait.sum / queue_wait.count, 2) if queue_wait.count else 0.0,
+            'slowest_courses': [
+                {
+                    'course': course,
+                    'files': totals['files'],
+                    'seconds': round(totals['seconds'], 1),
+                    'cpu_seconds': round(totals['cpu'], 1),
+                    'mb_per_second': round(totals['bytes'] / totals['seconds'] / 1e6, 2) if totals['seconds'] else None
+                }
+                for course, totals in slowest
+            ]
+        }
+        if self.media_files:
+            stats['media_seconds'] = round(self.totals['media_seconds'], 1)
+        return stats
+
+    def close(self) -> None:
+        """Finish the export: the JSON-lines summary, or the Prometheus file."""
+        if self._lines:
+            summary = {**self.get_stats(), 'histograms': {
+                name: {'buckets': dict(histogram.cumulative()), 'sum': round(histogram.sum, 3), 'count': histogram.count}
+                for name, histogram in self.histograms.items()
+            }}
+            self._lines.write(json.dumps({'summary': summary}) + '\n')
+            self._lines.close()
+            self._lines = None
+        elif self.prometheus:
+            # Written aside and renamed, so the textfile collector never reads a partial file
+            tmp_file = self.output_file.with_name(self.output_file.name + '.tmp')
+            with open(tmp_file, 'w') as f:
+                f.writelines(self._prometheus_lines())
+            os.replace(tmp_file, self.output_file)
+
+    def _prometheus_lines(self) -> List[str]:
+        """Counters, a gauge and the histograms in Prometheus text exposition format."""
+        lines = MetricsCollector._prometheus_header('files_total', 'counter', 'Files verified, by result.')
+        lines.extend(f'{PROMETHEUS_PREFIX}files_total{{result="{result}"}} {count}\n'
+                     for result, count in self.files.items())
+        lines += MetricsCollector._prometheus_header('bytes_total', 'counter', 'Bytes of video verified.')
+        lines.append(f'{PROMETHEUS_PREFIX}bytes_total {self.totals["bytes"]}\n')
+        if self.media_files:
+            lines += MetricsCollector._prometheus_header(
+                'media_seconds_total', 'counter', 'Seconds of media decoded, where the duration was probed.'
+            )
+            lines.append(f'{PROMETHEUS_PREFIX}media_seconds_total {self.totals["media_seconds"]:.3f}\n')
+        lines += MetricsCollector._prometheus_header('cpu_seconds_total', 'counter', 'ffmpeg CPU time.')
+        lines.append(f'{PROMETHEUS_PREFIX}cpu_seconds_total{{mode="user"}} {self.totals["cpu_user"]:.3f}\n')
+        lines.append(f'{PROMETHEUS_PREFIX}cpu_seconds_total{{mode="system"}} {self.totals["cpu_system"]:.3f}\n')
+        lines += MetricsCollector._prometheus_header('peak_rss_bytes', 'gauge', 'Largest ffmpeg resident memory.')
+        lines.append(f'{PROMETHEUS_PREFIX}peak_rss_bytes {self.peak_rss}\n')
+
+        for name, help_text, _ in HISTOGRAMS:
+            histogram = self.histograms[name]
+            lines += MetricsCollector._prometheus_header(name, 'histogram', help_text)
+            lines.extend(f'{PROMETHEUS_PREFIX}{name}_bucket{{le="{bound}"}} {count}\n'
+                         for bound, count in histogram.cumulative())
+            lines.append(f'{PROMETHEUS_PREFIX}{name}_sum {histogram.sum:.3f}\n')
+            lines.append(f'{PROMETHEUS_PREFIX}{name}_count {histogram.count}\n')
+        return lines
+
+    @staticmethod
+    def _prometheus_header(name: str, metric_type: str, help_text: str) -> List[str]:
+        """HELP and TYPE lines for a metric."""
+        return [f'# HELP {PROMETHEUS_PREFIX}{name} {help_text}\n', f'# TYPE {PROMETHEUS_PREFIX}{name} {metric_type}\n']
@@ -0,0 +1,237 @@
+"""Structural MP4 (ISO-BMFF) container checks without decoding."""
+
+import mmap
+import struct
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+
+Box = Tuple[str, int, int]  # (type, payload_start, box_end)
+ByteRange = Tuple[int, int]
+
+
+# Boxes on the moov -> trak -> mdia -> minf -> stbl path that hold sample tables
+SAMPLE_TABLE_PATH = ('mdia', 'minf', 'stbl')
+
+
+class SampleSizes(NamedTuple):
+    """An stsz box: constant is the size of every sample, or 0 when sizes holds one per sample."""
+    constant: int
+    count: int
+    sizes: tuple
+
+
+class Mp4StructureError(Exception):
+    """Raised when the container structure is invalid or truncated."""
+
+
+class Mp4StructureChecker:
+    """Walks ISO-BMFF boxes to detect truncated or malformed MP4 files."""
+
+    @staticmethod
+    def check(video_path: Path) -> Optional[str]:
+        """
+        Check MP4 container structure.
+
+        Returns:
+            Error message if the structure is broken, None if it looks intact
+        """
+        try:
+            with open(video_path, 'rb') as f:
+                file_size = f.seek(0, 2)
+                if file_size == 0:
+                    return "Container structure error: file is empty"
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    Mp4StructureChecker._check_mapped(mm, file_size)
+        except Mp4StructureError as e:
+            return f"Container structure error: {e}"
+        except (struct.error, ValueError) as e:
+            return f"Container structure error: malformed box data ({e})"
+        except OSError as e:
+            return f"Cannot read file: {e}"
+        return None
+
+    @staticmethod
+    def read_duration(video_path: Path) -> Optional[float]:
+        """Movie duration in seconds from the mvhd box, or None when it cannot be read."""
+        try:
+            with open(video_path, 'rb') as f:
+                file_size = f.seek(0, 2)
+                if file_size == 0:
+                    return None
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    moov = [box for box in Mp4StructureChecker._iter_boxes(mm, 0, file_size) if box[0] == 'moov']
+                    if not moov:
+                        return None
+                    mvhd = Mp4StructureChecker._find_children(mm, moov[0][1], moov[0][2], 'mvhd')
+                    if not mvhd:
+                        return None
+                    start = mvhd[0][1]
+                    # Version 1 has 64-bit creation/modification times and duration
+                    fields = ('>IQ', start + 20) if mm[start] == 1 else ('>II', start + 12)
+                    timescale, duration = struct.unpack_from(fields[0], mm, fields[1])
+        except (Mp4StructureError, struct.error, ValueError, OSError):
+            return None
+        return duration / timescale if timescale else None
+
+    @staticmethod
+    def _check_mapped(mm: mmap.mmap, file_size: int) -> None:
+        """Validate top-level boxes and sample tables of a mapped file."""
+        top_level = list(Mp4StructureChecker._iter_boxes(mm, 0, file_size))
+        moov = [box for box in top_level if box[0] == 'moov']
+        if not moov:
+            raise Mp4StructureError("moov atom not found")
+
+        mdat_ranges = [(start, end) for box_type, start, end in top_level if box_type == 'mdat']
+        _, moov_start, moov_end = moov[0]
+        for trak in Mp4StructureChecker._find_children(mm, moov_start, moov_end, 'trak'):
+            Mp4StructureChecker._check_track(mm, trak, mdat_ranges)
+
+    @staticmethod
+    def _iter_boxes(mm: mmap.mmap, start: int, end: int) -> Iterator[Box]:
+        """Yield boxes between start and end, validating declared sizes."""
+        offset = start
+        while offset < end:
+            if offset + 8 > end:
+                raise Mp4StructureError(f"truncated box header at offset {offset}")
+
+            size, raw_type = struct.unpack_from('>I4s', mm, offset)
+            box_type = raw_type.decode('latin-1')
+            header = 8
+            if size == 1:
+                if offset + 16 > end:
+                    raise Mp4StructureError(f"truncated '{box_type}' header at offset {offset}")
+                size = struct.unpack_from('>Q', mm, offset + 8)[0]
+                header = 16
+            elif size == 0:
+                size = end - offset
+
+            if size < header:
+                raise Mp4StructureError(f"invalid size {size} for '{box_type}' box at offset {offset}")
+            if offset + size > end:
+                raise Mp4StructureError(
+                    f"'{box_type}' box at offset {offset} declares {size} bytes "
+                    f"but only {end - offset} remain (truncated file)"
+                )
+
+            yield (box_type, offset + header, offset + size)
+            offset += size
+
+    @staticmethod
+    def _find_children(mm: mmap.mmap, start: int, end: int, box_type: str) -> List[Box]:
+        """Return direct children of the given type."""
+        return [box for box in Mp4StructureChecker._iter_boxes(mm, start, end) if box[0] == box_type]
+
+    @staticmethod
+    def _check_track(mm: mmap.mmap, trak: Box, mdat_ranges: List[ByteRange]) -> None:
+        """Check that a track's chunks lie inside an mdat box."""
+        _, start, end = trak
+        for container in SAMPLE_TABLE_PATH:
+            children = Mp4StructureChecker._find_children(mm, start, end, container)
+            if not children:
+                return
+            _, start, end = children[0]
+
+        tables = {box_type: (box_start, box_end)
+                  for box_type, box_start, box_end in Mp4StructureChecker._iter_boxes(mm, start, end)}
+
+        chunk_offsets = Mp4StructureChecker._read_chunk_offsets(mm, tables)
+        if not chunk_offsets:
+            return  # Fragmented files keep samples in moof/mdat pairs
+        if not mdat_ranges:
+            raise Mp4StructureError("sample table references media data but no mdat box exists")
+
+        sample_sizes = Mp4StructureChecker._read_sample_sizes(mm, tables)
+        samples_per_chunk = Mp4StructureChecker._read_samples_per_chunk(mm, tables, len(chunk_offsets))
+        Mp4StructureChecker._check_chunks(chunk_offsets, samples_per_chunk, sample_sizes, mdat_ranges)
+
+    @staticmethod
+    def _read_table(mm: mmap.mmap, box: ByteRange, header_fmt: str, entry_fmt: str) -> Tuple[tuple, tuple]:
+        """Read a full box header plus its entry table, checking it fits the box."""
+        start, end = box
+        header = struct.unpack_from(header_fmt, mm, start + 4)  # skip version/flags
+        count = header[-1]
+        table_start = start + 4 + struct.calcsize(header_fmt)
+        table_size = count * struct.calcsize('>' + entry_fmt)
+        if table_start + table_size > end:
+            raise Mp4StructureError(f"sample table with {count} entries overflows its box")
+        # A repeat count applies to a single field, so multi-field entries are spelled out
+        table_fmt = f'>{count}{entry_fmt}' if len(entry_fmt) == 1 else '>' + entry_fmt * count
+        return header, struct.unpack_from(table_fmt, mm, table_start)
+
+    @staticmethod
+    def _read_chunk_offsets(mm: mmap.mmap, tables: Dict[str, ByteRange]) -> tuple:
+        """Read stco (32-bit) or co64 (64-bit) chunk offsets."""
+        if 'stco' in tables:
+            return Mp4StructureChecker._read_table(mm, tables['stco'], '>I', 'I')[1]
+        if 'co64' in tables:
+            return Mp4StructureChecker._read_table(mm, tables['co64'], '>I', 'Q')[1]
+        return ()
+
+    @staticmethod
+    def _read_sample_sizes(mm: mmap.mmap, tables: Dict[str, ByteRange]) -> SampleSizes:
+        """Read stsz: a constant sample size with its count, or the per-sample size table."""
+        if 'stsz' not in tables:
+            return SampleSizes(0, 0, ())
+        start, _ = tables['stsz']
+        sample_size, sample_count = struct.unpack_from('>II', mm, start + 4)
+        if sample_size:
+            # No table to bound the count by: it is checked against the media data instead
+            return SampleSizes(sample_size, sample_count, ())
+        return SampleSizes(0, sample_count, Mp4StructureChecker._read_table(mm, tables['stsz'], '>II', 'I')[1])
+
+    @staticmethod
+    def _read_samples_per_chunk(mm: mmap.mmap, tables: Dict[str, ByteRange], chunk_count: int) -> List[int]:
+        """Expand stsc runs into a samples-per-chunk list."""
+        if 'stsc' not in tables:
+            return []
+        entries = Mp4StructureChecker._read_table(mm, tables['stsc'], '>I', 'III')[1]
+
+        counts = []
+        runs = [entries[i:i + 2] for i in range(0, len(entries), 3)]
+        for index, (first_chunk, samples) in enumerate(runs):
+            next_first = runs[index + 1][0] if index + 1 < len(runs) else chunk_count + 1
+            if first_chunk < 1 or next_first < first_chunk:
+                raise Mp4StructureError("sample-to-chunk table is not ordered")
+            counts.extend([samples] * (min(next_first, chunk_count + 1) - first_chunk))
+        return counts
+
+    @staticmethod
+    def _check_chunks(
+        chunk_offsets: tuple,
+        samples_per_chunk: List[int],
+        sample_sizes: SampleSizes,
+        mdat_ranges: List[ByteRange]
+    ) -> None:
+        """Check each chunk (offset plus its samples' bytes) lies inside an mdat."""
+        constant, sample_count, sizes = sample_sizes
+        media_bytes = sum(end - start for start, end in mdat_ranges)
+        if constant and constant * sample_count > media_bytes:
+            raise Mp4StructureError(
+                f"sample size table declares {sample_count} samples of {constant} bytes "
+                f"but media data holds only {media_bytes} bytes"
+            )
+        have_sizes = sample_count > 0 and len(samples_per_chunk) == len(chunk_offsets)
+        if have_sizes and sum(samples_per_chunk) > sample_count:
+            raise Mp4StructureError(
+                f"sample-to-chunk table references {sum(samples_per_chunk)} samples "
+                f"but only {sample_count} sizes exist"
+            )
+
+        sample_index = 0
+        mdat_start, mdat_end = mdat_ranges[0]
+        for chunk_index, chunk_offset in enumerate(chunk_offsets):
+            chunk_end = chunk_offset
+            if have_sizes:
+                count = samples_per_chunk[chunk_index]
+                chunk_end += count * constant if constant else sum(sizes[sample_index:sample_index + count])
+                sample_index += count
+
+            if not (mdat_start <= chunk_offset and chunk_end <= mdat_end):
+                containing = [r for r in mdat_ranges if r[0] <= chunk_offset and chunk_end <= r[1]]
+                if not containing:
+                    raise Mp4StructureError(
+                        f"chunk {chunk_index + 1} spans bytes {chunk_offset}-{chunk_end} "
+                        f"outside media data (truncated or corrupt sample table)"
+                    )
+                mdat_start, mdat_end = containing[0]
@@ -1,7 +1,23 @@
 """Progress tracking and display."""
 
+import sys
 import time
-from typing import Dict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# Seconds between progress redraws on a terminal
+REFRESH_INTERVAL = 0.5
+
+# Seconds between progress log lines when output is not a terminal
+LOG_INTERVAL = 30.0
+
+# Throughput samples lose half their weight after this many seconds
+RATE_HALF_LIFE = 30.0
+
+# Shortest span folded into the throughput estimate, so bursts of completions don't swing it
+RATE_SAMPLE_INTERVAL = 1.0
 
 
 def format_time(seconds: float) -> str:
@@ -14,50 +30,212 @@ def format_time(seconds: float) -> str:
         return f"{seconds/3600:.1f}h"
 
 
+def format_bytes(size: float) -> str:
+    """Format a byte count with a decimal unit."""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1000:
+            return f"{size:.1f}{unit}"
+        size /= 1000
+    return f"{size:.1f}TB"
+
+
 class ProgressTracker:
-    """Track and display verification progress."""
+    """
+    Track and display verification progress (total is None while a scan is streaming).
+
+    The ETA is remaining bytes over an exponentially weighted estimate of
+    bytes verified per second. Files still verifying count as partly done in
+    proportion to how long they have run, so the estimate moves smoothly
+    between completions of large files. On a terminal the progress line is
+    redrawn at most every REFRESH_INTERVAL seconds; otherwise (a log file or
+    pipe) a key=value line is written every LOG_INTERVAL seconds. With
+    on_progress nothing is printed: the callback receives the statistics
+    every REFRESH_INTERVAL seconds instead.
+    """
 
-    def __init__(self, total_files: int):
-        self.total_files = total_files
+    def __init__(
+        self,
+        total_files: Optional[int] = None,
+        total_bytes: int = 0,
+        interactive: Optional[bool] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        self.total_files = total_files or 0
+        self.total_bytes = total_bytes
+        self.discovering = total_files is None
         self.completed = 0
+        self.done_bytes = 0
+        self.in_flight: Dict[Path, Tuple[int, float]] = {}  # path -> (size, start time)
         self.start_time = time.time()
+        self.completion_times: List[float] = []
+        self.interactive = sys.stdout.isatty() if interactive is None else interactive
+        self.on_progress = on_progress
+        self.interval = REFRESH_INTERVAL if self.interactive or on_progress else LOG_INTERVAL
+        self.byte_rate = 0.0
+        self._sampled_at = self.start_time
+        self._sampled_bytes = 0.0
+        self._displayed_at = self.start_time if not (self.interactive or on_progress) else 0.0
+
+    def add_discovered(self, size: int = 0) -> None:
+        """Count a file found by a scan that is still running."""
+        self.total_files += 1
+        self.total_bytes += size
+
+    def finish_discovery(self) -> None:
+        """Fix the total once the scan has finished."""
+        self.discovering = False
+
+    def file_started(self, video_path: Path, size: int) -> None:
+        """Note a file dispatched for verification."""
+        self.in_flight[video_path] = (size, time.time())
+
+    def requeued(self, video_path: Path) -> None:
+        """Note a dispatched file that went back in the queue (a retry) instead of completing."""
+        self.in_flight.pop(video_path, None)
 
-    def increment(self) -> None:
-        """Increment completed count."""
+    def increment(self, video_path: Optional[Path] = None) -> None:
+        """Count a completed file."""
         self.completed += 1
+        self.completion_times.append(time.time() - self.start_time)
+        size, _ = self.in_flight.pop(video_path, (0, 0.0))
+        self.done_bytes += size
+
+    def display(self, detail: Optional[str] = None) -> None:
+        """Display current progress if the refresh interval has passed, optionally with extra detail."""
+        now = time.time()
+        if now - self._displayed_at < self.interval:
+            return
+        self._displayed_at = now
 
-    def display(self) -> None:
-        """Display current progress."""
         stats = self.calculate_stats()
-        print(self.format_progress(stats), end='\r')
+        if self.on_progress:
+            self.on_progress({
+                **stats,
+                'completed': self.completed,
+                'total_files': self.total_files,
+                'discovering': self.discovering,
+                'done_bytes': self.done_bytes,
+                'total_bytes': self.total_bytes,
+                'in_flight': len(self.in_flight)
+            })
+        elif self.interactive:
+            line = self.format_progress(stats)
+            if detail:
+                line += f" | {detail}"
+            print(line, end='\r', flush=True)
+        else:
+            print(self.format_log_line(stats, detail), flush=True)
 
-    def calculate_stats(self) -> Dict[str, float]:
-        """Calculate current statistics."""
-        elapsed = time.time() - self.start_time
+    def calculate_stats(self) -> Dict[str, Any]:
+        """Calculate current statistics; eta is None until throughput is known."""
+        now = time.time()
+        self._update_rate(now)
+        elapsed = now - self.start_time
         rate = self.completed / elapsed if elapsed > 0 else 0
-        remaining = self.total_files - self.completed
-        eta = remaining / rate if rate > 0 else 0
-        progress = self.completed / self.total_files * 100
+        progressed = self.progress_bytes(now)
+
+        if self.total_bytes:
+            progress = min(100.0, progressed / self.total_bytes * 100)
+            eta = max(0.0, self.total_bytes - progressed) / self.byte_rate if self.byte_rate > 0 else None
+        else:
+            # Sizes unknown: fall back to counting files
+            progress = self.completed / self.total_files * 100 if self.total_files else 0
+            eta = (self.total_files - self.completed) / rate if rate > 0 else None
 
         return {
             'progress': progress,
             'rate': rate,
+            'byte_rate': self.byte_rate,
             'eta': eta,
             'elapsed': elapsed
         }
 
-    def format_progress(self, stats: Dict[str, float]) -> str:
+    def progress_bytes(self, now: float) -> float:
+        """Completed bytes plus the estimated share of files still verifying."""
+        if not self.in_flight:
+            return self.done_bytes
+        per_file_rate = self.byte_rate / len(self.in_flight)
+        return self.done_bytes + sum(
+            min(size, (now - started) * per_file_rate) for size, started in self.in_flight.values()
+        )
+
+    def format_progress(self, stats: Dict[str, Any]) -> str:
         """Format progress string."""
+        rate = f"Rate: {format_bytes(stats['byte_rate'])}/s, {stats['rate']:.1f} files/s"
+        if self.discovering:
+            return (
+                f"Progress: {self.completed} done, {self.total_files} discovered so far | "
+                f"{rate} | "
+                f"Elapsed: {format_time(stats['elapsed'])}"
+            )
+        eta = format_time(stats['eta']) if stats['eta'] is not None else "estimating"
         return (
             f"Progress: {self.completed}/{self.total_files} ({stats['progress']:.1f}%) | "
-            f"Rate: {stats['rate']:.1f} files/s | "
-            f"ETA: {format_time(stats['eta'])} | "
+            f"{rate} | "
+            f"ETA: {eta} | "
             f"Elapsed: {format_time(stats['elapsed'])}"
         )
 
+    def format_log_line(self, stats: Dict[str, Any], detail: Optional[str] = None) -> str:
+        """Format progress as a timestamped key=value log line."""
+        fields = [
+            datetime.now().isoformat(timespec='seconds'),
+            "progress",
+            f"files={self.completed}/{self.total_files}{'+' if self.discovering else ''}",
+            f"bytes={self.done_bytes}/{self.total_bytes}",
+            f"percent={stats['progress']:.1f}",
+            f"bytes_per_second={stats['byte_rate']:.0f}",
+            f"files_per_second={stats['rate']:.2f}",
+            f"eta_seconds={stats['eta']:.0f}" if stats['eta'] is not None and not self.discovering else "eta_seconds=",
+            f"elapsed_seconds={stats['elapsed']:.0f}",
+            f"in_flight={len(self.in_flight)}"
+        ]
+        if detail:
+            fields.append(f'detail="{detail}"')
+        return " ".join(fields)
+
+    def tail_idle_stats(self, num_workers: int) -> Dict[str, float]:
+        """
+        Measure worker idle time at the end of the run.
+
+        Once fewer files remain than workers, every completion leaves a worker
+        idle until the last file finishes.
+        """
+        times = self.completion_times
+        if not times:
+            return {'tail_seconds': 0.0, 'idle_worker_seconds': 0.0, 'idle_fraction': 0.0}
+
+        end = times[-1]
+        tail = times[max(0, len(times) - num_workers):-1]
+        idle = sum(end - t for t in tail)
+        capacity = num_workers * end
+        return {
+            'tail_seconds': round(end - tail[0], 1) if tail else 0.0,
+            'idle_worker_seconds': round(idle, 1),
+            'idle_fraction': round(idle / capacity, 3) if capacity > 0 else 0.0
+        }
+
     def display_final(self) -> None:
         """Display final completion message."""
         elapsed = time.time() - self.start_time
         rate = self.total_files / elapsed if elapsed > 0 else 0
+        byte_rate = self.done_bytes / elapsed if elapsed > 0 else 0
         print(f"\n\nVerification complete in {format_time(elapsed)}!")
-        print(f"Average rate: {rate:.1f} files/second\n")
+        print(f"Average rate: {rate:.1f} files/second ({format_bytes(byte_rate)}/s)\n")
+
+    def _update_rate(self, now: float) -> None:
+        """Fold the bytes progressed since the last sample into the throughput estimate."""
+        span = now - self._sampled_at
+        if span < RATE_SAMPLE_INTERVAL:
+            return
+        progressed = self.progress_bytes(now)
+        if self.byte_rate <= 0:
+            # First estimate: the average so far
+            self.byte_rate = self.done_bytes / (now - self.start_time)
+            progressed = self.progress_bytes(now)
+        else:
+            weight = 1 - 0.5 ** (span / RATE_HALF_LIFE)
+            instant = (progressed - self._sampled_bytes) / span
+            self.byte_rate = max(0.0, self.byte_rate + weight * (instant - self.byte_rate))
+        self._sampled_at = now
+        self._sampled_bytes = progressed
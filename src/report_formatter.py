@@ -1,7 +1,7 @@
 """Report formatting and output."""
 
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Any, Dict, Iterator, List, Tuple, Optional
 from datetime import datetime
 
 from report_stats import ReportStats
@@ -26,6 +26,36 @@ class ReportFormatter:
             ""
         ]
 
+    @staticmethod
+    def build_run_statistics(run_stats: Optional[Dict[str, Any]]) -> List[str]:
+        """Build run statistics section (cache, scheduling, etc.)."""
+        if not run_stats:
+            return []
+
+        lines = ["RUN STATISTICS"]
+        for section in sorted(run_stats.keys()):
+            lines.append(f"  {ReportFormatter._label(section)}:")
+            for key, value in run_stats[section].items():
+                if isinstance(value, list):
+                    lines.append(f"    {ReportFormatter._label(key)}:")
+                    lines.extend(f"      {ReportFormatter._format_entry(entry)}" for entry in value)
+                else:
+                    lines.append(f"    {ReportFormatter._label(key)}: {value}")
+        lines.extend(["=" * 80, ""])
+        return lines
+
+    @staticmethod
+    def _format_entry(entry: Any) -> str:
+        """Format one item of a list-valued statistic (e.g. a throughput curve point)."""
+        if isinstance(entry, dict):
+            return ", ".join(f"{ReportFormatter._label(key).lower()}: {value}" for key, value in entry.items())
+        return str(entry)
+
+    @staticmethod
+    def _label(key: str) -> str:
+        """Turn a snake_case statistics key into a readable label."""
+        return key.replace('_', ' ').capitalize()
+
     @staticmethod
     def build_summary(
         stats: Dict[str, int],
@@ -40,48 +70,92 @@ class ReportFormatter:
             ""
         ]
 
+    @staticmethod
+    def build_error_codes(error_codes: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Build the files-per-error-code summary."""
+        if not error_codes:
+            return []
+
+        lines = ["Errors by code:"]
+        lines.extend(
+            f"  {code} ({info['severity']}): {info['files']} file(s)"
+            for code, info in error_codes.items()
+        )
+        lines.append("")
+        return lines
+
     @staticmethod
     def build_course_details(
         corrupted_by_course: Dict[str, List[Tuple[Path, str]]],
-        root_dir: Path
-    ) -> List[str]:
-        """Build detailed course breakdown."""
-        lines = []
+        root_dir: Path,
+        limit: Optional[int] = None,
+        full_report: Optional[Path] = None
+    ) -> Iterator[str]:
+        """
+        Yield the detailed course breakdown line by line.
+
+        With a limit, only that many files are listed, each with the first
+        line of its error, followed by a pointer to the full report.
+        """
+        shown = 0
+        total = sum(len(files) for files in corrupted_by_course.values())
         for course in sorted(corrupted_by_course.keys()):
+            if limit is not None and shown >= limit:
+                break
             files = corrupted_by_course[course]
-            lines.extend(ReportFormatter._build_course_section(course, files, root_dir))
-        return lines
+            if limit is not None:
+                files = files[:limit - shown]
+            yield from ReportFormatter._build_course_section(
+                course, files, root_dir, len(corrupted_by_course[course]), shorten=limit is not None
+            )
+            shown += len(files)
+
+        if shown < total:
+            yield ReportFormatter._more_line(total - shown, full_report)
+            yield ""
 
     @staticmethod
     def _build_course_section(
         course: str,
         files: List[Tuple[Path, str]],
-        root_dir: Path
-    ) -> List[str]:
-        """Build section for a single course."""
-        lines = [
-            "-" * 80,
-            f"COURSE: {course}",
-            f"Corrupted files: {len(files)}",
-            "-" * 80
-        ]
+        root_dir: Path,
+        total: int,
+        shorten: bool = False
+    ) -> Iterator[str]:
+        """Yield the section for a single course."""
+        yield "-" * 80
+        yield f"COURSE: {course}"
+        yield f"Corrupted files: {total}"
+        yield "-" * 80
 
         for video_path, error_msg in files:
             rel_path = ReportStats.get_relative_path(video_path, root_dir)
-            lines.extend([
-                f"\n  File: {rel_path}",
-                f"  Error: {error_msg}"
-            ])
+            yield f"\n  File: {rel_path}"
+            yield f"  Error: {ReportFormatter._first_line(error_msg) if shorten and error_msg else error_msg}"
 
-        lines.append("")
-        return lines
+        yield ""
 
     @staticmethod
-    def build_removal_commands(files_to_remove: List[Path], json_report_path: Optional[Path]) -> List[str]:
+    def _more_line(remaining: int, full_report: Optional[Path]) -> str:
+        """Note that a console listing was cut short."""
+        where = f" (full list in {full_report})" if full_report else ""
+        return f"  ... and {remaining} more{where}"
+
+    @staticmethod
+    def build_removal_commands(
+        files_to_remove: List[Path],
+        json_report_path: Optional[Path],
+        limit: Optional[int] = None,
+        full_report: Optional[Path] = None
+    ) -> List[str]:
         """Build section with rm commands for non-timeout failures."""
         if not files_to_remove:
             return []
 
+        listed = files_to_remove if limit is None else files_to_remove[:limit]
+        more = [ReportFormatter._more_line(len(files_to_remove) - len(listed), full_report)] \
+            if len(listed) < len(files_to_remove) else []
+
         lines = [
             "=" * 80,
             "RECOMMENDED WORKFLOW FOR FAILED FILES",
@@ -95,8 +169,9 @@ class ReportFormatter:
             ""
         ]
 
-        for file_path in files_to_remove:
+        for file_path in listed:
             lines.append(f'open "{file_path}"')
+        lines.extend(more)
 
         lines.extend([
             "",
@@ -105,8 +180,9 @@ class ReportFormatter:
             ""
         ])
 
-        for file_path in files_to_remove:
+        for file_path in listed:
             lines.append(f'rm "{file_path}"')
+        lines.extend(more)
 
         lines.extend([
             "",
@@ -129,7 +205,11 @@ class ReportFormatter:
         return lines
 
     @staticmethod
-    def build_dts_warning_section(dts_files: List[Tuple[Path, str]]) -> List[str]:
+    def build_dts_warning_section(
+        dts_files: List[Tuple[Path, str]],
+        limit: Optional[int] = None,
+        full_report: Optional[Path] = None
+    ) -> List[str]:
         """Build section explaining DTS warnings."""
         if not dts_files:
             return []
@@ -157,10 +237,50 @@ class ReportFormatter:
             ""
         ]
 
-        for file_path, _ in dts_files:
+        listed = dts_files if limit is None else dts_files[:limit]
+        for file_path, _ in listed:
             lines.append(f"  - {file_path}")
+        if len(listed) < len(dts_files):
+            lines.append(ReportFormatter._more_line(len(dts_files) - len(listed), full_report))
 
         lines.extend(["", "=" * 80, ""])
 
         return lines
 
+    @staticmethod
+    def build_diff_header(inputs: Dict[int, List[str]], counts: Dict[str, int]) -> List[str]:
+        """Build the header of a run diff: inputs and per-category counts."""
+        old_inputs, new_inputs = inputs[0], inputs[1]
+        lines = [
+            "=" * 80,
+            "VERIFICATION RUN DIFF",
+            "=" * 80,
+            f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            f"Old: {', '.join(old_inputs)}",
+            f"New: {', '.join(new_inputs)}",
+            ""
+        ]
+        lines.extend(f"{ReportFormatter._label(category)}: {count}" for category, count in counts.items())
+        lines.extend(["=" * 80, ""])
+        return lines
+
+    @staticmethod
+    def build_diff_title(category: str, count: int) -> List[str]:
+        """Build the heading of one diff category."""
+        return ["-" * 80, f"{ReportFormatter._label(category).upper()} ({count})", "-" * 80]
+
+    @staticmethod
+    def build_diff_entry(path: str, old_error: Optional[str], new_error: Optional[str]) -> List[str]:
+        """Build the lines for one file in a run diff."""
+        lines = [f"  {path}"]
+        if old_error:
+            lines.append(f"    Was: {ReportFormatter._first_line(old_error)}")
+        if new_error:
+            lines.append(f"    Now: {ReportFormatter._first_line(new_error)}")
+        return lines
+
+    @staticmethod
+    def _first_line(error_msg: str, limit: int = 200) -> str:
+        """First line of an error message, shortened for listings."""
+        line = error_msg.strip().splitlines()[0] if error_msg.strip() else ''
+        return line if len(line) <= limit else line[:limit - 3] + '...'
@@ -1,14 +1,18 @@
 """Report generation for verification results."""
 
+import sys
+from itertools import chain
 from pathlib import Path
-from typing import Dict, Tuple, Optional
+from typing import Any, Dict, TextIO, Optional
 
-from report_stats import ReportStats
+from report_stats import ResultsAggregator
 from report_formatter import ReportFormatter
 from json_report_generator import JsonReportGenerator
+from result_merger import ResultMerger, DIFF_CATEGORIES
+from result_store import VerificationResults
 
-
-VerificationResults = Dict[Path, Tuple[bool, Optional[str], int]]
+# Files listed per section on the console when the full report goes to a file
+CONSOLE_FAILURE_LIMIT = 20
 
 
 class ReportGenerator:
@@ -18,59 +22,131 @@ class ReportGenerator:
     def generate_report(
         results: VerificationResults,
         root_dir: Path,
-        output_file: Optional[Path] = None
+        output_file: Optional[Path] = None,
+        run_stats: Optional[Dict[str, Any]] = None,
+        aggregator: Optional[ResultsAggregator] = None
     ) -> None:
-        """Generate and display formatted report of verification results."""
+        """
+        Generate and display formatted report of verification results.
+
+        Reports are written section by section from a ResultsAggregator (built
+        here if the run did not keep one). When saved to a file, the console
+        lists at most CONSOLE_FAILURE_LIMIT files per section with shortened
+        errors; the files get full detail.
+        """
+        built = aggregator is None
+        aggregator = aggregator or ResultsAggregator.from_results(results, root_dir)
         json_report_path = output_file.with_suffix('.json') if output_file else None
-        report = ReportGenerator._build_report(results, root_dir, json_report_path)
-        print(report)
+        console_limit = CONSOLE_FAILURE_LIMIT if output_file else None
+        ReportGenerator._write_report(
+            sys.stdout, aggregator, json_report_path, run_stats, console_limit, output_file
+        )
 
         if output_file:
-            ReportGenerator._save_report(output_file, report)
-            ReportGenerator._save_json_report(output_file, results, root_dir)
+            ReportGenerator._save_report(output_file, aggregator, json_report_path, run_stats)
+            ReportGenerator._save_json_report(output_file, results, root_dir, run_stats, aggregator)
+        if built:
+            aggregator.close()
 
     @staticmethod
-    def _build_report(
-        results: VerificationResults,
-        root_dir: Path,
-        json_report_path: Optional[Path] = None
-    ) -> str:
-        """Build the report content."""
-        corrupted_by_course = ReportStats.group_corrupted_by_course(results, root_dir)
-        stats = ReportStats.calculate_stats(results)
-        error_categories = ReportStats.categorize_errors(results)
+    def _write_report(
+        out: TextIO,
+        aggregator: ResultsAggregator,
+        json_report_path: Optional[Path] = None,
+        run_stats: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        full_report: Optional[Path] = None
+    ) -> None:
+        """Write the report to a file handle, listing at most limit files per section."""
+        root_dir = aggregator.root_dir
+        stats = aggregator.get_stats()
+        corrupted_by_course = aggregator.corrupted_by_course
+        error_categories = aggregator.error_categories
 
         # Only show removal workflow for severe corruption, not DTS warnings
-        severe_failures = [path for path, _ in error_categories['severe_corruption']]
-
-        report_lines = []
-        report_lines.extend(ReportFormatter.build_header(root_dir, stats))
-        report_lines.extend(ReportFormatter.build_summary(stats, corrupted_by_course))
-        report_lines.extend(ReportFormatter.build_course_details(corrupted_by_course, root_dir))
-        report_lines.append("=" * 80)
-
-        # Add DTS warning section first (usually playable)
-        report_lines.extend(ReportFormatter.build_dts_warning_section(error_categories['dts_warnings']))
-
-        # Add removal commands only for severe corruption
-        report_lines.extend(ReportFormatter.build_removal_commands(severe_failures, json_report_path))
-
-        return "\n".join(report_lines)
+        severe_failures = error_categories['severe_corruption'].paths
+
+        sections = chain(
+            ReportFormatter.build_header(root_dir, stats),
+            ReportFormatter.build_run_statistics(run_stats),
+            ReportFormatter.build_summary(stats, corrupted_by_course),
+            ReportFormatter.build_error_codes(aggregator.get_error_codes()),
+            ReportFormatter.build_course_details(corrupted_by_course, root_dir, limit, full_report),
+            ["=" * 80],
+            # Add DTS warning section first (usually playable)
+            ReportFormatter.build_dts_warning_section(error_categories['dts_warnings'], limit, full_report),
+            # Add removal commands only for severe corruption
+            ReportFormatter.build_removal_commands(severe_failures, json_report_path, limit, full_report)
+        )
+        out.writelines(line + "\n" for line in sections)
 
     @staticmethod
-    def _save_report(output_file: Path, report: str) -> None:
-        """Save report to file."""
+    def _save_report(
+        output_file: Path,
+        aggregator: ResultsAggregator,
+        json_report_path: Optional[Path],
+        run_stats: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Save the full report to file."""
         with open(output_file, 'w') as f:
-            f.write(report)
+            ReportGenerator._write_report(f, aggregator, json_report_path, run_stats)
         print(f"\nReport saved to: {output_file}")
 
     @staticmethod
     def _save_json_report(
         output_file: Path,
         results: VerificationResults,
-        root_dir: Path
+        root_dir: Path,
+        run_stats: Optional[Dict[str, Any]] = None,
+        aggregator: Optional[ResultsAggregator] = None
     ) -> None:
         """Save JSON report alongside text report."""
         json_output = output_file.with_suffix('.json')
-        JsonReportGenerator.generate_json_report(results, root_dir, json_output)
+        JsonReportGenerator.generate_json_report(results, root_dir, json_output, run_stats, aggregator)
 
+    @staticmethod
+    def generate_diff(
+        merger: ResultMerger,
+        output_file: Optional[Path] = None,
+        console_limit: int = 10
+    ) -> Dict[str, int]:
+        """
+        Print a diff of two merged runs and optionally save the full listing.
+
+        Entries are streamed from the merge store, so the listing is never held
+        in memory; the console shows at most console_limit files per category.
+
+        Returns:
+            Number of files per diff category
+        """
+        counts = {category: sum(1 for _ in merger.iter_diff(category)) for category in DIFF_CATEGORIES}
+        header = ReportFormatter.build_diff_header(merger.inputs, counts)
+        print("\n".join(header))
+
+        out = open(output_file, 'w') if output_file else None
+        try:
+            if out:
+                out.write("\n".join(header) + "\n")
+            for category in DIFF_CATEGORIES:
+                if not counts[category]:
+                    continue
+                title = "\n".join(ReportFormatter.build_diff_title(category, counts[category]))
+                print(title)
+                if out:
+                    out.write(title + "\n")
+                for index, (path, old_error, new_error) in enumerate(merger.iter_diff(category)):
+                    entry = "\n".join(ReportFormatter.build_diff_entry(path, old_error, new_error))
+                    if index < console_limit:
+                        print(entry)
+                    elif index == console_limit:
+                        where = f" (see {output_file})" if output_file else ""
+                        print(f"  ... and {counts[category] - console_limit} more{where}")
+                    if out:
+                        out.write(entry + "\n")
+                print()
+        finally:
+            if out:
+                out.close()
+                print(f"Diff saved to: {output_file}")
+
+        return counts
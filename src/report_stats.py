@@ -1,13 +1,171 @@
 """Report statistics and data processing."""
 
 from pathlib import Path
-from typing import Dict, Tuple, Optional, List
+from typing import Any, Dict, Iterable, Tuple, Optional, List, Sequence
 from collections import defaultdict
 
 from file_scanner import FileScanner
+from error_taxonomy import ErrorTaxonomy, ErrorRecord, SEVERITIES
+from result_store import ResultStore, VerificationResult, VerificationResults
 
 
-VerificationResults = Dict[Path, Tuple[bool, Optional[str], int]]
+class ErrorClassifier:
+    """Assigns a failed file to a report category from its error records."""
+
+    @staticmethod
+    def classify(error_msg: Optional[str], details: Optional[Dict[str, Any]] = None) -> str:
+        """Category of a failed result (see category)."""
+        return ErrorClassifier.category(ErrorTaxonomy.records_for(error_msg, details or {}))
+
+    @staticmethod
+    def category(records: List[ErrorRecord]) -> str:
+        """timeout, dts_warnings (only warnings, usually playable) or severe_corruption."""
+        if any(record['code'] == 'timeout' for record in records):
+            return 'timeout'
+        if records and ErrorTaxonomy.worst_severity(records) == 'warning':
+            return 'dts_warnings'
+        return 'severe_corruption'
+
+
+class FailureList(Sequence):
+    """(path, error) pairs for a list of failed paths, reading errors from a ResultStore on access."""
+
+    def __init__(self, paths: List[Path], store: ResultStore):
+        self.paths = paths
+        self.store = store
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return FailureList(self.paths[index], self.store)
+        video_path = self.paths[index]
+        return (video_path, self.store[video_path][1])
+
+
+class ResultsAggregator:
+    """
+    Accumulates everything the reports need in a single pass over results.
+
+    Results can be added as they complete (VerificationRunner does this) or
+    all at once with from_results. Each error is classified once; only failed
+    files are kept (in a ResultStore, so their error text stays on disk), so
+    generating reports afterwards costs no further passes. Each path is
+    expected to be added once.
+    """
+
+    def __init__(self, root_dir: Path):
+        self.root_dir = root_dir
+        self.total = 0
+        self.total_size = 0
+        self.failures = ResultStore()
+        self._paths_by_course: Dict[str, List[Path]] = defaultdict(list)
+        self._paths_by_category: Dict[str, List[Path]] = {
+            'dts_warnings': [],
+            'severe_corruption': [],
+            'timeout': []
+        }
+        self.error_codes: Dict[str, Dict[str, Any]] = {}
+        self.duplicate_groups: Dict[str, Dict[str, Any]] = {}
+        self.decode_seconds_saved = 0.0
+
+    @staticmethod
+    def from_results(results: VerificationResults, root_dir: Path) -> 'ResultsAggregator':
+        """Aggregate an existing results mapping."""
+        aggregator = ResultsAggregator(root_dir)
+        aggregator.add_all(results.items())
+        return aggregator
+
+    def add_all(self, items: Iterable[Tuple[Path, VerificationResult]]) -> None:
+        """Add several (path, result) pairs."""
+        for video_path, result in items:
+            self.add(video_path, result)
+
+    def add(self, video_path: Path, result: VerificationResult) -> None:
+        """Add one file's result."""
+        is_valid, error_msg, file_size, details = result
+        self.total += 1
+        self.total_size += file_size
+
+        if details.get('duplicate_of'):
+            group = self.duplicate_groups.setdefault(details['duplicate_of'], {
+                'representative': details['duplicate_of'],
+                'size': file_size,
+                'is_valid': is_valid,
+                'duplicates': []
+            })
+            group['duplicates'].append(str(video_path))
+            if not details.get('cached'):
+                self.decode_seconds_saved += details.get('decode_seconds_saved', 0.0)
+
+        if is_valid:
+            return
+
+        course = FileScanner.get_course_name(video_path, self.root_dir)
+        self._paths_by_course[course].append(video_path)
+        if error_msg:
+            records = ErrorTaxonomy.records_for(error_msg, details)
+            if 'errors' not in details:
+                # Keep the records so report writers need not classify again
+                result = (is_valid, error_msg, file_size, {**details, 'errors': records})
+            self._paths_by_category[ErrorClassifier.category(records)].append(video_path)
+            # A code can have several records (one per stream) but counts once per file
+            severities = {record['code']: record['severity'] for record in records}
+            for code_name in ErrorTaxonomy.codes(records):
+                code = self.error_codes.setdefault(code_name, {'severity': severities[code_name], 'files': 0})
+                code['files'] += 1
+        self.failures[video_path] = result
+
+    def close(self) -> None:
+        """Delete the failures' spill file."""
+        self.failures.close()
+
+    def add_unlisted_valid(self, count: int, size: int) -> None:
+        """Count valid files known only from a report's totals (JSON reports list failures only)."""
+        self.total += count
+        self.total_size += size
+
+    @property
+    def corrupted_by_course(self) -> Dict[str, Sequence[Tuple[Path, str]]]:
+        """Failed (path, error) pairs per course."""
+        return {course: FailureList(paths, self.failures) for course, paths in self._paths_by_course.items()}
+
+    @property
+    def error_categories(self) -> Dict[str, Sequence[Tuple[Path, str]]]:
+        """Failed (path, error) pairs per report category."""
+        return {category: FailureList(paths, self.failures) for category, paths in self._paths_by_category.items()}
+
+    @property
+    def corrupted(self) -> int:
+        """Number of failed files."""
+        return len(self.failures)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Total, corrupted and valid file counts."""
+        return {
+            'total': self.total,
+            'corrupted': self.corrupted,
+            'valid': self.total - self.corrupted
+        }
+
+    def failed_paths(self) -> List[Path]:
+        """Failed files in path order."""
+        return sorted(self.failures, key=str)
+
+    def get_error_codes(self) -> Dict[str, Dict[str, Any]]:
+        """Files per error code, most severe codes first, then most common."""
+        return dict(sorted(
+            self.error_codes.items(),
+            key=lambda item: (SEVERITIES.index(item[1]['severity']), -item[1]['files'], item[0])
+        ))
+
+    def get_duplicate_groups(self) -> List[Dict[str, Any]]:
+        """Duplicate groups ordered by representative, each with sorted duplicates."""
+        return [
+            {**group, 'duplicates': sorted(group['duplicates'])}
+            for _, group in sorted(self.duplicate_groups.items())
+        ]
 
 
 class ReportStats:
@@ -17,21 +175,15 @@ class ReportStats:
     def group_corrupted_by_course(
         results: VerificationResults,
         root_dir: Path
-    ) -> Dict[str, List[Tuple[Path, str]]]:
+    ) -> Dict[str, Sequence[Tuple[Path, str]]]:
         """Group corrupted files by course."""
-        corrupted_by_course = defaultdict(list)
-        for video_path, (is_valid, error_msg, _) in results.items():
-            if not is_valid:
-                course = FileScanner.get_course_name(video_path, root_dir)
-                corrupted_by_course[course].append((video_path, error_msg))
-
-        return corrupted_by_course
+        return ResultsAggregator.from_results(results, root_dir).corrupted_by_course
 
     @staticmethod
     def calculate_stats(results: VerificationResults) -> Dict[str, int]:
         """Calculate verification statistics."""
         total = len(results)
-        corrupted = sum(1 for is_valid, _, __ in results.values() if not is_valid)
+        corrupted = sum(1 for is_valid, *_ in results.values() if not is_valid)
         return {
             'total': total,
             'corrupted': corrupted,
@@ -49,32 +201,13 @@ class ReportStats:
     @staticmethod
     def get_non_timeout_failures(results: VerificationResults) -> List[Path]:
         """Get files that failed for reasons other than timeout."""
-        non_timeout_failures = []
-        for video_path, (is_valid, error_msg, _) in results.items():
-            if not is_valid and error_msg:
-                is_timeout = "timed out" in error_msg.lower() or "timeout" in error_msg.lower()
-                if not is_timeout:
-                    non_timeout_failures.append(video_path)
-        return sorted(non_timeout_failures)
+        return sorted(
+            video_path
+            for video_path, (is_valid, error_msg, _, details) in results.items()
+            if not is_valid and error_msg and ErrorClassifier.classify(error_msg, details) != 'timeout'
+        )
 
     @staticmethod
-    def categorize_errors(results: VerificationResults) -> Dict[str, List[Tuple[Path, str]]]:
+    def categorize_errors(results: VerificationResults) -> Dict[str, Sequence[Tuple[Path, str]]]:
         """Categorize errors by type."""
-        categories = {
-            'dts_warnings': [],
-            'severe_corruption': [],
-            'timeout': []
-        }
-
-        for video_path, (is_valid, error_msg, _) in results.items():
-            if not is_valid and error_msg:
-                error_lower = error_msg.lower()
-                if "timed out" in error_lower or "timeout" in error_lower:
-                    categories['timeout'].append((video_path, error_msg))
-                elif "non monotonically increasing dts" in error_lower:
-                    categories['dts_warnings'].append((video_path, error_msg))
-                else:
-                    categories['severe_corruption'].append((video_path, error_msg))
-
-        return categories
-
+        return ResultsAggregator.from_results(results, Path()).error_categories
@@ -0,0 +1,196 @@
+"""Streaming last-writer-wins merge and diff of reports and checkpoints."""
+
+import json
+import os
+import re
+import sqlite3
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from checkpoint_manager import CheckpointManager, VerificationResult
+from json_report_generator import JsonReportGenerator
+
+
+# JSON reports are written with their metadata object first
+REPORT_HEAD = re.compile(r'\s*\{\s*"metadata"\s*:')
+
+# Rows per executemany batch while loading
+BATCH_SIZE = 10000
+
+# Diff categories, in report order
+DIFF_CATEGORIES = ('newly_corrupted', 'newly_fixed', 'still_failing', 'disappeared')
+
+# Page cache for the merge store, in KiB (negative values are KiB for SQLite)
+CACHE_KIB = 64 * 1024
+
+OLD, NEW = 0, 1
+
+_DETAILS_ENCODER = json.JSONEncoder(separators=(',', ':'), check_circular=False)
+
+
+class ResultMerger:
+    """
+    Merges result files into a temporary SQLite store, keyed by path.
+
+    Inputs are streamed entry by entry (see JsonStream), so memory stays
+    bounded however large the reports or checkpoints are. When a path appears
+    more than once, the entry with the latest verified_at wins; entries
+    written before timestamps were recorded use their file's modification
+    time (checkpoints) or generation time (reports). Two sides (OLD and NEW)
+    can be loaded to diff one run against another. JSON reports list only
+    failed files, so the valid files their metadata counts are summed in
+    unlisted_valid (inputs are assumed to cover different files, as shards do).
+    """
+
+    def __init__(self):
+        # An empty name gives a private temporary database on disk
+        self.db = sqlite3.connect('')
+        self.db.execute("PRAGMA journal_mode=OFF")
+        self.db.execute("PRAGMA synchronous=OFF")
+        self.db.execute(f"PRAGMA cache_size=-{CACHE_KIB}")
+        self.db.execute("""
+            CREATE TABLE results (
+                side INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                verified_at REAL NOT NULL,
+                is_valid INTEGER NOT NULL,
+                error TEXT,
+                size INTEGER NOT NULL,
+                details TEXT NOT NULL,
+                PRIMARY KEY (side, path)
+            )
+        """)
+        self.complete = {OLD: False, NEW: False}
+        self.inputs = {OLD: [], NEW: []}
+        # (files, bytes) that JSON reports counted as valid without listing them
+        self.unlisted_valid = {OLD: [0, 0], NEW: [0, 0]}
+
+    def add_file(self, input_file: Path, side: int = OLD) -> None:
+        """Stream one report or checkpoint into a side."""
+        metadata = None
+        if ResultMerger.is_json_report(input_file):
+            metadata = JsonReportGenerator.read_metadata(input_file)
+            entries = JsonReportGenerator.iter_results_from_json(input_file)
+            default_time = None
+        else:
+            # Checkpoints list every verified file, so absence means "not verified"
+            entries = CheckpointManager.iter_checkpoint_entries(input_file)
+            default_time = ResultMerger._mtime(input_file)
+            self.complete[side] = True
+        self.inputs[side].append(str(input_file))
+
+        batch = []
+        listed = listed_bytes = 0
+        for video_path, (is_valid, error_msg, file_size, details) in entries:
+            listed += 1
+            listed_bytes += file_size
+            verified_at = details.get('verified_at') or default_time or 0.0
+            batch.append((side, str(video_path), verified_at, int(bool(is_valid)), error_msg,
+                          file_size, _DETAILS_ENCODER.encode(details)))
+            if len(batch) >= BATCH_SIZE:
+                self._upsert(batch)
+                batch = []
+        self._upsert(batch)
+        self.db.commit()
+        if metadata:
+            # Reports list failures only; the rest of their total were valid
+            self.unlisted_valid[side][0] += max(0, metadata.get('total_files', listed) - listed)
+            self.unlisted_valid[side][1] += max(0, metadata.get('total_size', listed_bytes) - listed_bytes)
+
+    def count(self, side: int = OLD) -> int:
+        """Number of distinct paths on a side."""
+        return self.db.execute("SELECT COUNT(*) FROM results WHERE side = ?", (side,)).fetchone()[0]
+
+    def iter_results(self, side: int = OLD) -> Iterator[Tuple[Path, VerificationResult]]:
+        """Stream merged results in path order."""
+        rows = self.db.execute(
+            "SELECT path, is_valid, error, size, details FROM results WHERE side = ? ORDER BY path", (side,)
+        )
+        for path, is_valid, error, size, details in rows:
+            yield Path(path), (bool(is_valid), error, size, json.loads(details))
+
+    def iter_diff(self, category: str) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+        """
+        Stream (path, old error, new error) for one diff category, in path order.
+
+        A file missing from the new side counts as disappeared when the new
+        side includes a checkpoint (which lists every verified file). JSON
+        reports only list failures, so then a missing file is fixed if it is
+        still on disk, and disappeared otherwise.
+        """
+        self._index_failures()
+        if category in ('newly_corrupted', 'still_failing'):
+            condition = "o.path IS NULL OR o.is_valid = 1" if category == 'newly_corrupted' else "o.is_valid = 0"
+            rows = self.db.execute(f"""
+                SELECT n.path, o.error, n.error FROM results n
+                LEFT JOIN results o ON o.side = {OLD} AND o.path = n.path
+                WHERE n.side = {NEW} AND n.is_valid = 0 AND ({condition})
+                ORDER BY n.path
+            """)
+            yield from rows
+            return
+
+        if category == 'newly_fixed':
+            rows = self.db.execute(f"""
+                SELECT o.path, o.error, NULL FROM results o
+                JOIN results n ON n.side = {NEW} AND n.path = o.path
+                WHERE o.side = {OLD} AND o.is_valid = 0 AND n.is_valid = 1
+                ORDER BY o.path
+            """)
+            yield from rows
+            if self.complete[NEW]:
+                return
+
+        # Only failures are relevant when the new side is reports only
+        failing_only = "" if self.complete[NEW] else "AND o.is_valid = 0"
+        rows = self.db.execute(f"""
+            SELECT o.path, o.error FROM results o
+            LEFT JOIN results n ON n.side = {NEW} AND n.path = o.path
+            WHERE o.side = {OLD} AND n.path IS NULL {failing_only}
+            ORDER BY o.path
+        """)
+        for path, old_error in rows:
+            gone = self.complete[NEW] or not os.path.exists(path)
+            if (category == 'disappeared') == gone:
+                yield path, old_error, None
+
+    def close(self) -> None:
+        """Discard the temporary store."""
+        self.db.close()
+
+    def _index_failures(self) -> None:
+        """Index failures once loading is done, so diffs start from the failing side."""
+        self.db.execute("CREATE INDEX IF NOT EXISTS failures ON results (side, is_valid, path)")
+
+    def _upsert(self, batch: List[tuple]) -> None:
+        """Insert rows, keeping the newer entry for paths already present."""
+        self.db.executemany("""
+            INSERT INTO results (side, path, verified_at, is_valid, error, size, details)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (side, path) DO UPDATE SET
+                verified_at = excluded.verified_at,
+                is_valid = excluded.is_valid,
+                error = excluded.error,
+                size = excluded.size,
+                details = excluded.details
+            WHERE excluded.verified_at >= results.verified_at
+        """, batch)
+
+    @staticmethod
+    def is_json_report(input_file: Path) -> bool:
+        """Tell a JSON report (which starts with its metadata) from a checkpoint snapshot."""
+        if not input_file.exists():
+            return False  # A checkpoint may exist only as its journal
+        with open(input_file, 'r') as f:
+            head = f.read(256)
+        return REPORT_HEAD.match(head) is not None
+
+    @staticmethod
+    def _mtime(checkpoint_file: Path) -> float:
+        """Latest write time of a checkpoint snapshot or its journal."""
+        times = [
+            path.stat().st_mtime
+            for path in (checkpoint_file, CheckpointManager.journal_path(checkpoint_file))
+            if path.exists()
+        ]
+        return max(times, default=0.0)
@@ -0,0 +1,241 @@
+"""Compact, disk-backed mapping of verification results."""
+
+import json
+import os
+import tempfile
+from array import array
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterable, Iterator, MutableMapping as MutableMappingType
+from typing import Optional, Tuple
+
+from error_taxonomy import ErrorTaxonomy
+
+
+VerificationResult = Tuple[bool, Optional[str], int, Dict[str, Any]]
+VerificationResults = MutableMappingType[Path, VerificationResult]
+
+# Status byte flags
+INVALID = 1
+DELETED = 2
+
+# Error-code column value for files without error records
+NO_CODE = 0xFFFF
+
+_CODES = ErrorTaxonomy.known_codes()
+_CODE_INDEX = {code: index for index, code in enumerate(_CODES)}
+
+# Initial hash index slots (a power of two); the index is rebuilt when rows, deleted ones
+# included, fill 2/3 of it
+INITIAL_SLOTS = 1024
+
+
+class ResultStore(MutableMapping):
+    """
+    Dict-like store of results (path -> (is_valid, error, size, details)).
+
+    Per file it keeps only fixed-width columns in arrays: status byte, size,
+    decode time, worst error code, directory index, name and spill offsets,
+    and path hash (43 bytes). File names are packed into one bytearray and
+    each parent directory string is stored once. Error text and details are
+    spilled to an anonymous temporary file, created on the first write, and
+    read back on access, so memory does not grow with error length. Paths
+    are found through an open-addressing hash index over those columns,
+    which adds 12-24 bytes per file. Call close() to delete the spill file.
+    """
+
+    __slots__ = ('_status', '_size', '_elapsed', '_code', '_dir', '_name_start', '_names', '_spill_offset',
+                 '_hash', '_dirs', '_dir_index', '_slots', '_live', '_spill', '_spill_end')
+
+    def __init__(self):
+        self._status = bytearray()
+        self._size = array('q')
+        self._elapsed = array('f')
+        self._code = array('H')
+        self._dir = array('I')
+        self._name_start = array('Q')
+        self._names = bytearray()
+        self._spill_offset = array('Q')
+        self._hash = array('q')
+        self._dirs: list = []
+        self._dir_index: Dict[str, int] = {}
+        self._slots = array('q', [0]) * INITIAL_SLOTS  # row + 1, 0 = empty
+        self._live = 0
+        self._spill = None
+        self._spill_end = 0
+
+    @staticmethod
+    def from_items(items: Iterable[Tuple[Path, VerificationResult]]) -> 'ResultStore':
+        """Build a store from (path, result) pairs; later pairs replace earlier ones."""
+        store = ResultStore()
+        for video_path, result in items:
+            store[video_path] = result
+        return store
+
+    def __len__(self) -> int:
+        return self._live
+
+    def __contains__(self, video_path: object) -> bool:
+        return self._live_row(video_path) is not None
+
+    def __getitem__(self, video_path: Path) -> VerificationResult:
+        row = self._live_row(video_path)
+        if row is None:
+            raise KeyError(video_path)
+        return self._read(row)
+
+    def __setitem__(self, video_path: Path, result: VerificationResult) -> None:
+        is_valid, error_msg, file_size, details = result
+        path = os.fspath(video_path)
+        spill_offset = self._write_spill(error_msg, details)
+        slot, row = self._find(path)
+
+        if row is None:
+            row = self._append_row(path)
+            self._slots[slot] = row + 1
+            self._live += 1
+        elif self._status[row] & DELETED:
+            self._live += 1
+
+        records = details.get('errors') or []
+        worst = min((_CODE_INDEX.get(record['code'], NO_CODE) for record in records), default=NO_CODE)
+        self._status[row] = 0 if is_valid else INVALID
+        self._size[row] = file_size
+        self._elapsed[row] = details.get('elapsed', 0.0)
+        self._code[row] = worst
+        self._spill_offset[row] = spill_offset
+        if len(self._status) * 3 > len(self._slots) * 2:
+            self._rehash()
+
+    def __delitem__(self, video_path: Path) -> None:
+        row = self._live_row(video_path)
+        if row is None:
+            raise KeyError(video_path)
+        self._status[row] |= DELETED  # Row and index slot stay until the next rehash; a later insert reuses them
+        self._live -= 1
+
+    def __iter__(self) -> Iterator[Path]:
+        for row in range(len(self._status)):
+            if not self._status[row] & DELETED:
+                yield Path(self._path(row))
+
+    def close(self) -> None:
+        """Delete the spill file."""
+        if self._spill:
+            self._spill.close()
+
+    def failed_paths(self, codes: Optional[Collection[str]] = None) -> Iterator[Path]:
+        """Failed files, optionally only those whose worst error code is in codes."""
+        wanted = {_CODE_INDEX[code] for code in codes} if codes else None
+        for row in range(len(self._status)):
+            if self._status[row] == INVALID and (wanted is None or self._code[row] in wanted):
+                yield Path(self._path(row))
+
+    def total_size(self) -> int:
+        """Sum of file sizes."""
+        return sum(size for row, size in enumerate(self._size) if not self._status[row] & DELETED)
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held in memory by the columns, names and index."""
+        columns = (self._size, self._elapsed, self._code, self._dir, self._name_start,
+                   self._spill_offset, self._hash, self._slots)
+        return (len(self._status) + len(self._names) + sum(len(column) * column.itemsize for column in columns)
+                + sum(len(directory) for directory in self._dirs))
+
+    def _live_row(self, video_path: object) -> Optional[int]:
+        """Row of a path that is present and not deleted."""
+        row = self._find(os.fspath(video_path))[1]
+        return None if row is None or self._status[row] & DELETED else row
+
+    def _find(self, path: str) -> Tuple[int, Optional[int]]:
+        """(slot, row) for a path, deleted or not; the slot is where it would be inserted if absent."""
+        path_hash = hash(path)
+        mask = len(self._slots) - 1
+        slot = path_hash & mask
+        while True:
+            entry = self._slots[slot]
+            if entry == 0:
+                return slot, None
+            row = entry - 1
+            if self._hash[row] == path_hash and self._path(row) == path:
+                return slot, row
+            slot = (slot + 1) & mask
+
+    def _append_row(self, path: str) -> int:
+        """Add columns for a new path and return its row."""
+        directory, name = os.path.split(path)
+        dir_index = self._dir_index.get(directory)
+        if dir_index is None:
+            dir_index = self._dir_index[directory] = len(self._dirs)
+            self._dirs.append(directory)
+
+        self._status.append(0)
+        self._size.append(0)
+        self._elapsed.append(0.0)
+        self._code.append(NO_CODE)
+        self._dir.append(dir_index)
+        self._name_start.append(len(self._names))
+        self._names += os.fsencode(name)
+        self._spill_offset.append(0)
+        self._hash.append(hash(path))
+        return len(self._status) - 1
+
+    def _path(self, row: int) -> str:
+        """Rebuild a row's path string."""
+        return os.path.join(self._dirs[self._dir[row]], os.fsdecode(self._name(row)))
+
+    def _name(self, row: int) -> bytes:
+        """A row's encoded file name."""
+        end = self._name_start[row + 1] if row + 1 < len(self._name_start) else len(self._names)
+        return bytes(self._names[self._name_start[row]:end])
+
+    def _rehash(self) -> None:
+        """
+        Rebuild the hash index, dropping deleted rows first.
+
+        Deleted rows occupy index slots as tombstones, so the load counts
+        them too. After compacting, the index doubles unless it would be at
+        most a third full, so insert/delete churn cannot fill it.
+        """
+        if self._live < len(self._status):
+            self._compact()
+        size = len(self._slots) if len(self._status) * 3 <= len(self._slots) else len(self._slots) * 2
+        self._slots = array('q', [0]) * size
+        mask = size - 1
+        for row, path_hash in enumerate(self._hash):
+            slot = path_hash & mask
+            while self._slots[slot]:
+                slot = (slot + 1) & mask
+            self._slots[slot] = row + 1
+
+    def _compact(self) -> None:
+        """Remove deleted rows from the columns (their spilled records stay in the file)."""
+        keep = [row for row, status in enumerate(self._status) if not status & DELETED]
+        names = bytearray()
+        name_start = array('Q')
+        for row in keep:
+            name_start.append(len(names))
+            names += self._name(row)
+        self._names = names
+        self._name_start = name_start
+        self._status = bytearray(self._status[row] for row in keep)
+        for column in ('_size', '_elapsed', '_code', '_dir', '_spill_offset', '_hash'):
+            values = getattr(self, column)
+            setattr(self, column, array(values.typecode, (values[row] for row in keep)))
+
+    def _write_spill(self, error_msg: Optional[str], details: Dict[str, Any]) -> int:
+        """Append error text and details to the spill file, returning the record offset."""
+        record = json.dumps([error_msg, details], separators=(',', ':')).encode('utf-8') + b'\n'
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile()
+        offset = self._spill_end
+        self._spill.seek(offset)
+        self._spill.write(record)
+        self._spill_end += len(record)
+        return offset
+
+    def _read(self, row: int) -> VerificationResult:
+        """Assemble a row's result from its columns and spilled record."""
+        self._spill.seek(self._spill_offset[row])
+        error_msg, details = json.loads(self._spill.readline())
+        return (not self._status[row] & INVALID, error_msg, self._size[row], details)
@@ -0,0 +1,124 @@
+"""Escalating in-run retries of timed-out and transiently failing files."""
+
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from error_taxonomy import ErrorTaxonomy
+
+
+# Error codes worth retrying with --retry-transient (flaky disks and network mounts)
+TRANSIENT_CODES = ('io_error',)
+
+# Recovered files listed in the run statistics, by total verification time
+RECOVERED_LISTED = 20
+
+
+class RetryPolicy:
+    """
+    Decides which failed files go back in the queue, and with what timeout.
+
+    A timed-out file (and, if transient is set, one that failed with an I/O
+    error) is queued again behind every first attempt, with the next timeout
+    of the ladder, until it passes or the ladder is used up. Retries replace
+    adaptive timeouts with the ladder's. At most max_running retries verify
+    at once, so long retries cannot take every worker from files still being
+    discovered or not yet tried.
+    """
+
+    def __init__(self, timeouts: Sequence[float], transient: bool = False, max_running: int = 1):
+        self.timeouts = list(timeouts)
+        self.transient = transient
+        self.max_running = max(1, max_running)
+        self.running = 0
+        self.attempts: Dict[Path, int] = {}
+        self.spent: Dict[Path, float] = {}
+        self.retries = 0
+        self.recovered: Counter = Counter()
+        self.exhausted = 0
+        self.retry_seconds = 0.0
+        self.recovered_files: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def check_timeouts(timeouts: Sequence[float], base_timeout: float) -> Optional[str]:
+        """
+        Why a ladder is unusable, or None when each step is longer than the last.
+
+        base_timeout is the longest a first attempt may run: -t, or the
+        ceiling when timeouts are adaptive.
+        """
+        previous = base_timeout
+        for timeout in timeouts:
+            if timeout <= previous:
+                return (f"retry timeouts must increase and be longer than the {base_timeout:g} second "
+                        f"first-attempt timeout, got {', '.join(f'{step:g}' for step in timeouts)}")
+            previous = timeout
+        return None
+
+    def attempt(self, video_path: Path) -> int:
+        """Attempt number of a file's next (or current) verification, from 1."""
+        return self.attempts.get(video_path, 1)
+
+    def options(self, video_path: Path) -> Dict[str, Any]:
+        """Per-file verification options for a dispatched file: the ladder timeout for a retry."""
+        attempt = self.attempt(video_path)
+        if attempt == 1:
+            return {}
+        self.running += 1
+        return {'timeout': self.timeouts[attempt - 2]}
+
+    def record(self, video_path: Path, is_valid: bool, error_msg: Optional[str], details: Dict[str, Any]) -> bool:
+        """
+        Record a finished attempt; True when the file should be queued again.
+
+        The final attempt of a retried file adds attempt and total_elapsed
+        (seconds across all attempts) to details.
+        """
+        attempt = self.attempt(video_path)
+        elapsed = details.get('elapsed', 0.0)
+        spent = self.spent.pop(video_path, 0.0) + elapsed
+        if attempt > 1:
+            self.running = max(0, self.running - 1)
+            self.retry_seconds += elapsed
+
+        if not is_valid and attempt <= len(self.timeouts) and self._retryable(error_msg, details):
+            self.attempts[video_path] = attempt + 1
+            self.spent[video_path] = spent
+            self.retries += 1
+            return True
+
+        self.attempts.pop(video_path, None)
+        if attempt > 1:
+            details['attempt'] = attempt
+            details['total_elapsed'] = round(spent, 3)
+            if is_valid:
+                self.recovered[attempt] += 1
+                self.recovered_files.append({'file': str(video_path), 'attempt': attempt, 'seconds': round(spent, 1)})
+            else:
+                self.exhausted += 1
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Summarise the retries for the final report."""
+        slowest = sorted(self.recovered_files, key=lambda entry: -entry['seconds'])[:RECOVERED_LISTED]
+        return {
+            'timeouts': " -> ".join(f"{timeout:g}s" for timeout in self.timeouts),
+            'transient_errors': self.transient,
+            'retries': self.retries,
+            'recovered': sum(self.recovered.values()),
+            'recovered_by_attempt': ", ".join(
+                f"attempt {attempt}: {count}" for attempt, count in sorted(self.recovered.items())
+            ) or 'none',
+            'still_failing': self.exhausted,
+            'retry_seconds': round(self.retry_seconds, 1),
+            'recovered_files': slowest
+        }
+
+    def _retryable(self, error_msg: Optional[str], details: Dict[str, Any]) -> bool:
+        """Timeouts, and transient errors when enabled."""
+        if details.get('timed_out'):
+            return True
+        if not self.transient:
+            return False
+        codes = ErrorTaxonomy.codes(ErrorTaxonomy.records_for(error_msg, details))
+        return any(code in TRANSIENT_CODES for code in codes)
@@ -0,0 +1,65 @@
+"""Deterministic sharding of a library across hosts."""
+
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from file_scanner import FileScanner, ScannedFile
+
+
+class ShardPlanner:
+    """
+    Splits scanned files into N shards without coordination.
+
+    A file's shard depends only on a stable hash of its path relative to the
+    library root, never on the other files. So hosts whose scans differ
+    slightly (a download in progress, a mount that came up late) still agree
+    on every file they both see, and no file falls between shards. Relative
+    paths keep the plan identical when hosts mount the share at different
+    locations. Shards are balanced by file count in expectation; bytes
+    balance too once a library holds many files.
+    """
+
+    @staticmethod
+    def shard_of(video_path: Path, root_dir: Path, count: int) -> int:
+        """0-based shard of a file."""
+        return int(ShardPlanner._stable_hash(video_path, root_dir), 16) % count
+
+    @staticmethod
+    def assign(scanned_files: Iterable[ScannedFile], root_dir: Path, count: int) -> List[List[ScannedFile]]:
+        """Partition files into count shards."""
+        shards: List[List[ScannedFile]] = [[] for _ in range(count)]
+        for scanned in scanned_files:
+            shards[ShardPlanner.shard_of(scanned.path, root_dir, count)].append(scanned)
+        return shards
+
+    @staticmethod
+    def select(
+        scanned_files: Iterable[ScannedFile],
+        root_dir: Path,
+        shard: Tuple[int, int]
+    ) -> Tuple[List[ScannedFile], Dict[str, Any]]:
+        """
+        Return this host's files for shard (index, count), index being 1-based.
+
+        Returns:
+            Tuple of (files in the shard, statistics about the split)
+        """
+        index, count = shard
+        all_files = list(scanned_files)
+        selected = ShardPlanner.assign(all_files, root_dir, count)[index - 1]
+        stats = {
+            'shard': f"{index}/{count}",
+            'files': len(selected),
+            'total_files': len(all_files),
+            'bytes': sum(scanned.size for scanned in selected),
+            'total_bytes': sum(scanned.size for scanned in all_files)
+        }
+        return selected, stats
+
+    @staticmethod
+    def _stable_hash(video_path: Path, root_dir: Path) -> str:
+        """Host-independent hash of a file's path within the library."""
+        relative = FileScanner.relative_path(video_path, root_dir)
+        return hashlib.sha1(relative.as_posix().encode('utf-8')).hexdigest()
+
@@ -3,58 +3,58 @@
 import signal
 import sys
 import atexit
-from pathlib import Path
 from typing import Optional
-from multiprocessing import Pool
 
-from checkpoint_manager import CheckpointManager, VerificationResults
+from checkpoint_manager import CheckpointJournal
 
 
 class InterruptHandler:
     """Handle interruption signals and cleanup."""
 
     def __init__(self):
-        self.checkpoint_file: Optional[Path] = None
-        self.results: Optional[VerificationResults] = None
-        self.pool: Optional[Pool] = None
-
-    def setup(
-        self,
-        checkpoint_file: Optional[Path],
-        results: VerificationResults
-    ) -> None:
+        self.checkpoint: Optional[CheckpointJournal] = None
+        self.engine = None
+        self.interrupted = False
+
+    def setup(self, checkpoint: Optional[CheckpointJournal]) -> None:
         """Setup signal handlers."""
-        self.checkpoint_file = checkpoint_file
-        self.results = results
+        self.checkpoint = checkpoint
 
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
         atexit.register(self._cleanup)
 
-    def set_pool(self, pool: Optional[Pool]) -> None:
-        """Set the multiprocessing pool reference."""
-        self.pool = pool
+    def set_engine(self, engine) -> None:
+        """Set the verification engine (see verification_engines) to stop on interrupt."""
+        self.engine = engine
 
     def _signal_handler(self, signum, frame) -> None:
         """Handle interrupt signals."""
-        print("\n\nInterrupted! Saving checkpoint before exit...")
-        self._save_checkpoint()
-        self._terminate_pool()
+        if self.interrupted:
+            return  # Repeated signal (e.g. Ctrl-C reaching the whole process group) while shutting down
+        self.interrupted = True
+        print("\n\nInterrupted!")
+        self._terminate_engine()
+        # The run closes the journal as it unwinds; the main thread may be writing to it right now
+        raise KeyboardInterrupt
+
+    def exit_interrupted(self) -> None:
+        """Exit after an interrupt, once the run has closed the checkpoint journal."""
+        if self.checkpoint:
+            print(f"Checkpoint saved to: {self.checkpoint.checkpoint_file}")
+            print("You can resume with: --resume -c <checkpoint_file>")
         sys.exit(130)
 
     def _cleanup(self) -> None:
         """Cleanup handler for atexit."""
-        self._save_checkpoint()
+        self._sync_checkpoint()
 
-    def _save_checkpoint(self) -> None:
-        """Save checkpoint if configured."""
-        if self.checkpoint_file and self.results:
-            CheckpointManager.save_checkpoint(self.checkpoint_file, self.results)
-            print(f"Checkpoint saved to: {self.checkpoint_file}")
-            print("You can resume with: --resume -c <checkpoint_file>")
+    def _sync_checkpoint(self) -> None:
+        """Flush journaled results; each completed file is already on disk."""
+        if self.checkpoint:
+            self.checkpoint.close()
 
-    def _terminate_pool(self) -> None:
-        """Terminate multiprocessing pool."""
-        if self.pool:
-            self.pool.terminate()
-            self.pool.join()
+    def _terminate_engine(self) -> None:
+        """Stop running verifications, killing their ffmpeg processes."""
+        if self.engine:
+            self.engine.terminate()
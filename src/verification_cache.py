@@ -0,0 +1,197 @@
+"""Persistent cross-run verification cache."""
+
+import hashlib
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from checkpoint_manager import VerificationResults
+from file_scanner import FileScanner, ScannedFile
+
+
+CacheKey = Tuple[int, int, int, int, str]
+
+# Outcomes that say more about the run than about the file are never cached
+TRANSIENT_ERROR_MARKERS = ('timed out', 'timeout', 'ffmpeg not found', 'unexpected error', 'does not exist')
+
+# Results added during a run are committed in batches of this many, so an interrupted run keeps most of its work
+COMMIT_EVERY = 20
+
+
+class VerificationCache:
+    """SQLite-backed store of verification outcomes keyed by file identity."""
+
+    HASH_BLOCK_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        cache_file: Path,
+        ffmpeg_version: str,
+        mode: str,
+        use_partial_hash: bool = False
+    ):
+        self.cache_file = cache_file
+        self.ffmpeg_version = ffmpeg_version
+        self.mode = mode
+        self.use_partial_hash = use_partial_hash
+        self.hits = 0
+        self.misses = 0
+        self._pending_keys: Dict[Path, CacheKey] = {}
+        self._pending_rows: List[Tuple[Any, ...]] = []
+        # Lookups may run on the thread that consumes a streaming scan
+        self._conn = sqlite3.connect(str(cache_file), check_same_thread=False)
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        """Create cache table if it does not exist yet."""
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                device INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                partial_hash TEXT NOT NULL,
+                path TEXT NOT NULL,
+                ffmpeg_version TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                is_valid INTEGER NOT NULL,
+                error TEXT,
+                details TEXT NOT NULL,
+                PRIMARY KEY (device, inode, size, mtime_ns, partial_hash, mode)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_path ON results (path)")
+        self._conn.commit()
+
+    def lookup(self, scanned: ScannedFile) -> Optional[Tuple[bool, Optional[str], int, Dict[str, Any]]]:
+        """Return cached result for an unchanged file, or None on a miss."""
+        key = self._file_key(scanned)
+        if key is None:
+            self.misses += 1
+            return None
+
+        row = self._conn.execute(
+            "SELECT is_valid, error, details FROM results "
+            "WHERE device = ? AND inode = ? AND size = ? AND mtime_ns = ? AND partial_hash = ? "
+            "AND ffmpeg_version = ? AND mode = ?",
+            (*key, self.ffmpeg_version, self.mode)
+        ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            self._pending_keys[scanned.path] = key
+            return None
+
+        self.hits += 1
+        details = json.loads(row[2])
+        details['cached'] = True
+        return (bool(row[0]), row[1], key[2], details)
+
+    def filter_uncached(
+        self,
+        video_files: Iterable[ScannedFile],
+        cached_results: VerificationResults
+    ) -> Iterator[ScannedFile]:
+        """Yield files needing verification, collecting cache hits into cached_results."""
+        for scanned in video_files:
+            result = self.lookup(scanned)
+            if result is None:
+                yield scanned
+            else:
+                cached_results[scanned.path] = result
+
+    def add(self, video_path: Path, result: Tuple[bool, Optional[str], int, Dict[str, Any]]) -> None:
+        """Record one freshly verified result, skipping transient failures; commits every COMMIT_EVERY rows."""
+        is_valid, error_msg, _, details = result
+        if not VerificationCache._is_cacheable(is_valid, error_msg):
+            return
+        key = self._pending_keys.pop(video_path, None) or self._file_key(FileScanner.describe(video_path))
+        if key is not None:
+            self._pending_rows.append((*key, str(video_path), self.ffmpeg_version, self.mode,
+                                       int(is_valid), error_msg, json.dumps(details)))
+        if len(self._pending_rows) >= COMMIT_EVERY:
+            self.flush()
+
+    def store_results(self, results: VerificationResults) -> None:
+        """Record several freshly verified results and commit them."""
+        for video_path, result in results.items():
+            self.add(video_path, result)
+        self.flush()
+
+    def flush(self) -> None:
+        """Commit results added since the last commit."""
+        if not self._pending_rows:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self._pending_rows
+        )
+        self._conn.commit()
+        self._pending_rows = []
+
+    def prune(self) -> int:
+        """Evict entries for files that were deleted or changed on disk, or verified by another ffmpeg build."""
+        removed = self._conn.execute(
+            "DELETE FROM results WHERE ffmpeg_version != ?", (self.ffmpeg_version,)
+        ).rowcount
+        stale = []
+        for rowid, path, device, inode, size, mtime_ns in self._conn.execute(
+            "SELECT rowid, path, device, inode, size, mtime_ns FROM results"
+        ):
+            try:
+                st = os.stat(path)
+            except OSError:
+                stale.append((rowid,))
+                continue
+            if (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns) != (device, inode, size, mtime_ns):
+                stale.append((rowid,))
+
+        self._conn.executemany("DELETE FROM results WHERE rowid = ?", stale)
+        self._conn.commit()
+        self._conn.execute("VACUUM")
+        return removed + len(stale)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return hit/miss counters for this run."""
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def close(self) -> None:
+        """Commit pending results and close the underlying database connection."""
+        self.flush()
+        self._conn.close()
+
+    def _file_key(self, scanned: ScannedFile) -> Optional[CacheKey]:
+        """Build identity key from scanned metadata (and optional partial hash)."""
+        if not scanned.inode and not scanned.mtime_ns:
+            return None  # File could not be stat'ed
+
+        partial_hash = ''
+        if self.use_partial_hash:
+            try:
+                partial_hash = VerificationCache._partial_hash(scanned.path, scanned.size)
+            except OSError:
+                return None
+        return (scanned.device, scanned.inode, scanned.size, scanned.mtime_ns, partial_hash)
+
+    @staticmethod
+    def _partial_hash(video_path: Path, file_size: int) -> str:
+        """Hash the first and last blocks of the file."""
+        block = VerificationCache.HASH_BLOCK_SIZE
+        digest = hashlib.sha1()
+        with open(video_path, 'rb') as f:
+            digest.update(f.read(block))
+            if file_size > block:
+                f.seek(max(block, file_size - block))
+                digest.update(f.read(block))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _is_cacheable(is_valid: bool, error_msg: Optional[str]) -> bool:
+        """Check whether a result reflects the file rather than the run."""
+        if is_valid or not error_msg:
+            return True
+        error_lower = error_msg.lower()
+        return not any(marker in error_lower for marker in TRANSIENT_ERROR_MARKERS)
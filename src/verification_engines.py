@@ -0,0 +1,153 @@
+"""Execution engines that run verifications concurrently."""
+
+import asyncio
+import signal
+import threading
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Any, Callable, Dict, Set
+from concurrent.futures import Future
+
+from video_verifier import VideoVerifier
+
+
+ENGINES = ('pool', 'asyncio')
+
+ResultCallback = Callable[[tuple], None]
+ErrorCallback = Callable[[BaseException], None]
+
+
+class PoolEngine:
+    """
+    One worker process per concurrent verification.
+
+    Each worker is a full interpreter that blocks on its ffmpeg child.
+    """
+
+    def __init__(self, num_workers: int):
+        self.pool = Pool(processes=num_workers, initializer=PoolEngine._init_worker)
+        self.terminated = False
+
+    def submit(
+        self,
+        video_path: Path,
+        options: Dict[str, Any],
+        callback: ResultCallback,
+        error_callback: ErrorCallback
+    ) -> None:
+        """Start verifying a file; a callback receives the verify_video tuple."""
+        self.pool.apply_async(
+            VideoVerifier.verify_video, (video_path,), options,
+            callback=callback, error_callback=error_callback
+        )
+
+    def terminate(self) -> None:
+        """Stop the workers, abandoning any verification still running."""
+        if self.terminated:
+            return
+        self.terminated = True
+        self.pool.terminate()
+        self.pool.join()
+
+    def __enter__(self) -> 'PoolEngine':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.terminate()
+
+    @staticmethod
+    def _init_worker() -> None:
+        """Leave interrupt handling (and checkpoint flushing) to the main process."""
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+
+class AsyncioEngine:
+    """
+    Runs every ffmpeg child from the main process on an asyncio event loop.
+
+    The loop lives in a background thread so the dispatch loop, checkpoint and
+    signal handling stay unchanged. Concurrency is bounded by a semaphore, so
+    a high limit costs one ffmpeg process per slot and no extra interpreters.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.loop = asyncio.new_event_loop()
+        self.futures: Set[Future] = set()
+        self.lock = threading.RLock()  # Reentrant: terminate() may run in a signal handler
+        self.terminated = False
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def submit(
+        self,
+        video_path: Path,
+        options: Dict[str, Any],
+        callback: ResultCallback,
+        error_callback: ErrorCallback
+    ) -> None:
+        """Start verifying a file; a callback receives the verify_video tuple."""
+        future = asyncio.run_coroutine_threadsafe(self._verify(video_path, options), self.loop)
+        with self.lock:
+            self.futures.add(future)
+        future.add_done_callback(lambda done: self._finished(done, callback, error_callback))
+
+    def terminate(self) -> None:
+        """Cancel running verifications (killing their ffmpeg children) and stop the loop."""
+        if self.terminated:
+            return
+        self.terminated = True
+        with self.lock:
+            pending = list(self.futures)
+        for future in pending:
+            future.cancel()
+
+        asyncio.run_coroutine_threadsafe(self._drain(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+    def __enter__(self) -> 'AsyncioEngine':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.terminate()
+
+    def _run_loop(self) -> None:
+        """Event loop thread body."""
+        asyncio.set_event_loop(self.loop)
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.loop.call_soon(self._ready.set)
+        self.loop.run_forever()
+
+    async def _verify(self, video_path: Path, options: Dict[str, Any]) -> tuple:
+        """Verify one file once a concurrency slot is free."""
+        async with self.semaphore:
+            return await VideoVerifier.verify_video_async(video_path, **options)
+
+    async def _drain(self) -> None:
+        """Wait for cancelled tasks to finish killing and reaping their children."""
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _finished(self, future: Future, callback: ResultCallback, error_callback: ErrorCallback) -> None:
+        """Route a finished verification to the caller's callbacks."""
+        with self.lock:
+            self.futures.discard(future)
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            error_callback(error)
+        else:
+            callback(future.result())
+
+
+def create_engine(engine: str, num_workers: int):
+    """Create the named engine with the given concurrency."""
+    if engine == 'asyncio':
+        return AsyncioEngine(num_workers)
+    return PoolEngine(num_workers)
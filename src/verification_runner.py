@@ -1,13 +1,31 @@
 """Parallel verification execution."""
 
+import queue
+import threading
+import time
 from pathlib import Path
-from typing import List
-from multiprocessing import Pool
-from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from video_verifier import VideoVerifier
-from checkpoint_manager import CheckpointManager, VerificationResults
+from checkpoint_manager import CheckpointJournal, VerificationResults
 from progress_tracker import ProgressTracker
+from job_scheduler import JobScheduler
+from adaptive_timeout import AdaptiveTimeout
+from autotuner import Autotuner
+from device_scheduler import DeviceScheduler
+from file_scanner import FileScanner, ScannedFile
+from report_stats import ResultsAggregator
+from metrics import MetricsCollector
+from result_store import ResultStore, VerificationResult
+from retry_policy import RetryPolicy
+from verification_engines import create_engine
+from mp4_structure import Mp4StructureChecker
+from video_verifier import VideoVerifier
+
+
+# Events delivered to the dispatch loop
+FILE_DISCOVERED = 'file'
+SCAN_FINISHED = 'scan_finished'
+VERIFIED = 'verified'
 
 
 class VerificationRunner:
@@ -15,70 +33,289 @@ class VerificationRunner:
 
     @staticmethod
     def run_parallel_verification(
-        video_files: List[Path],
+        video_files: Iterable[ScannedFile],
         num_workers: int,
-        checkpoint_file: Path,
+        checkpoint: Optional[CheckpointJournal],
         interrupt_handler,
-        timeout: int = 300
+        verify_options: Optional[Dict[str, Any]] = None,
+        schedule: str = 'sorted',
+        run_stats: Optional[Dict[str, Any]] = None,
+        adaptive_timeout: Optional[AdaptiveTimeout] = None,
+        engine: str = 'pool',
+        autotuner: Optional[Autotuner] = None,
+        per_device_jobs: Optional[int] = None,
+        device_limits: Optional[Dict[str, int]] = None,
+        aggregator: Optional[ResultsAggregator] = None,
+        metrics: Optional[MetricsCollector] = None,
+        on_result: Optional[Callable[[Path, VerificationResult], None]] = None,
+        split_size: Optional[int] = None,
+        max_segments: int = 1,
+        retry_policy: Optional[RetryPolicy] = None
     ) -> VerificationResults:
-        """Run parallel verification of video files."""
-        actual_workers = min(num_workers, len(video_files))
-        tracker = ProgressTracker(len(video_files))
-        results = {}
-
-        with Pool(processes=actual_workers) as pool:
-            interrupt_handler.set_pool(pool)
-            results = VerificationRunner._process_videos(
-                pool, video_files, tracker, checkpoint_file, interrupt_handler, timeout
-            )
-            interrupt_handler.set_pool(None)
+        """
+        Run parallel verification of video files.
+
+        video_files may be a list, or an iterator (e.g. a streaming scan) that is
+        consumed in the background while earlier files are already verifying.
+        engine selects how verifications run: 'pool' (worker processes) or
+        'asyncio' (ffmpeg children of this process). With an autotuner,
+        num_workers is only the engine's capacity and the tuner decides how
+        many verifications run at once. per_device_jobs and device_limits
+        (path prefix -> cap) switch to per-device queues served round-robin.
+        Results are also fed to aggregator, metrics and on_result as they
+        complete, if given. An endless iterator (watch mode) runs until interrupted.
+        Files of at least split_size bytes are decoded in up to max_segments
+        concurrent time segments, each taking one of the num_workers slots.
+        With a retry_policy, timed-out files are queued again with longer
+        timeouts and only their final attempt is recorded.
+        """
+        is_list = isinstance(video_files, list)
+        if autotuner:
+            num_workers = autotuner.max_workers
+        actual_workers = min(num_workers, len(video_files)) if is_list else num_workers
+        tracker = ProgressTracker(
+            len(video_files) if is_list else None,
+            sum(scanned.size for scanned in video_files) if is_list else 0
+        )
+        device_scheduler = None
+        scheduler = JobScheduler(schedule)
+        if per_device_jobs or device_limits:
+            device_scheduler = scheduler = DeviceScheduler(schedule, per_device_jobs, device_limits)
+
+        try:
+            with create_engine(engine, actual_workers) as executor:
+                interrupt_handler.set_engine(executor)
+                results = ResultStore.from_items(VerificationRunner._iter_results(
+                    executor, video_files, actual_workers, tracker, checkpoint,
+                    verify_options or {}, scheduler, adaptive_timeout, autotuner, device_scheduler, aggregator,
+                    metrics, on_result, split_size, max_segments, retry_policy
+                ))
+                interrupt_handler.set_engine(None)
+        except KeyboardInterrupt:
+            if checkpoint:
+                checkpoint.close()
+            interrupt_handler.exit_interrupted()
 
-        VerificationRunner._save_final_checkpoint(checkpoint_file, results)
+        if checkpoint:
+            checkpoint.close()
         tracker.display_final()
 
+        if run_stats is not None:
+            final_workers = min(autotuner.workers, actual_workers) if autotuner else actual_workers
+            run_stats['scheduling'] = {
+                'policy': schedule, 'engine': engine, **tracker.tail_idle_stats(final_workers)
+            }
+            if adaptive_timeout:
+                run_stats['adaptive_timeout'] = adaptive_timeout.get_stats()
+            if autotuner:
+                run_stats['autotune'] = autotuner.get_stats()
+            if device_scheduler is not None:
+                run_stats['devices'] = device_scheduler.get_stats()
+            if retry_policy:
+                run_stats['retries'] = retry_policy.get_stats()
+
         return results
 
     @staticmethod
-    def _process_videos(
-        pool: Pool,
-        video_files: List[Path],
+    def stream_verification(
+        video_files: Iterable[ScannedFile],
+        num_workers: int,
+        verify_options: Optional[Dict[str, Any]] = None,
+        schedule: str = 'sorted',
+        engine: str = 'pool',
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        cancel: Optional[threading.Event] = None,
+        split_size: Optional[int] = None,
+        max_segments: int = 1,
+        retry_policy: Optional[RetryPolicy] = None
+    ) -> Iterator[Tuple[Path, VerificationResult]]:
+        """
+        Verify files without printing, yielding (path, result) pairs as they complete.
+
+        The embeddable counterpart of run_parallel_verification (see verify_api):
+        no signal handlers, checkpoint or reports. video_files is always
+        consumed in the background, so it may still be growing while results
+        are read. Progress statistics go to on_progress. Verification stops
+        when cancel is set (from any thread) or the generator is closed; the
+        engine is terminated either way, killing running ffmpeg processes.
+        """
+        tracker = ProgressTracker(on_progress=on_progress or (lambda progress: None))
+        with create_engine(engine, num_workers) as executor:
+            yield from VerificationRunner._iter_results(
+                executor, iter(video_files), num_workers, tracker, None, verify_options or {},
+                JobScheduler(schedule), None, split_size=split_size, max_segments=max_segments,
+                retry_policy=retry_policy, cancel=cancel
+            )
+
+    @staticmethod
+    def _iter_results(
+        executor,
+        video_files: Iterable[ScannedFile],
+        max_in_flight: int,
         tracker: ProgressTracker,
-        checkpoint_file: Path,
-        interrupt_handler,
-        timeout: int
-    ) -> VerificationResults:
-        """Process all videos and track progress."""
-        results = {}
-        verify_func = partial(VideoVerifier.verify_video, timeout=timeout)
+        checkpoint: Optional[CheckpointJournal],
+        verify_options: Dict[str, Any],
+        scheduler: Union[JobScheduler, DeviceScheduler],
+        adaptive_timeout: Optional[AdaptiveTimeout],
+        autotuner: Optional[Autotuner] = None,
+        device_scheduler: Optional[DeviceScheduler] = None,
+        aggregator: Optional[ResultsAggregator] = None,
+        metrics: Optional[MetricsCollector] = None,
+        on_result: Optional[Callable[[Path, VerificationResult], None]] = None,
+        split_size: Optional[int] = None,
+        max_segments: int = 1,
+        retry_policy: Optional[RetryPolicy] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> Iterator[Tuple[Path, VerificationResult]]:
+        """
+        Process all videos and track progress, yielding each final result.
 
-        for video_path, is_valid, error_msg, file_size in pool.imap_unordered(
-            verify_func, video_files
-        ):
-            results[video_path] = (is_valid, error_msg, file_size)
-            interrupt_handler.results = results
+        Files are submitted one at a time as workers free up (rather than all at
+        once), so per-file options reflect what was learned from earlier files.
+        scheduler is a JobScheduler, or the DeviceScheduler when per-device caps
+        apply (its pop() returns None while every device with work is at its cap).
+        in_flight counts slots, one per ffmpeg process: a file split into
+        segments gets at most the slots that are free, so splitting never
+        runs more decodes than the worker limit and never leaves slots idle
+        while smaller files wait. Setting cancel stops
+        the loop within a progress refresh interval.
+        """
+        events = queue.Queue()
+        stop_feeding = threading.Event()
+        in_flight = 0
+        slots: Dict[Path, List[int]] = {}
+        generations: Dict[Path, int] = {}
+        submitted: Dict[Path, float] = {}
+        scanning = not isinstance(video_files, list)
 
-            tracker.increment()
-            tracker.display()
+        if scanning:
+            VerificationRunner._start_feeder(video_files, events, stop_feeding)
+        else:
+            scheduler.add_all(video_files)
 
-            VerificationRunner._save_periodic_checkpoint(
-                checkpoint_file, results, tracker.completed
-            )
+        try:
+            while scanning or len(scheduler) or in_flight:
+                if cancel is not None and cancel.is_set():
+                    return
+                limit = min(autotuner.workers, max_in_flight) if autotuner else max_in_flight
+                while len(scheduler) and in_flight < limit:
+                    # Cap retries so files still being discovered, or not yet tried, find workers
+                    allow_retries = not (retry_policy and retry_policy.running >= retry_policy.max_running)
+                    scanned = scheduler.pop(allow_retries)
+                    if scanned is None:
+                        break
+                    segments = min(
+                        VerificationRunner._segments_for(scanned, limit, split_size, max_segments), limit - in_flight
+                    )
+                    video_path = scanned.path
+                    options = dict(verify_options)
+                    if segments > 1:
+                        options['segments'] = segments
+                    if adaptive_timeout:
+                        options['timeout_policy'] = adaptive_timeout.policy()
+                    if autotuner:
+                        options.update(autotuner.options())
+                        generations[video_path] = autotuner.job_started()
+                    if retry_policy:
+                        retry_options = retry_policy.options(video_path)
+                        if retry_options:
+                            options.pop('timeout_policy', None)
+                            options.update(retry_options)
+                    submitted[video_path] = time.time()
+                    tracker.file_started(video_path, scanned.size)
+                    VerificationRunner._submit(executor, video_path, options, events)
+                    slots.setdefault(video_path, []).append(segments)
+                    in_flight += segments
 
-        return results
+                try:
+                    # Wake up at the refresh rate so the ETA keeps moving while large files decode
+                    event, payload = events.get(timeout=tracker.interval)
+                except queue.Empty:
+                    tracker.display(device_scheduler.format_progress() if device_scheduler is not None else None)
+                    continue
+                if event == FILE_DISCOVERED:
+                    scheduler.add(payload)
+                    tracker.add_discovered(payload.size)
+                    continue
+                if event == SCAN_FINISHED:
+                    scanning = False
+                    tracker.finish_discovery()
+                    continue
+
+                video_path, is_valid, error_msg, file_size, details = payload
+                # A watched file rewritten while verifying can be in flight twice
+                taken = slots[video_path]
+                in_flight -= taken.pop(0)
+                if not taken:
+                    del slots[video_path]
+                details['verified_at'] = round(time.time(), 3)
+                submitted_at = submitted.pop(video_path, None)
+                started_at = details.pop('started_at', None)
+                if started_at is not None and submitted_at is not None:
+                    details['queue_wait'] = round(max(0.0, started_at - submitted_at), 3)
+                if autotuner:
+                    autotuner.record(generations.pop(video_path), file_size, details)
+                if device_scheduler is not None:
+                    device_scheduler.complete(video_path, file_size)
+                if retry_policy and retry_policy.record(video_path, is_valid, error_msg, details):
+                    # Re-stat, as the file may have been replaced since it was scanned
+                    scheduler.add(FileScanner.describe(video_path), retry_policy.attempt(video_path))
+                    tracker.requeued(video_path)
+                    continue
+
+                result = (is_valid, error_msg, file_size, details)
+                if checkpoint:
+                    checkpoint.append(video_path, result)
+                if aggregator:
+                    aggregator.add(video_path, result)
+                if metrics:
+                    metrics.add(video_path, result)
+                if on_result:
+                    on_result(video_path, result)
+                if adaptive_timeout:
+                    adaptive_timeout.record(details)
+
+                tracker.increment(video_path)
+                tracker.display(device_scheduler.format_progress() if device_scheduler is not None else None)
+                yield video_path, result
+        finally:
+            stop_feeding.set()
+
+    @staticmethod
+    def _segments_for(scanned: ScannedFile, limit: int, split_size: Optional[int], max_segments: int) -> int:
+        """
+        Time segments (and slots) for a file: one unless it is at least split_size bytes.
+
+        The container's duration is read up front, so a file too short for
+        every segment reserves only the slots VideoVerifier will use.
+        """
+        if split_size is None or scanned.size < split_size:
+            return 1
+        segments = max(1, min(max_segments, limit))
+        duration = Mp4StructureChecker.read_duration(scanned.path)
+        return VideoVerifier._segment_count('full', duration, segments) if duration else segments
 
     @staticmethod
-    def _save_periodic_checkpoint(
-        checkpoint_file: Path,
-        results: VerificationResults,
-        completed: int
-    ) -> None:
-        """Save checkpoint every 10 files."""
-        if checkpoint_file and completed % 10 == 0:
-            CheckpointManager.save_checkpoint(checkpoint_file, results)
+    def _start_feeder(video_files: Iterable[ScannedFile], events: queue.Queue, stop: threading.Event) -> None:
+        """Consume a streaming file source in the background, until it ends or stop is set."""
+        def feed() -> None:
+            try:
+                for scanned in video_files:
+                    if stop.is_set():
+                        break
+                    events.put((FILE_DISCOVERED, scanned))
+            finally:
+                events.put((SCAN_FINISHED, None))
+
+        threading.Thread(target=feed, daemon=True).start()
 
     @staticmethod
-    def _save_final_checkpoint(checkpoint_file: Path, results: VerificationResults) -> None:
-        """Save final checkpoint."""
-        if checkpoint_file:
-            CheckpointManager.save_checkpoint(checkpoint_file, results)
+    def _submit(executor, video_path: Path, options: Dict[str, Any], events: queue.Queue) -> None:
+        """Submit one verification whose result lands on the event queue."""
+        def on_result(result: tuple) -> None:
+            events.put((VERIFIED, result))
+
+        def on_error(error: BaseException) -> None:
+            events.put((VERIFIED, (video_path, False, f"Unexpected error: {error}", 0, {})))
 
+        executor.submit(video_path, options, on_result, on_error)
@@ -0,0 +1,245 @@
+"""Embeddable verification API: results as a stream, without printing or exiting."""
+
+import asyncio
+import os
+import queue
+import threading
+from multiprocessing import cpu_count
+from pathlib import Path
+from typing import (
+    Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple,
+    Union
+)
+
+from error_taxonomy import ErrorRecord, ErrorTaxonomy
+from file_scanner import FileScanner, ScannedFile
+from job_scheduler import SCHEDULING_POLICIES
+from result_store import VerificationResult
+from retry_policy import RetryPolicy
+from verification_engines import ENGINES
+from verification_runner import VerificationRunner
+from video_verifier import VERIFICATION_MODES
+
+
+# Keyword options passed through to VideoVerifier.verify_video
+VERIFY_OPTIONS = ('timeout', 'mode', 'samples', 'sample_duration', 'fatal_patterns', 'threads')
+
+PathSource = Union[str, os.PathLike, Iterable[Union[str, os.PathLike, ScannedFile]]]
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+_END = object()  # Marks the end of a queued path source
+
+# VideoVerifier.verify_video's timeout, which retry timeouts must exceed when none is given
+DEFAULT_TIMEOUT = 300
+
+
+class VerificationOutcome(NamedTuple):
+    """The result of verifying one file."""
+    path: Path
+    is_valid: bool
+    error: Optional[str]
+    size: int
+    details: Dict[str, Any]
+
+    @property
+    def errors(self) -> List[ErrorRecord]:
+        """Structured error records (see ErrorTaxonomy), most severe first."""
+        return ErrorTaxonomy.records_for(self.error, self.details)
+
+    @property
+    def codes(self) -> List[str]:
+        """Distinct error codes, e.g. ['timeout'] or ['corrupt_packet']."""
+        return ErrorTaxonomy.codes(self.errors)
+
+    @property
+    def timed_out(self) -> bool:
+        """Whether the final attempt hit its timeout."""
+        return bool(self.details.get('timed_out'))
+
+
+def iter_verify(
+    paths: PathSource,
+    *,
+    jobs: Optional[int] = None,
+    engine: str = 'pool',
+    schedule: str = 'sorted',
+    on_progress: Optional[ProgressCallback] = None,
+    cancel: Optional[threading.Event] = None,
+    split_size: Optional[int] = None,
+    segments: int = 4,
+    retry_timeouts: Optional[Sequence[float]] = None,
+    retry_transient: bool = False,
+    **options: Any
+) -> Iterator[VerificationOutcome]:
+    """
+    Verify video files, yielding a VerificationOutcome per file as it completes.
+
+    paths is a directory (scanned for MP4 files) or an iterable of files, read
+    lazily in the background, so it may be a generator that is still
+    producing paths. options are passed to VideoVerifier.verify_video
+    (timeout, mode, samples, sample_duration, fatal_patterns, threads).
+    on_progress receives progress statistics from the consuming thread.
+    Setting cancel, or closing the generator, stops verification and kills
+    running ffmpeg processes. Nothing is printed, and no signal handlers,
+    checkpoint or reports are installed. Invalid options raise TypeError or
+    ValueError from this call; nothing is scanned or verified until the
+    first outcome is requested.
+    """
+    unknown = sorted(set(options) - set(VERIFY_OPTIONS))
+    if unknown:
+        raise TypeError(f"unexpected verification options: {', '.join(unknown)}")
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {', '.join(ENGINES)}, not {engine!r}")
+    if schedule not in SCHEDULING_POLICIES:
+        raise ValueError(f"schedule must be one of {', '.join(SCHEDULING_POLICIES)}, not {schedule!r}")
+    mode = options.get('mode', 'full')
+    if mode not in VERIFICATION_MODES:
+        raise ValueError(f"mode must be one of {', '.join(VERIFICATION_MODES)}, not {mode!r}")
+
+    jobs = jobs or cpu_count()
+    retry_policy = None
+    if retry_timeouts:
+        ladder_error = RetryPolicy.check_timeouts(retry_timeouts, options.get('timeout', DEFAULT_TIMEOUT))
+        if ladder_error:
+            raise ValueError(ladder_error)
+        retry_policy = RetryPolicy(retry_timeouts, retry_transient, max(1, jobs // 4))
+
+    results = VerificationRunner.stream_verification(
+        _scanned(paths), jobs, options, schedule, engine, on_progress, cancel,
+        split_size if mode == 'full' else None, segments, retry_policy
+    )
+    return _outcomes(results)
+
+
+def _outcomes(results: Iterator[Tuple[Path, VerificationResult]]) -> Iterator[VerificationOutcome]:
+    """Wrap streamed results as outcomes; closing this generator stops the run."""
+    try:
+        for video_path, (is_valid, error_msg, file_size, details) in results:
+            yield VerificationOutcome(video_path, is_valid, error_msg, file_size, details)
+    finally:
+        results.close()
+
+
+def iter_verify_async(
+    paths: Union[PathSource, AsyncIterable[Union[str, os.PathLike, ScannedFile]]],
+    **kwargs: Any
+) -> AsyncIterator[VerificationOutcome]:
+    """
+    Asynchronous iter_verify: an async iterator of outcomes, with the same options.
+
+    Verification runs in a worker thread, so the event loop is never blocked.
+    paths may also be an async iterable. Breaking out of the loop (or
+    cancelling the consuming task) cancels the verification; on_progress is
+    called from the worker thread. Options are checked by this call, as
+    with iter_verify.
+    """
+    cancel = kwargs.pop('cancel', None) or threading.Event()
+    fed: Optional[queue.Queue] = queue.Queue() if hasattr(paths, '__aiter__') else None
+    outcomes = iter_verify(iter(fed.get, _END) if fed else paths, cancel=cancel, **kwargs)
+    return _iter_async(outcomes, paths if fed else None, fed, cancel)
+
+
+async def _iter_async(
+    results: Iterator[VerificationOutcome],
+    async_paths: Optional[AsyncIterable],
+    fed: Optional[queue.Queue],
+    cancel: threading.Event
+) -> AsyncIterator[VerificationOutcome]:
+    """Consume iter_verify in a worker thread, feeding it from async_paths if given."""
+    loop = asyncio.get_running_loop()
+    outcomes: asyncio.Queue = asyncio.Queue()
+    pump = asyncio.ensure_future(_pump(async_paths, fed, cancel)) if async_paths is not None else None
+
+    def work() -> None:
+        try:
+            for outcome in results:
+                loop.call_soon_threadsafe(outcomes.put_nowait, outcome)
+        except BaseException as e:
+            loop.call_soon_threadsafe(outcomes.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(outcomes.put_nowait, _END)
+
+    worker = loop.run_in_executor(None, work)
+    try:
+        while True:
+            item = await outcomes.get()
+            if item is _END:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        cancel.set()
+        if pump is not None:
+            pump.cancel()
+        await worker
+
+
+async def _pump(paths: AsyncIterable, fed: queue.Queue, cancel: threading.Event) -> None:
+    """Move paths from an async iterable to a thread-safe queue, then mark its end."""
+    try:
+        async for path in paths:
+            if cancel.is_set():
+                break
+            fed.put(path)
+    finally:
+        fed.put(_END)
+
+
+class VerificationSession:
+    """
+    Push-style iter_verify: paths are submitted while results are read.
+    Options are those of iter_verify, and are checked on construction.
+
+    submit() may be called from any thread until close(); iterating (once)
+    yields outcomes until every submitted file is verified and the session
+    is closed. cancel() stops verification early. Used as a context manager,
+    the session is closed on exit, or cancelled if an exception escapes.
+    """
+
+    def __init__(self, **kwargs: Any):
+        self.cancel_event = kwargs.pop('cancel', None) or threading.Event()
+        self.closed = False
+        self._paths: queue.Queue = queue.Queue()
+        self._outcomes = iter_verify(iter(self._paths.get, _END), cancel=self.cancel_event, **kwargs)
+
+    def submit(self, path: Union[str, os.PathLike, ScannedFile]) -> None:
+        """Queue a file for verification."""
+        if self.closed:
+            raise ValueError("cannot submit to a closed session")
+        self._paths.put(path)
+
+    def close(self) -> None:
+        """Signal that no more files will be submitted."""
+        if not self.closed:
+            self.closed = True
+            self._paths.put(_END)
+
+    def cancel(self) -> None:
+        """Stop verifying, abandoning queued and running files."""
+        self.cancel_event.set()
+        self.close()
+
+    def __iter__(self) -> Iterator[VerificationOutcome]:
+        try:
+            yield from self._outcomes
+        finally:
+            self.close()  # Stopped reading early: release the thread waiting for paths
+
+    def __enter__(self) -> 'VerificationSession':
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is not None:
+            self.cancel()
+        else:
+            self.close()
+
+
+def _scanned(paths: PathSource) -> Iterator[ScannedFile]:
+    """Scan records for a directory or an iterable of paths, produced lazily."""
+    if isinstance(paths, (str, os.PathLike)):
+        yield from FileScanner.scan_mp4_files(Path(paths))
+        return
+    for path in paths:
+        yield path if isinstance(path, ScannedFile) else FileScanner.describe(Path(path))
@@ -1,61 +1,658 @@
 """Video verification using ffmpeg."""
 
+import asyncio
+import hashlib
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from mp4_structure import Mp4StructureChecker
+from adaptive_timeout import AdaptiveTimeout
+from ffmpeg_process import DEFAULT_FATAL_PATTERNS, FfmpegCancelled, FfmpegProcess
+from error_taxonomy import ErrorTaxonomy
+
+
+# Escalating verification tiers, cheapest first
+VERIFICATION_MODES = ('container', 'demux', 'sampled', 'full')
+
+# A decode step: (window start in seconds or None for whole file, ffmpeg command)
+DecodeStep = Tuple[Optional[float], List[str]]
+
+# Shortest time segment worth its own ffmpeg process when splitting a file
+MIN_SEGMENT_SECONDS = 60.0
+
+# Seconds of packets probed after each segment boundary when looking for a keyframe
+KEYFRAME_SEARCH_SECONDS = 10.0
 
 
 class VideoVerifier:
     """Handles video file verification using ffmpeg."""
 
     @staticmethod
-    def verify_video(video_path: Path, timeout: int = 300) -> Tuple[Path, bool, Optional[str], int]:
+    def verify_video(
+        video_path: Path,
+        timeout: int = 300,
+        mode: str = 'full',
+        samples: int = 5,
+        sample_duration: float = 10.0,
+        timeout_policy: Optional[Dict[str, Any]] = None,
+        fatal_patterns: Optional[Sequence[str]] = None,
+        threads: Optional[int] = None,
+        segments: int = 1
+    ) -> Tuple[Path, bool, Optional[str], int, Dict[str, Any]]:
         """
         Verify a single video file using ffmpeg.
 
         Args:
             video_path: Path to the video file
             timeout: Verification timeout in seconds (default: 300)
+            mode: Verification tier - container, demux, sampled or full (default: full)
+            samples: Number of decoded windows in sampled mode
+            sample_duration: Length of each sampled window in seconds
+            timeout_policy: Adaptive timeout settings (see AdaptiveTimeout.policy);
+                when given, the timeout is derived from the file's duration
+            fatal_patterns: stderr regexes that abort ffmpeg early (None: defaults, empty: never)
+            threads: ffmpeg decoder threads (None: ffmpeg's automatic choice)
+            segments: In full mode, decode up to this many keyframe-aligned time
+                segments of the file with concurrent ffmpeg processes
 
         Returns:
-            Tuple of (video_path, is_valid, error_message, file_size)
+            Tuple of (video_path, is_valid, error_message, file_size, details);
+            details['errors'] holds structured error records for failures, and
+            details records timing (started_at, elapsed) and the ffmpeg
+            children's resource usage (cpu_user, cpu_system, max_rss)
+        """
+        details = {'mode': mode, 'started_at': round(time.time(), 3)}
+        file_size, verdict = VideoVerifier._precheck(video_path, mode)
+        if verdict:
+            return VideoVerifier._result(video_path, *verdict, file_size, details)
+
+        start_time = time.monotonic()
+        is_valid, error = VideoVerifier._verify_with_ffmpeg(
+            video_path, details, timeout, mode, samples, sample_duration, timeout_policy, fatal_patterns, threads,
+            segments
+        )
+        details['elapsed'] = round(time.monotonic() - start_time, 3)
+        return VideoVerifier._result(video_path, is_valid, error, file_size, details)
+
+    @staticmethod
+    async def verify_video_async(
+        video_path: Path,
+        timeout: int = 300,
+        mode: str = 'full',
+        samples: int = 5,
+        sample_duration: float = 10.0,
+        timeout_policy: Optional[Dict[str, Any]] = None,
+        fatal_patterns: Optional[Sequence[str]] = None,
+        threads: Optional[int] = None,
+        segments: int = 1
+    ) -> Tuple[Path, bool, Optional[str], int, Dict[str, Any]]:
+        """
+        Coroutine version of verify_video, for running many files from one process.
+
+        Takes the same arguments and returns the same tuple, without resource
+        usage (the event loop reaps the children). Cancelling the task kills
+        any ffmpeg/ffprobe child it has running.
+        """
+        details = {'mode': mode, 'started_at': round(time.time(), 3)}
+        loop = asyncio.get_running_loop()
+        file_size, verdict = await loop.run_in_executor(None, VideoVerifier._precheck, video_path, mode)
+        if verdict:
+            return VideoVerifier._result(video_path, *verdict, file_size, details)
+
+        start_time = time.monotonic()
+        is_valid, error = await VideoVerifier._verify_with_ffmpeg_async(
+            video_path, details, timeout, mode, samples, sample_duration, timeout_policy, fatal_patterns, threads,
+            segments
+        )
+        details['elapsed'] = round(time.monotonic() - start_time, 3)
+        return VideoVerifier._result(video_path, is_valid, error, file_size, details)
+
+    @staticmethod
+    def _result(
+        video_path: Path,
+        is_valid: bool,
+        error: Optional[str],
+        file_size: int,
+        details: Dict[str, Any]
+    ) -> Tuple[Path, bool, Optional[str], int, Dict[str, Any]]:
+        """Assemble the result tuple, adding structured error records (see ErrorTaxonomy)."""
+        if error:
+            details['errors'] = ErrorTaxonomy.classify(error)
+        return (video_path, is_valid, error, file_size, details)
+
+    @staticmethod
+    def _precheck(video_path: Path, mode: str) -> Tuple[int, Optional[Tuple[bool, Optional[str]]]]:
+        """
+        Checks that need no ffmpeg: existence and container structure.
+
+        Returns:
+            Tuple of (file_size, verdict), verdict being None when decoding is still needed
         """
         if not video_path.exists():
-            return (video_path, False, "File does not exist", 0)
+            return (0, (False, "File does not exist"))
 
         file_size = video_path.stat().st_size
 
+        # Millisecond structural check catches truncated files before decoding
+        structure_error = Mp4StructureChecker.check(video_path)
+        if structure_error or mode == 'container':
+            return (file_size, (structure_error is None, structure_error))
+        return (file_size, None)
+
+    @staticmethod
+    def _verify_with_ffmpeg(
+        video_path: Path,
+        details: Dict[str, Any],
+        timeout: float,
+        mode: str,
+        samples: int,
+        sample_duration: float,
+        timeout_policy: Optional[Dict[str, Any]],
+        fatal_patterns: Optional[Sequence[str]],
+        threads: Optional[int],
+        segments: int
+    ) -> Tuple[bool, Optional[str]]:
+        """Run the decode tier, recording duration and timeout in details."""
+        try:
+            duration = VideoVerifier._probe_if_needed(video_path, mode, timeout_policy, timeout, segments)
+            segments = VideoVerifier._segment_count(mode, duration, segments)
+            segment_starts = VideoVerifier.find_segment_starts(
+                video_path, duration, segments, timeout
+            ) if segments > 1 else None
+            steps, timeout = VideoVerifier._plan_decode(
+                video_path, details, timeout, mode, samples, sample_duration, timeout_policy, duration, threads,
+                segment_starts
+            )
+            if segment_starts:
+                return VideoVerifier._run_segments(steps, timeout, fatal_patterns, details)
+            return VideoVerifier._run_decode_steps(steps, timeout, fatal_patterns, details)
+        except Exception as e:
+            return VideoVerifier._describe_failure(e, details, timeout, timeout_policy)
+
+    @staticmethod
+    async def _verify_with_ffmpeg_async(
+        video_path: Path,
+        details: Dict[str, Any],
+        timeout: float,
+        mode: str,
+        samples: int,
+        sample_duration: float,
+        timeout_policy: Optional[Dict[str, Any]],
+        fatal_patterns: Optional[Sequence[str]],
+        threads: Optional[int],
+        segments: int
+    ) -> Tuple[bool, Optional[str]]:
+        """Asyncio version of _verify_with_ffmpeg."""
         try:
-            result = VideoVerifier._run_ffmpeg_verification(video_path, timeout)
-            path, is_valid, error = VideoVerifier._parse_verification_result(video_path, result)
-            return (path, is_valid, error, file_size)
-        except subprocess.TimeoutExpired:
-            timeout_msg = f"Verification timed out (>{timeout} seconds)"
-            return (video_path, False, timeout_msg, file_size)
-        except FileNotFoundError:
-            return (video_path, False, "ffmpeg not found - please install ffmpeg", file_size)
+            duration = await VideoVerifier._probe_if_needed_async(video_path, mode, timeout_policy, timeout, segments)
+            segments = VideoVerifier._segment_count(mode, duration, segments)
+            segment_starts = await VideoVerifier.find_segment_starts_async(
+                video_path, duration, segments, timeout
+            ) if segments > 1 else None
+            steps, timeout = VideoVerifier._plan_decode(
+                video_path, details, timeout, mode, samples, sample_duration, timeout_policy, duration, threads,
+                segment_starts
+            )
+            if segment_starts:
+                return await VideoVerifier._run_segments_async(steps, timeout, fatal_patterns)
+            return await VideoVerifier._run_decode_steps_async(steps, timeout, fatal_patterns)
         except Exception as e:
-            return (video_path, False, f"Unexpected error: {str(e)}", file_size)
+            return VideoVerifier._describe_failure(e, details, timeout, timeout_policy)
+
+    @staticmethod
+    def _plan_decode(
+        video_path: Path,
+        details: Dict[str, Any],
+        timeout: float,
+        mode: str,
+        samples: int,
+        sample_duration: float,
+        timeout_policy: Optional[Dict[str, Any]],
+        duration: Optional[float],
+        threads: Optional[int],
+        segment_starts: Optional[List[float]] = None
+    ) -> Tuple[List[DecodeStep], float]:
+        """
+        Record duration details and return the decode steps with their timeout.
+
+        Segments run concurrently, so an adaptive timeout is sized for the
+        longest one rather than the whole file.
+        """
+        if duration:
+            details['duration'] = duration
+            details['media_seconds'] = VideoVerifier._media_seconds(mode, duration, samples, sample_duration)
+        if segment_starts:
+            details['segments'] = len(segment_starts)
+        if timeout_policy:
+            media_seconds = details.get('media_seconds')
+            if media_seconds and segment_starts:
+                media_seconds = VideoVerifier._longest_segment(segment_starts, duration)
+            timeout = AdaptiveTimeout.compute(media_seconds, fallback=timeout, **timeout_policy)
+            details['timeout'] = round(timeout)
+
+        if segment_starts:
+            return VideoVerifier._build_segment_steps(video_path, segment_starts, threads), timeout
+        steps = VideoVerifier._build_decode_steps(video_path, mode, duration, samples, sample_duration, threads)
+        return steps, timeout
+
+    @staticmethod
+    def _describe_failure(
+        error: Exception,
+        details: Dict[str, Any],
+        timeout: float,
+        timeout_policy: Optional[Dict[str, Any]]
+    ) -> Tuple[bool, str]:
+        """Turn an exception raised while verifying into a result."""
+        if isinstance(error, subprocess.TimeoutExpired):
+            details['timed_out'] = True
+            suffix = ", adaptive" if timeout_policy else ""
+            timeout = details.get('timeout', timeout)
+            return (False, f"Verification timed out (>{timeout:.0f} seconds{suffix})")
+        if isinstance(error, FileNotFoundError):
+            return (False, "ffmpeg not found - please install ffmpeg")
+        if isinstance(error, ValueError):
+            return (False, str(error))
+        return (False, f"Unexpected error: {str(error)}")
+
+    @staticmethod
+    def _probe_if_needed(
+        video_path: Path,
+        mode: str,
+        timeout_policy: Optional[Dict[str, Any]],
+        timeout: float,
+        segments: int = 1
+    ) -> Optional[float]:
+        """Probe duration when sampling, splitting into segments or sizing an adaptive timeout."""
+        if mode == 'sampled':
+            return VideoVerifier.probe_duration(video_path, timeout)
+        if timeout_policy or (mode == 'full' and segments > 1):
+            try:
+                return VideoVerifier.probe_duration(video_path, timeout)
+            except ValueError:
+                return None  # Fall back to the ceiling (and one process); the decode will report the problem
+        return None
+
+    @staticmethod
+    async def _probe_if_needed_async(
+        video_path: Path,
+        mode: str,
+        timeout_policy: Optional[Dict[str, Any]],
+        timeout: float,
+        segments: int = 1
+    ) -> Optional[float]:
+        """Asyncio version of _probe_if_needed."""
+        if mode == 'sampled':
+            return await VideoVerifier.probe_duration_async(video_path, timeout)
+        if timeout_policy or (mode == 'full' and segments > 1):
+            try:
+                return await VideoVerifier.probe_duration_async(video_path, timeout)
+            except ValueError:
+                return None
+        return None
+
+    @staticmethod
+    def _media_seconds(mode: str, duration: float, samples: int, sample_duration: float) -> float:
+        """Seconds of media the tier actually processes (none for the container check)."""
+        if mode == 'container':
+            return 0.0
+        if mode == 'sampled':
+            return min(duration, samples * sample_duration)
+        return duration
+
+    @staticmethod
+    def _build_decode_steps(
+        video_path: Path,
+        mode: str,
+        duration: Optional[float],
+        samples: int,
+        sample_duration: float,
+        threads: Optional[int] = None
+    ) -> List[DecodeStep]:
+        """Build the ffmpeg commands needed for the requested tier."""
+        thread_args = ['-threads', str(threads)] if threads else []
+        if mode == 'demux':
+            return [(None, VideoVerifier._ffmpeg_command(video_path, output_args=['-map', '0', '-c', 'copy']))]
+        if mode == 'sampled' and duration > samples * sample_duration:
+            return [
+                (start, VideoVerifier._ffmpeg_command(
+                    video_path, thread_args + ['-ss', f'{start:.3f}'], ['-t', str(sample_duration)]
+                ))
+                for start in VideoVerifier._sample_starts(duration, samples, sample_duration)
+            ]
+        # Full decode, also used when sampling would cover a short file anyway
+        return [(None, VideoVerifier._ffmpeg_command(video_path, thread_args))]
+
+    @staticmethod
+    def _segment_count(mode: str, duration: Optional[float], segments: int) -> int:
+        """Segments actually used: full mode only, none shorter than MIN_SEGMENT_SECONDS."""
+        if mode != 'full' or not duration:
+            return 1
+        return max(1, min(segments, int(duration // MIN_SEGMENT_SECONDS)))
+
+    @staticmethod
+    def _build_segment_steps(
+        video_path: Path,
+        segment_starts: List[float],
+        threads: Optional[int] = None
+    ) -> List[DecodeStep]:
+        """
+        Build one ffmpeg command per time segment.
+
+        Input seeking starts decoding at the keyframe at or before each start,
+        so the segments cover the file without gaps. Each one stops after its
+        length (-t rather than input -to, which older ffmpeg builds reject);
+        the last runs to the end of the file.
+        """
+        thread_args = ['-threads', str(threads)] if threads else []
+        ends = segment_starts[1:] + [None]
+        return [
+            (start, VideoVerifier._ffmpeg_command(
+                video_path,
+                thread_args + (['-ss', f'{start:.3f}'] if start > 0 else []),
+                ['-t', f'{end - start:.3f}'] if end is not None else []
+            ))
+            for start, end in zip(segment_starts, ends)
+        ]
+
+    @staticmethod
+    def _longest_segment(segment_starts: List[float], duration: float) -> float:
+        """Media seconds of the longest segment."""
+        return max(end - start for start, end in zip(segment_starts, segment_starts[1:] + [duration]))
+
+    @staticmethod
+    def _ffmpeg_command(
+        video_path: Path,
+        input_args: Optional[List[str]] = None,
+        output_args: Optional[List[str]] = None
+    ) -> List[str]:
+        """Build an ffmpeg command that writes to the null muxer."""
+        return (['ffmpeg', '-v', 'error'] + (input_args or []) + ['-i', str(video_path)]
+                + (output_args or []) + ['-f', 'null', '-'])
+
+    @staticmethod
+    def _sample_starts(duration: float, samples: int, sample_duration: float) -> List[float]:
+        """Spread window start times evenly across the media duration."""
+        spacing = duration / samples
+        return [
+            min(max(0.0, spacing * (i + 0.5) - sample_duration / 2), duration - sample_duration)
+            for i in range(samples)
+        ]
+
+    @staticmethod
+    def _run_decode_steps(
+        steps: List[DecodeStep],
+        timeout: float,
+        fatal_patterns: Optional[Sequence[str]] = None,
+        usage: Optional[Dict[str, Any]] = None
+    ) -> Tuple[bool, Optional[str]]:
+        """Run decode steps sharing one timeout budget and merge their errors, summing ffmpeg usage."""
+        deadline = time.monotonic() + timeout
+        errors = []
+        for window_start, command in steps:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(command, timeout)
+
+            result = VideoVerifier._run_ffmpeg_verification(command, remaining, fatal_patterns, usage)
+            VideoVerifier._collect_step_error(window_start, result, errors)
+
+        return (not errors, "\n".join(errors) if errors else None)
+
+    @staticmethod
+    async def _run_decode_steps_async(
+        steps: List[DecodeStep],
+        timeout: float,
+        fatal_patterns: Optional[Sequence[str]] = None
+    ) -> Tuple[bool, Optional[str]]:
+        """Asyncio version of _run_decode_steps."""
+        deadline = time.monotonic() + timeout
+        errors = []
+        for window_start, command in steps:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(command, timeout)
+
+            result = await FfmpegProcess.run_async(command, remaining, fatal_patterns)
+            VideoVerifier._collect_step_error(window_start, result, errors)
+
+        return (not errors, "\n".join(errors) if errors else None)
+
+    @staticmethod
+    def _run_segments(
+        steps: List[DecodeStep],
+        timeout: float,
+        fatal_patterns: Optional[Sequence[str]] = None,
+        usage: Optional[Dict[str, Any]] = None
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Run segment decode steps concurrently and merge their errors in time order.
+
+        Each segment gets the whole timeout. A segment that times out or aborts
+        on a fatal line kills the others, as the verdict no longer depends on
+        them. The segments' CPU times are summed into usage, and so are their
+        peak memories, since they run at once.
+        """
+        step_usages = [{} for _ in steps]
+        cancel = threading.Event()
+
+        def run_step(step: DecodeStep, step_usage: Dict[str, Any]) -> Optional[subprocess.CompletedProcess]:
+            try:
+                result = VideoVerifier._run_ffmpeg_verification(step[1], timeout, fatal_patterns, step_usage, cancel)
+            except FfmpegCancelled:
+                return None
+            except BaseException:
+                cancel.set()
+                raise
+            if FfmpegProcess.aborted(result):
+                cancel.set()
+            return result
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(steps)) as pool:
+                results = list(pool.map(run_step, steps, step_usages))
+        finally:
+            if usage is not None:
+                for step_usage in step_usages:
+                    usage['cpu_user'] = round(usage.get('cpu_user', 0.0) + step_usage.get('cpu_user', 0.0), 3)
+                    usage['cpu_system'] = round(usage.get('cpu_system', 0.0) + step_usage.get('cpu_system', 0.0), 3)
+                    usage['max_rss'] = usage.get('max_rss', 0) + step_usage.get('max_rss', 0)
+
+        errors = []
+        for (segment_start, _), result in zip(steps, results):
+            if result is not None:
+                VideoVerifier._collect_step_error(segment_start, result, errors, 'segment')
+        return (not errors, "\n".join(errors) if errors else None)
+
+    @staticmethod
+    async def _run_segments_async(
+        steps: List[DecodeStep],
+        timeout: float,
+        fatal_patterns: Optional[Sequence[str]] = None
+    ) -> Tuple[bool, Optional[str]]:
+        """Asyncio version of _run_segments; a timeout, fatal abort or cancellation kills every segment."""
+        tasks = [asyncio.ensure_future(FfmpegProcess.run_async(command, timeout, fatal_patterns))
+                 for _, command in steps]
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        raise task.exception()
+                if any(FfmpegProcess.aborted(task.result()) for task in done):
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        errors = []
+        for (segment_start, _), task in zip(steps, tasks):
+            if not task.cancelled() and task.exception() is None:
+                VideoVerifier._collect_step_error(segment_start, task.result(), errors, 'segment')
+        return (not errors, "\n".join(errors) if errors else None)
+
+    @staticmethod
+    def _collect_step_error(
+        window_start: Optional[float],
+        result: subprocess.CompletedProcess,
+        errors: List[str],
+        label: str = 'window'
+    ) -> None:
+        """Append a decode step's error, labelled with its sampled window or segment start."""
+        is_valid, error = VideoVerifier._parse_verification_result(result)
+        if not is_valid:
+            errors.append(error if window_start is None else f"[{label} @ {window_start:.1f}s] {error}")
+
+    @staticmethod
+    def _run_ffmpeg_verification(
+        command: List[str],
+        timeout: float,
+        fatal_patterns: Optional[Sequence[str]] = None,
+        usage: Optional[Dict[str, Any]] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> subprocess.CompletedProcess:
+        """Run ffmpeg verification command, streaming stderr."""
+        return FfmpegProcess.run(command, timeout, fatal_patterns, usage, cancel)
+
+    @staticmethod
+    def _parse_verification_result(result: subprocess.CompletedProcess) -> Tuple[bool, Optional[str]]:
+        """Parse ffmpeg result to determine if video is valid."""
+        if result.stderr.strip():
+            return (False, result.stderr.strip())
+        return (True, None)
+
+    @staticmethod
+    def probe_duration(video_path: Path, timeout: float) -> float:
+        """Return media duration in seconds using ffprobe."""
+        result = subprocess.run(
+            VideoVerifier._probe_command(video_path),
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+        return VideoVerifier._parse_duration(result)
+
+    @staticmethod
+    async def probe_duration_async(video_path: Path, timeout: float) -> float:
+        """Asyncio version of probe_duration."""
+        result = await FfmpegProcess.communicate_async(VideoVerifier._probe_command(video_path), timeout)
+        return VideoVerifier._parse_duration(result)
+
+    @staticmethod
+    def _probe_command(video_path: Path) -> List[str]:
+        """Build the ffprobe command that prints the container duration."""
+        return ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+                '-of', 'default=noprint_wrappers=1:nokey=1', str(video_path)]
 
     @staticmethod
-    def _run_ffmpeg_verification(video_path: Path, timeout: int) -> subprocess.CompletedProcess:
-        """Run ffmpeg verification command."""
-        return subprocess.run(
-            ['ffmpeg', '-v', 'error', '-i', str(video_path), '-f', 'null', '-'],
+    def _parse_duration(result: subprocess.CompletedProcess) -> float:
+        """Parse ffprobe output into seconds."""
+        try:
+            return float(result.stdout.strip())
+        except ValueError:
+            raise ValueError(f"Could not determine duration: {result.stderr.strip() or 'unknown'}")
+
+    @staticmethod
+    def find_segment_starts(video_path: Path, duration: float, segments: int, timeout: float) -> List[float]:
+        """Start times splitting the media into segments, moved to nearby keyframes."""
+        targets = VideoVerifier._segment_targets(duration, segments)
+        result = subprocess.run(
+            VideoVerifier._keyframe_probe_command(video_path, targets),
             capture_output=True,
             text=True,
             timeout=timeout
         )
+        return VideoVerifier._snap_to_keyframes(result, targets)
 
     @staticmethod
-    def _parse_verification_result(
+    async def find_segment_starts_async(
         video_path: Path,
-        result: subprocess.CompletedProcess
-    ) -> Tuple[Path, bool, Optional[str]]:
-        """Parse ffmpeg result to determine if video is valid."""
-        if result.stderr.strip():
-            return (video_path, False, result.stderr.strip())
-        return (video_path, True, None)
+        duration: float,
+        segments: int,
+        timeout: float
+    ) -> List[float]:
+        """Asyncio version of find_segment_starts."""
+        targets = VideoVerifier._segment_targets(duration, segments)
+        result = await FfmpegProcess.communicate_async(
+            VideoVerifier._keyframe_probe_command(video_path, targets), timeout
+        )
+        return VideoVerifier._snap_to_keyframes(result, targets)
+
+    @staticmethod
+    def _segment_targets(duration: float, segments: int) -> List[float]:
+        """Evenly spaced boundaries between segments (the first segment starts at 0)."""
+        return [duration * i / segments for i in range(1, segments)]
+
+    @staticmethod
+    def _keyframe_probe_command(video_path: Path, targets: List[float]) -> List[str]:
+        """Build the ffprobe command listing video packets just after each boundary."""
+        intervals = ','.join(f'{target:.3f}%+{KEYFRAME_SEARCH_SECONDS:g}' for target in targets)
+        return ['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-read_intervals', intervals,
+                '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', str(video_path)]
+
+    @staticmethod
+    def _snap_to_keyframes(result: subprocess.CompletedProcess, targets: List[float]) -> List[float]:
+        """
+        Segment starts: 0, then the keyframe nearest each boundary.
+
+        A boundary with no keyframe within KEYFRAME_SEARCH_SECONDS (or an
+        unreadable probe) is kept as is; seeking still starts decoding at the
+        previous keyframe, so only the overlap between segments grows.
+        """
+        keyframes = []
+        for line in (result.stdout or '').splitlines():
+            pts_time, _, flags = line.partition(',')
+            if 'K' in flags:
+                try:
+                    keyframes.append(float(pts_time))
+                except ValueError:
+                    continue  # pts_time is N/A
+
+        starts = [0.0]
+        for target in targets:
+            nearest = min(keyframes, key=lambda keyframe: abs(keyframe - target), default=target)
+            start = nearest if abs(nearest - target) <= KEYFRAME_SEARCH_SECONDS else target
+            if start > starts[-1]:
+                starts.append(start)
+        return starts
+
+    @staticmethod
+    def describe_mode(
+        mode: str,
+        samples: int,
+        sample_duration: float,
+        fatal_patterns: Optional[Sequence[str]] = None,
+        split_size: Optional[int] = None,
+        segments: int = 1
+    ) -> str:
+        """
+        Describe the settings that can change a verdict, e.g. for cache invalidation.
+
+        Besides the mode this covers the early-abort patterns (None: defaults,
+        empty: never abort) and, in full mode, segmented decoding.
+        """
+        description = f"sampled:{samples}x{sample_duration:g}s" if mode == 'sampled' else mode
+        patterns = DEFAULT_FATAL_PATTERNS if fatal_patterns is None else tuple(fatal_patterns)
+        if patterns:
+            digest = hashlib.sha1('\n'.join(patterns).encode()).hexdigest()[:12]
+            description += f";abort:{digest}"
+        else:
+            description += ";abort:off"
+        if mode == 'full' and split_size and segments > 1:
+            description += f";split:{split_size}x{segments}"
+        return description
+
+    @staticmethod
+    def get_ffmpeg_version() -> str:
+        """Return the first line of `ffmpeg -version`, identifying the build."""
+        result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True)
+        lines = result.stdout.splitlines()
+        return lines[0].strip() if lines else 'unknown'
 
     @staticmethod
     def check_ffmpeg_available() -> bool:
@@ -65,4 +662,3 @@ class VideoVerifier:
             return True
         except (subprocess.CalledProcessError, FileNotFoundError):
             return False
-
@@ -0,0 +1,237 @@
+"""Watching a library for finished downloads."""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+from file_scanner import FileScanner, ScannedFile
+from result_store import VerificationResult
+
+
+# inotify event flags (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, name length
+
+# Seconds between checks of files that are still settling
+SETTLE_CHECK_INTERVAL = 1.0
+
+
+class DirectoryWatcher:
+    """
+    Yields MP4 files under a directory once they are new or rewritten and have stopped growing.
+
+    On Linux, inotify reports changes without rescanning (directories created
+    later are watched as they appear); elsewhere, or when inotify cannot be
+    set up (e.g. the watch limit is reached), the tree is polled with stat
+    walks. A new directory that cannot be watched is polled on its own, and
+    when the inotify queue overflows the whole tree is rescanned once. A
+    changed file is yielded once its size and modification time have not
+    changed for settle_seconds. Files present at startup are not yielded
+    until they change.
+    """
+
+    def __init__(self, root_dir: Path, settle_seconds: float = 10.0, poll_interval: float = 5.0):
+        self.root_dir = root_dir
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.pending: Dict[Path, Tuple[int, int, float]] = {}  # path -> (size, mtime_ns, last change)
+        self.known: Dict[Path, Tuple[int, int]] = {}  # path -> (size, mtime_ns) at startup or when last yielded
+        self.method = 'polling'
+
+    def watch(self) -> Iterator[ScannedFile]:
+        """Yield settled files forever."""
+        try:
+            inotify = _Inotify(self.root_dir)
+        except OSError as e:
+            print(f"Watch: inotify unavailable ({e}), polling every {self.poll_interval:g}s")
+            yield from self._watch_polling()
+            return
+
+        self.method = 'inotify'
+        self.known = self._snapshot(self.root_dir)
+        next_poll = time.monotonic() + self.poll_interval
+        try:
+            while True:
+                for video_path in inotify.read_changes(SETTLE_CHECK_INTERVAL):
+                    self._mark_changed(video_path)
+                if inotify.overflowed:
+                    inotify.overflowed = False
+                    print("\nWatch: inotify queue overflowed; rescanning the library for missed changes")
+                    self._rescan([self.root_dir])
+                if inotify.unwatched and time.monotonic() >= next_poll:
+                    self._rescan(inotify.unwatched)
+                    next_poll = time.monotonic() + self.poll_interval
+                yield from self._settled()
+        finally:
+            inotify.close()
+
+    def _watch_polling(self) -> Iterator[ScannedFile]:
+        """Compare stat walks of the tree, marking new or changed files."""
+        self.known = self._snapshot(self.root_dir)
+        while True:
+            deadline = time.monotonic() + self.poll_interval
+            while time.monotonic() < deadline:
+                time.sleep(SETTLE_CHECK_INTERVAL)
+                yield from self._settled()
+            self._rescan([self.root_dir])
+
+    def _rescan(self, directories: List[Path]) -> None:
+        """Mark files under directories whose (size, mtime) differ from when they were last seen settled."""
+        for directory in directories:
+            current = self._snapshot(directory)
+            for video_path, signature in current.items():
+                if video_path not in self.pending and self.known.get(video_path) != signature:
+                    self._mark_changed(video_path)
+            if directory == self.root_dir:
+                for video_path in self.known.keys() - current.keys():
+                    del self.known[video_path]  # Deleted since
+
+    @staticmethod
+    def _snapshot(directory: Path) -> Dict[Path, Tuple[int, int]]:
+        """(size, mtime_ns) of every MP4 file under a directory."""
+        return {
+            scanned.path: (scanned.size, scanned.mtime_ns)
+            for scanned in FileScanner.scan_mp4_files(directory)
+        }
+
+    def _mark_changed(self, video_path: Path) -> None:
+        """Restart the settle period of a file."""
+        self.pending[video_path] = (-1, -1, time.monotonic())
+
+    def _settled(self) -> Iterator[ScannedFile]:
+        """Yield pending files whose size and mtime held still for settle_seconds."""
+        now = time.monotonic()
+        for video_path, (size, mtime_ns, changed_at) in list(self.pending.items()):
+            try:
+                st = video_path.stat()
+            except OSError:
+                del self.pending[video_path]  # Deleted or renamed away (e.g. a temporary download name)
+                continue
+            if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+                self.pending[video_path] = (st.st_size, st.st_mtime_ns, now)
+            elif now - changed_at >= self.settle_seconds:
+                del self.pending[video_path]
+                self.known[video_path] = (st.st_size, st.st_mtime_ns)
+                yield ScannedFile(video_path, st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev)
+
+
+class _Inotify:
+    """Minimal ctypes inotify binding watching every directory of a tree."""
+
+    def __init__(self, root_dir: Path):
+        library = ctypes.util.find_library('c')
+        self.libc = ctypes.CDLL(library, use_errno=True) if library else None
+        if self.libc is None or not hasattr(self.libc, 'inotify_init1'):
+            raise OSError("not supported on this platform")
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        self.watches: Dict[int, Path] = {}
+        self.overflowed = False  # Events were dropped; the caller rescans
+        self.unwatched: List[Path] = []  # New directories that could not be watched; the caller polls them
+        try:
+            self._add_tree(root_dir)
+        except OSError:
+            self.close()
+            raise
+
+    def read_changes(self, timeout: float) -> List[Path]:
+        """MP4 files created, written or moved in within timeout seconds (may repeat)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        changed = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + name_length].rstrip(b'\0'))
+            offset += name_length
+
+            if mask & IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+            directory = self.watches.get(wd)
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            if directory is None or not name:
+                continue
+
+            path = directory / name
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # A new or moved-in directory may already hold files
+                    try:
+                        self._add_tree(path)
+                    except OSError as e:
+                        print(f"\nWatch: {e}; polling {path} instead")
+                        self.unwatched.append(path)
+                    changed.extend(scanned.path for scanned in FileScanner.scan_mp4_files(path))
+            elif name.endswith('.mp4'):
+                changed.append(path)
+        return changed
+
+    def close(self) -> None:
+        """Release the inotify descriptor (and with it every watch)."""
+        os.close(self.fd)
+
+    def _add_tree(self, root_dir: Path) -> None:
+        """Watch a directory and all directories below it."""
+        for directory, _, _ in os.walk(root_dir):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                raise OSError(errno, f"cannot watch {directory}: {os.strerror(errno)}")
+            self.watches[wd] = Path(directory)
+
+
+class RollingReport:
+    """Appends one line per verified file to a report file as results arrive (watch mode)."""
+
+    def __init__(self, output_file: Optional[Path]):
+        self.output_file = output_file
+        self.verified = 0
+        self.corrupted = 0
+        self._file: Optional[TextIO] = open(output_file, 'a') if output_file else None
+
+    def add(self, video_path: Path, result: VerificationResult) -> None:
+        """Record a result; failures are also printed."""
+        is_valid, error_msg, _, _ = result
+        self.verified += 1
+        timestamp = datetime.now().isoformat(timespec='seconds')
+        if is_valid:
+            line = f"{timestamp} OK {video_path}"
+        else:
+            self.corrupted += 1
+            lines = (error_msg or '').strip().splitlines() or ["unknown error"]
+            line = f"{timestamp} CORRUPTED {video_path}: {lines[0]}"
+            print(f"\n{line}")
+        if self._file:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self) -> None:
+        """Close the report file."""
+        if self._file:
+            self._file.close()
+            self._file = None
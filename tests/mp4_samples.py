@@ -0,0 +1,85 @@
+"""Builders for small MP4 files with realistic box layouts (no ffmpeg needed)."""
+
+import struct
+from typing import List, Optional, Sequence, Tuple
+
+
+def box(box_type: str, payload: bytes) -> bytes:
+    """A plain box."""
+    return struct.pack('>I4s', 8 + len(payload), box_type.encode('latin-1')) + payload
+
+
+def full_box(box_type: str, payload: bytes, version: int = 0) -> bytes:
+    """A full box (version and flags before the payload)."""
+    return box(box_type, struct.pack('>I', version << 24) + payload)
+
+
+def build_mp4(
+    chunk_samples: Sequence[int] = (3, 3, 3, 2, 2, 1),
+    sample_size: int = 100,
+    constant_size: bool = False,
+    co64: bool = False,
+    moov_first: bool = True,
+    stsz_count: Optional[int] = None,
+    stsc_entries: Optional[List[Tuple[int, int, int]]] = None,
+    duration: float = 0.0,
+) -> bytes:
+    """
+    An MP4 with one track whose chunks lie back to back in a single mdat.
+
+    chunk_samples is the number of samples in each chunk; runs of equal
+    counts become stsc entries, so the defaults give a three-entry
+    sample-to-chunk table like an encoder writes. stsz_count and
+    stsc_entries override the tables to build damaged files. duration
+    (seconds) goes in the movie header.
+    """
+    sample_count = sum(chunk_samples)
+    sizes = [sample_size if constant_size else sample_size + index % 7 for index in range(sample_count)]
+    media = bytes(sum(sizes))
+
+    if stsc_entries is None:
+        stsc_entries = []
+        for chunk_index, samples in enumerate(chunk_samples, start=1):
+            if not stsc_entries or stsc_entries[-1][1] != samples:
+                stsc_entries.append((chunk_index, samples, 1))
+
+    def moov(media_start: int) -> bytes:
+        offsets = []
+        position = media_start
+        sample_index = 0
+        for samples in chunk_samples:
+            offsets.append(position)
+            position += sum(sizes[sample_index:sample_index + samples])
+            sample_index += samples
+
+        stsd = full_box('stsd', struct.pack('>I', 0))
+        stts = full_box('stts', struct.pack('>III', 1, sample_count, 512))
+        stsc = full_box('stsc', struct.pack(f'>I{3 * len(stsc_entries)}I', len(stsc_entries),
+                                            *[value for entry in stsc_entries for value in entry]))
+        declared = sample_count if stsz_count is None else stsz_count
+        if constant_size:
+            stsz = full_box('stsz', struct.pack('>II', sample_size, declared))
+        else:
+            stsz = full_box('stsz', struct.pack(f'>II{len(sizes)}I', 0, declared, *sizes))
+        if co64:
+            chunk_table = full_box('co64', struct.pack(f'>I{len(offsets)}Q', len(offsets), *offsets))
+        else:
+            chunk_table = full_box('stco', struct.pack(f'>I{len(offsets)}I', len(offsets), *offsets))
+        stbl = box('stbl', stsd + stts + stsc + stsz + chunk_table)
+        minf = box('minf', full_box('vmhd', bytes(8)) + stbl)
+        mdia = box('mdia', full_box('mdhd', bytes(20)) + full_box('hdlr', bytes(21)) + minf)
+        trak = box('trak', full_box('tkhd', bytes(80)) + mdia)
+        mvhd = full_box('mvhd', struct.pack('>IIII', 0, 0, 1000, round(duration * 1000)) + bytes(80))
+        return box('moov', mvhd + trak)
+
+    ftyp = box('ftyp', b'isom\0\0\x02\0isomiso2avc1mp41')
+    if moov_first:
+        moov_size = len(moov(0))
+        return ftyp + moov(len(ftyp) + moov_size + 8) + box('mdat', media)
+    return ftyp + box('mdat', media) + moov(len(ftyp) + 8)
+
+
+def write_mp4(path, **options) -> None:
+    """Write build_mp4(**options) to path."""
+    with open(path, 'wb') as f:
+        f.write(build_mp4(**options))
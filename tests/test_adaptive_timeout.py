@@ -0,0 +1,31 @@
+"""Tests for adaptive per-file timeouts."""
+
+from adaptive_timeout import AdaptiveTimeout
+
+
+def test_unknown_speed_uses_fixed_timeout():
+    policy = AdaptiveTimeout(3.0, 30, 3600).policy()
+    assert AdaptiveTimeout.compute(600.0, fallback=300, **policy) == 300
+
+
+def test_unknown_duration_uses_fixed_timeout():
+    estimator = AdaptiveTimeout(3.0, 30, 3600)
+    estimator.record({'media_seconds': 100.0, 'elapsed': 10.0})
+    assert AdaptiveTimeout.compute(None, fallback=300, **estimator.policy()) == 300
+
+
+def test_fallback_is_clamped():
+    assert AdaptiveTimeout.compute(None, None, 3.0, 30, 3600, fallback=5) == 30
+    assert AdaptiveTimeout.compute(None, None, 3.0, 30, 600, fallback=900) == 600
+
+
+def test_measured_speed_sizes_the_timeout():
+    estimator = AdaptiveTimeout(3.0, 30, 3600)
+    estimator.record({'media_seconds': 100.0, 'elapsed': 10.0})
+    assert AdaptiveTimeout.compute(600.0, fallback=300, **estimator.policy()) == 180
+
+
+def test_timed_out_files_do_not_count_towards_speed():
+    estimator = AdaptiveTimeout()
+    estimator.record({'media_seconds': 100.0, 'elapsed': 300.0, 'timed_out': True})
+    assert estimator.decode_speed() is None
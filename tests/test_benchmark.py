@@ -0,0 +1,52 @@
+"""Tests for the benchmark's corpus damage and figures."""
+
+import random
+from pathlib import Path
+
+import pytest
+
+from benchmark import SAMPLE_DURATION, SAMPLES, Benchmark, CorpusBuilder
+from mp4_samples import build_mp4
+from mp4_structure import Mp4StructureChecker
+
+
+def _entry(name, duration, damage=None):
+    return {'name': name, 'path': f'/corpus/{name}.mp4', 'size': 1000, 'duration': duration,
+            'expected_valid': damage is None, 'damage': damage}
+
+
+CORPUS = [_entry('short', 20.0), _entry('long', 300.0), _entry('long_truncated', 300.0, 'truncated')]
+RESULTS = {
+    Path('/corpus/short.mp4'): (True, None, 1000, {}),
+    Path('/corpus/long.mp4'): (True, None, 1000, {}),
+    Path('/corpus/long_truncated.mp4'): (False, "moov atom not found", 1000, {}),
+}
+
+
+@pytest.mark.parametrize('mode, media_seconds', [
+    ('container', 0.0),
+    ('sampled', 20.0 + 2 * SAMPLES * SAMPLE_DURATION),
+    ('full', 620.0),
+])
+def test_media_seconds_count_the_decoded_span(mode, media_seconds):
+    run = Benchmark._measure(CORPUS, RESULTS, mode, 1, 1.0)
+    assert run['media_seconds_per_second'] == media_seconds
+    assert run['false_positive_rate'] == 0.0
+    assert run['detection_rate'] == 1.0
+
+
+def test_failed_clean_file_is_flagged():
+    results = {**RESULTS, Path('/corpus/short.mp4'): (False, "Decoder error", 1000, {})}
+    run = Benchmark._measure(CORPUS, results, 'full', 1, 1.0)
+    assert run['false_positives'] == ['short']
+    assert not Benchmark.check_clean_files([run])
+
+
+@pytest.mark.parametrize('kind', ['truncated', 'no_moov'])
+def test_structural_damage_fails_the_container_check(tmp_path, kind):
+    clean = tmp_path / 'clean.mp4'
+    clean.write_bytes(build_mp4())
+    damaged = tmp_path / f'{kind}.mp4'
+    damaged.write_bytes(CorpusBuilder.damage(build_mp4(), kind, random.Random(0)))
+    assert Mp4StructureChecker.check(clean) is None
+    assert Mp4StructureChecker.check(damaged) is not None
@@ -0,0 +1,58 @@
+"""Tests for the checkpoint journal and how an interrupt closes it."""
+
+import signal
+from pathlib import Path
+
+import pytest
+
+from checkpoint_manager import CheckpointJournal, CheckpointManager
+from signal_handlers import InterruptHandler
+
+RESULT = (True, None, 10, {})
+
+
+def _journal_with(checkpoint_file, count, **options):
+    journal = CheckpointJournal(checkpoint_file, **options)
+    for index in range(count):
+        journal.append(Path(f'/library/{index}.mp4'), RESULT)
+    journal.close()
+
+
+def test_resume_counts_existing_journal_records(tmp_path):
+    checkpoint_file = tmp_path / 'checkpoint.json'
+    _journal_with(checkpoint_file, 3, min_compact_records=5)
+
+    journal = CheckpointJournal(checkpoint_file, resume=True, min_compact_records=5)
+    assert journal.journal_records == 3
+    journal.append(Path('/library/3.mp4'), RESULT)
+    journal.append(Path('/library/4.mp4'), RESULT)
+    journal.close()
+    assert journal.journal_records == 0
+    assert len(CheckpointManager.load_checkpoint(checkpoint_file)) == 5
+
+
+def test_resume_after_torn_line_keeps_new_records(tmp_path):
+    checkpoint_file = tmp_path / 'checkpoint.json'
+    _journal_with(checkpoint_file, 2)
+    with open(CheckpointManager.journal_path(checkpoint_file), 'a') as f:
+        f.write('["/library/torn.mp4", tr')
+
+    journal = CheckpointJournal(checkpoint_file, resume=True)
+    assert journal.journal_records == 2
+    journal.append(Path('/library/2.mp4'), RESULT)
+    journal.close()
+    expected = {Path(f'/library/{index}.mp4') for index in range(3)}
+    assert set(CheckpointManager.load_checkpoint(checkpoint_file)) == expected
+
+
+def test_interrupt_leaves_journal_open_for_the_run(tmp_path):
+    journal = CheckpointJournal(tmp_path / 'checkpoint.json')
+    handler = InterruptHandler()
+    handler.checkpoint = journal
+    with pytest.raises(KeyboardInterrupt):
+        handler._signal_handler(signal.SIGINT, None)
+    assert not journal._journal.closed
+    journal.close()
+    with pytest.raises(SystemExit) as exited:
+        handler.exit_interrupted()
+    assert exited.value.code == 130
@@ -0,0 +1,19 @@
+"""Tests for per-device queues."""
+
+from pathlib import Path
+
+from cli import CLI
+from device_scheduler import DeviceScheduler
+from file_scanner import ScannedFile
+
+
+def test_prefix_limit_applies_to_relative_paths(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    prefix, limit = CLI._parse_device_limit('lib=1')
+    scheduler = DeviceScheduler(prefix_limits={prefix: limit})
+    for name in ('a.mp4', 'b.mp4'):
+        scheduler.add(ScannedFile(Path('lib/Course') / name, 100, 0, 1, 1))
+
+    assert scheduler.pop() is not None
+    assert scheduler.pop() is None  # The prefix's single slot is taken
+    assert scheduler.get_stats()['per_device'][0]['device'] == str(tmp_path / 'lib')
@@ -0,0 +1,52 @@
+"""Tests for classifying error text into coded records."""
+
+from pathlib import Path
+
+from error_taxonomy import ErrorTaxonomy
+from ffmpeg_process import MAX_STDERR_CHARS, STDERR_TRUNCATED, _StderrCollector
+from report_stats import ErrorClassifier, ResultsAggregator
+
+MB_ERRORS = "\n".join([
+    "[h264 @ 0x55d0c8] error while decoding MB 13 20, bytestream 6060",
+    "[h264 @ 0x55d0c8] error while decoding MB 41 7, bytestream 7882",
+    "[h264 @ 0x55d0c8] error while decoding MB 2 33, bytestream 10766",
+])
+
+
+def test_bytestream_position_is_not_a_stream():
+    records = ErrorTaxonomy.classify(MB_ERRORS)
+    assert len(records) == 1
+    assert records[0]['code'] == 'macroblock_error'
+    assert records[0]['stream'] is None
+    assert records[0]['count'] == 3
+
+
+def test_stream_specifiers_are_recognised():
+    records = ErrorTaxonomy.classify(
+        "Error while decoding stream #0:1: Invalid data found when processing input\n"
+        "Application provided invalid, non monotonically increasing dts to muxer in stream 0: 10 >= 5"
+    )
+    streams = {record['code']: record['stream'] for record in records}
+    assert streams == {'invalid_data': 1, 'non_monotonic_dts': 0}
+
+
+def test_codes_count_once_per_file():
+    aggregator = ResultsAggregator(Path('/library'))
+    error = "Error while decoding stream #0:0: error\nError while decoding stream #0:1: error\n" + MB_ERRORS
+    for index in range(2):
+        aggregator.add(Path(f'/library/course/{index}.mp4'), (False, error, 10, {}))
+    codes = aggregator.get_error_codes()
+    assert codes['decode_error']['files'] == 2
+    assert codes['macroblock_error']['files'] == 2
+
+
+def test_stderr_cap_is_not_a_truncated_file():
+    collector = _StderrCollector(None)
+    line = b"[mp4 @ 0x55] Application provided invalid, non monotonically increasing dts to muxer in stream 0: 10 >= 5\n"
+    for _ in range(MAX_STDERR_CHARS // len(line) + 10):
+        collector.feed(line)
+    assert STDERR_TRUNCATED in collector.text()
+
+    records = ErrorTaxonomy.classify(collector.text())
+    assert {record['code'] for record in records} == {'non_monotonic_dts', 'stderr_truncated'}
+    assert ErrorClassifier.category(records) == 'dts_warnings'
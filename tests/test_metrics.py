@@ -0,0 +1,41 @@
+"""Tests for per-file resource metrics and their export."""
+
+import os
+import sys
+from pathlib import Path
+
+from ffmpeg_process import FfmpegProcess
+from metrics import MetricsCollector
+
+ROOT = Path('/library')
+
+
+def _details(**metrics):
+    return {'elapsed': 2.0, 'cpu_user': 1.5, 'cpu_system': 0.5, 'max_rss': 1 << 20, **metrics}
+
+
+def test_media_seconds_omitted_when_never_probed(tmp_path):
+    prom_file = tmp_path / 'verify.prom'
+    collector = MetricsCollector(ROOT, prom_file)
+    collector.add(ROOT / 'course/a.mp4', (True, None, 1000, _details()))
+    collector.close()
+    assert 'media_seconds' not in collector.get_stats()
+    assert 'media_seconds_total' not in prom_file.read_text()
+
+
+def test_media_seconds_totals_probed_files(tmp_path):
+    prom_file = tmp_path / 'verify.prom'
+    collector = MetricsCollector(ROOT, prom_file)
+    collector.add(ROOT / 'course/a.mp4', (True, None, 1000, _details(media_seconds=50.0)))
+    collector.add(ROOT / 'course/b.mp4', (True, None, 1000, _details()))
+    collector.close()
+    assert collector.get_stats()['media_seconds'] == 50.0
+    assert 'video_verify_media_seconds_total 50.000' in prom_file.read_text()
+
+
+def test_run_without_wait4_skips_usage(monkeypatch):
+    monkeypatch.delattr(os, 'wait4')
+    usage = {}
+    completed = FfmpegProcess.run([sys.executable, '-c', 'import sys; sys.exit(3)'], 30, usage=usage)
+    assert completed.returncode == 3
+    assert usage == {}
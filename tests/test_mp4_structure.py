@@ -0,0 +1,56 @@
+"""Tests for the MP4 box structure pre-check."""
+
+import pytest
+
+from mp4_samples import build_mp4, write_mp4
+from mp4_structure import Mp4StructureChecker
+
+
+@pytest.mark.parametrize('options', [
+    {},
+    {'constant_size': True},
+    {'co64': True},
+    {'moov_first': False},
+    {'chunk_samples': (1,)},
+])
+def test_known_good_file_passes(tmp_path, options):
+    video_path = tmp_path / 'good.mp4'
+    write_mp4(video_path, **options)
+    assert Mp4StructureChecker.check(video_path) is None
+
+
+def test_truncated_file_fails(tmp_path):
+    video_path = tmp_path / 'truncated.mp4'
+    video_path.write_bytes(build_mp4()[:-50])
+    error = Mp4StructureChecker.check(video_path)
+    assert error.startswith('Container structure error') and 'truncated' in error
+
+
+def test_missing_moov_fails(tmp_path):
+    video_path = tmp_path / 'no_moov.mp4'
+    data = build_mp4(moov_first=False)
+    video_path.write_bytes(data[:data.index(b'moov') - 4])
+    assert 'moov atom not found' in Mp4StructureChecker.check(video_path)
+
+
+def test_sample_to_chunk_beyond_sample_sizes_fails(tmp_path):
+    video_path = tmp_path / 'stsc.mp4'
+    write_mp4(video_path, stsc_entries=[(1, 9, 1)])
+    assert 'sample-to-chunk table references' in Mp4StructureChecker.check(video_path)
+
+
+def test_implausible_constant_sample_count_is_a_structure_error(tmp_path):
+    video_path = tmp_path / 'stsz.mp4'
+    write_mp4(video_path, constant_size=True, stsz_count=0xFFFFFFF0)
+    error = Mp4StructureChecker.check(video_path)
+    assert error.startswith('Container structure error') and 'sample size table' in error
+
+
+def test_sample_size_table_overflowing_its_box_fails(tmp_path):
+    video_path = tmp_path / 'stsz_table.mp4'
+    write_mp4(video_path, stsz_count=0xFFFFFFF0)
+    assert 'overflows its box' in Mp4StructureChecker.check(video_path)
+
+
+def test_unreadable_file_is_reported(tmp_path):
+    assert Mp4StructureChecker.check(tmp_path).startswith('Cannot read file')
@@ -0,0 +1,42 @@
+"""Tests for merging result files."""
+
+from pathlib import Path
+
+from json_report_generator import JsonReportGenerator
+from report_stats import ResultsAggregator
+from result_merger import OLD, ResultMerger
+from result_store import ResultStore
+
+
+def _report(tmp_path, name, valid, corrupted):
+    root = tmp_path / 'library'
+    results = ResultStore()
+    for index in range(valid):
+        results[root / f"{name}-ok{index}.mp4"] = (True, None, 100, {})
+    for index in range(corrupted):
+        results[root / f"{name}-bad{index}.mp4"] = (False, "moov atom not found", 10, {})
+    output_file = tmp_path / f"{name}.json"
+    JsonReportGenerator.generate_json_report(results, root, output_file)
+    return output_file
+
+
+def _merge(*report_files):
+    merger = ResultMerger()
+    for report_file in report_files:
+        merger.add_file(report_file)
+    results = ResultStore.from_items(merger.iter_results())
+    aggregator = ResultsAggregator.from_results(results, Path('/'))
+    aggregator.add_unlisted_valid(*merger.unlisted_valid[OLD])
+    merger.close()
+    return aggregator
+
+
+def test_merged_reports_keep_their_totals(tmp_path):
+    aggregator = _merge(_report(tmp_path, 'shard1', 20, 5))
+    assert aggregator.get_stats() == {'total': 25, 'corrupted': 5, 'valid': 20}
+    assert aggregator.total_size == 20 * 100 + 5 * 10
+
+
+def test_shard_reports_are_summed(tmp_path):
+    aggregator = _merge(_report(tmp_path, 'shard1', 7, 2), _report(tmp_path, 'shard2', 4, 1))
+    assert aggregator.get_stats() == {'total': 14, 'corrupted': 3, 'valid': 11}
@@ -0,0 +1,84 @@
+"""Tests for the compact results mapping."""
+
+from pathlib import Path
+
+from result_store import INITIAL_SLOTS, ResultStore
+
+
+def _result(index, is_valid=True):
+    return (is_valid, None if is_valid else f"error {index}", index, {'elapsed': 1.0})
+
+
+def test_mapping_round_trip():
+    store = ResultStore()
+    store[Path('/a/x.mp4')] = _result(1)
+    store[Path('/a/y.mp4')] = (False, "moov atom not found", 2, {'errors': [{'code': 'moov_missing'}]})
+    assert len(store) == 2
+    assert store[Path('/a/x.mp4')] == _result(1)
+    assert list(store.failed_paths()) == [Path('/a/y.mp4')]
+    assert list(store.failed_paths(['moov_missing'])) == [Path('/a/y.mp4')]
+    store.close()
+
+
+def test_insert_delete_churn_does_not_fill_the_index():
+    store = ResultStore()
+    for index in range(INITIAL_SLOTS * 8):
+        video_path = Path(f'/library/course{index % 13}/file{index}.mp4')
+        store[video_path] = _result(index)
+        del store[video_path]
+    assert len(store) == 0
+    assert Path('/library/course0/file0.mp4') not in store
+    assert len(store._slots) == INITIAL_SLOTS
+    store.close()
+
+
+def test_compaction_keeps_live_rows():
+    store = ResultStore()
+    kept = {}
+    for index in range(INITIAL_SLOTS * 3):
+        video_path = Path(f'/library/c{index % 7}/file{index}.mp4')
+        store[video_path] = _result(index, is_valid=index % 5 != 0)
+        if index % 3:
+            del store[video_path]
+        else:
+            kept[video_path] = _result(index, is_valid=index % 5 != 0)
+
+    assert len(store) == len(kept)
+    assert dict(store.items()) == kept
+    assert list(store) == list(kept)
+    assert set(store.failed_paths()) == {path for path, result in kept.items() if not result[0]}
+    assert store.total_size() == sum(result[2] for result in kept.values())
+    store.close()
+
+
+def test_deleted_path_can_be_stored_again():
+    store = ResultStore()
+    video_path = Path('/a/x.mp4')
+    store[video_path] = _result(1)
+    del store[video_path]
+    store[video_path] = _result(2, is_valid=False)
+    assert store[video_path] == _result(2, is_valid=False)
+    assert len(store) == 1
+    store.close()
+
+
+def test_memory_per_file_is_columns_index_and_name():
+    store = ResultStore()
+    count = INITIAL_SLOTS * 4
+    for index in range(count):
+        store[Path(f'/library/course{index % 10}/lesson{index:05d}.mp4')] = _result(index, is_valid=False)
+    names = len('lesson00000.mp4') * count
+    directories = sum(len(f'/library/course{index}') for index in range(10))
+    per_file = (store.memory_bytes() - names - directories) / count
+    assert 43 + 12 <= per_file <= 43 + 24
+    store.close()
+
+
+def test_spill_file_is_created_on_first_write_and_closed():
+    store = ResultStore()
+    assert store._spill is None
+    store[Path('/a/x.mp4')] = _result(1, is_valid=False)
+    spill = store._spill
+    assert store[Path('/a/x.mp4')] == _result(1, is_valid=False)
+    store.close()
+    assert spill.closed
@@ -0,0 +1,50 @@
+"""Tests for in-run retries of timed-out files."""
+
+import asyncio
+
+import pytest
+
+from main import retry_ladder_error
+from retry_policy import RetryPolicy
+from verify_api import iter_verify
+from video_verifier import VideoVerifier
+
+
+def test_ladder_must_exceed_base_timeout():
+    assert RetryPolicy.check_timeouts([900, 2700], 300) is None
+    assert RetryPolicy.check_timeouts([300, 900], 300) is not None
+    assert RetryPolicy.check_timeouts([120], 300) is not None
+    assert RetryPolicy.check_timeouts([900, 600], 300) is not None
+
+
+def test_adaptive_ladder_must_exceed_ceiling():
+    paths = {'retry_timeouts': [900, 2700], 'timeout': 300, 'adaptive_timeout': False, 'timeout_ceiling': 3600}
+    assert retry_ladder_error(paths) is None
+    assert retry_ladder_error({**paths, 'adaptive_timeout': True}) is not None
+    assert retry_ladder_error({**paths, 'adaptive_timeout': True, 'timeout_ceiling': 600}) is None
+
+
+def test_api_rejects_short_ladder(tmp_path):
+    with pytest.raises(ValueError):
+        next(iter_verify(tmp_path, timeout=600, retry_timeouts=[300]))
+
+
+def test_retry_cap_holds_after_scan(tmp_path, monkeypatch):
+    running = {'now': 0, 'peak': 0}
+
+    async def fake_verify(video_path, timeout=300, **options):
+        if timeout == 300:
+            return (video_path, False, "Verification timed out (>300 seconds)", 1, {'timed_out': True, 'elapsed': 0.0})
+        running['now'] += 1
+        running['peak'] = max(running['peak'], running['now'])
+        await asyncio.sleep(0.05)
+        running['now'] -= 1
+        return (video_path, True, None, 1, {'elapsed': 0.05})
+
+    monkeypatch.setattr(VideoVerifier, 'verify_video_async', staticmethod(fake_verify))
+    for index in range(8):
+        (tmp_path / f'{index}.mp4').write_bytes(b'x')
+
+    outcomes = list(iter_verify(tmp_path, jobs=4, engine='asyncio', timeout=300, retry_timeouts=[900]))
+    assert len(outcomes) == 8 and all(outcome.is_valid for outcome in outcomes)
+    assert running['peak'] == 1
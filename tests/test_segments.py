@@ -0,0 +1,67 @@
+"""Tests for decoding large files in concurrent time segments."""
+
+import asyncio
+import sys
+import time
+
+from file_scanner import FileScanner
+from mp4_samples import build_mp4
+from mp4_structure import Mp4StructureChecker
+from verification_runner import VerificationRunner
+from video_verifier import VideoVerifier
+
+SLEEPER = [sys.executable, '-c', 'import time; time.sleep(30)']
+FATAL = [sys.executable, '-c', 'import sys, time; print("moov atom not found", file=sys.stderr, flush=True); '
+                               'time.sleep(30)']
+
+
+def test_container_duration_is_read(tmp_path):
+    video_path = tmp_path / 'a.mp4'
+    video_path.write_bytes(build_mp4(duration=150.0))
+    assert Mp4StructureChecker.read_duration(video_path) == 150.0
+    (tmp_path / 'b.mp4').write_bytes(b'not an mp4')
+    assert Mp4StructureChecker.read_duration(tmp_path / 'b.mp4') is None
+
+
+def test_short_file_reserves_only_the_segments_it_uses(tmp_path):
+    video_path = tmp_path / 'a.mp4'
+    video_path.write_bytes(build_mp4(duration=150.0))
+    scanned = FileScanner.describe(video_path)
+    assert VerificationRunner._segments_for(scanned, 8, 1, 4) == 2
+    video_path.write_bytes(build_mp4())  # Duration unknown: reserve them all
+    assert VerificationRunner._segments_for(FileScanner.describe(video_path), 8, 1, 4) == 4
+
+
+def test_split_file_takes_the_free_slots(tmp_path, monkeypatch):
+    started = {}
+
+    async def fake_verify(video_path, segments=1, **options):
+        started[video_path.name] = (time.monotonic(), segments)
+        await asyncio.sleep(0.3)
+        return (video_path, True, None, 1, {'elapsed': 0.3})
+
+    monkeypatch.setattr(VideoVerifier, 'verify_video_async', staticmethod(fake_verify))
+    (tmp_path / 'a.mp4').write_bytes(b'x')
+    (tmp_path / 'b.mp4').write_bytes(bytes(1000))
+    files = [FileScanner.describe(tmp_path / name) for name in ('a.mp4', 'b.mp4')]
+
+    results = list(VerificationRunner.stream_verification(
+        files, 3, {}, engine='asyncio', split_size=500, max_segments=4
+    ))
+    assert len(results) == 2
+    assert started['b.mp4'][1] == 2  # Two of three slots were free
+    assert started['b.mp4'][0] - started['a.mp4'][0] < 0.2  # Did not wait for a.mp4 to finish
+
+
+def test_fatal_segment_stops_the_others():
+    start = time.monotonic()
+    is_valid, error = VideoVerifier._run_segments([(0.0, SLEEPER), (60.0, FATAL)], 20)
+    assert time.monotonic() - start < 5
+    assert not is_valid and error.startswith('[segment @ 60.0s]')
+
+
+def test_fatal_segment_stops_the_others_async():
+    start = time.monotonic()
+    is_valid, error = asyncio.run(VideoVerifier._run_segments_async([(0.0, SLEEPER), (60.0, FATAL)], 20))
+    assert time.monotonic() - start < 5
+    assert not is_valid and error.startswith('[segment @ 60.0s]')
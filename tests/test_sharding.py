@@ -0,0 +1,49 @@
+"""Tests for splitting a library into shards across hosts."""
+
+from pathlib import Path
+
+from file_scanner import ScannedFile
+from sharding import ShardPlanner
+
+
+def _files(root, names):
+    return [ScannedFile(root / name, 1000 * (index + 1), 0, index + 1, 1) for index, name in enumerate(names)]
+
+
+NAMES = [f"course{course}/lesson{lesson}.mp4" for course in range(10) for lesson in range(20)]
+
+
+def test_every_file_lands_in_exactly_one_shard():
+    root = Path('/library')
+    shards = ShardPlanner.assign(_files(root, NAMES), root, 4)
+    assigned = [scanned.path for shard in shards for scanned in shard]
+    assert sorted(assigned) == sorted(root / name for name in NAMES)
+    assert all(shards)
+
+
+def test_assignment_ignores_other_files():
+    root = Path('/library')
+    full = ShardPlanner.assign(_files(root, NAMES), root, 3)
+    # Another host's scan missed some files and saw a download in progress
+    partial_names = NAMES[::2] + ['course3/downloading.mp4']
+    partial = ShardPlanner.assign(_files(root, partial_names), root, 3)
+    shard_of = {scanned.path: index for index, shard in enumerate(full) for scanned in shard}
+    for index, shard in enumerate(partial):
+        for scanned in shard:
+            if scanned.path in shard_of:
+                assert shard_of[scanned.path] == index
+
+
+def test_assignment_is_independent_of_mount_point():
+    first = ShardPlanner.assign(_files(Path('/mnt/a'), NAMES), Path('/mnt/a'), 5)
+    second = ShardPlanner.assign(_files(Path('/media/b'), NAMES), Path('/media/b'), 5)
+    assert [[scanned.path.name for scanned in shard] for shard in first] == \
+        [[scanned.path.name for scanned in shard] for shard in second]
+
+
+def test_select_reports_shard_statistics():
+    root = Path('/library')
+    files = _files(root, NAMES)
+    selected, stats = ShardPlanner.select(files, root, (2, 4))
+    assert stats['files'] == len(selected) and stats['total_files'] == len(NAMES)
+    assert stats['bytes'] == sum(scanned.size for scanned in selected)
@@ -0,0 +1,98 @@
+"""Tests for the cross-run verification cache."""
+
+from file_scanner import FileScanner
+from ffmpeg_process import DEFAULT_FATAL_PATTERNS
+from result_store import ResultStore
+from verification_cache import COMMIT_EVERY, VerificationCache
+from video_verifier import VideoVerifier
+
+
+def test_mode_key_covers_abort_patterns():
+    default = VideoVerifier.describe_mode('full', 5, 10.0)
+    assert VideoVerifier.describe_mode('full', 5, 10.0, DEFAULT_FATAL_PATTERNS) == default
+    assert VideoVerifier.describe_mode('full', 5, 10.0, ()) != default
+    assert VideoVerifier.describe_mode('full', 5, 10.0, DEFAULT_FATAL_PATTERNS + ('extra',)) != default
+
+
+def test_mode_key_covers_segmented_decode():
+    whole = VideoVerifier.describe_mode('full', 5, 10.0)
+    assert VideoVerifier.describe_mode('full', 5, 10.0, None, 2_000_000_000, 4) != whole
+    assert VideoVerifier.describe_mode('full', 5, 10.0, None, 2_000_000_000, 1) == whole
+    # Only full mode decodes in segments
+    assert VideoVerifier.describe_mode('demux', 5, 10.0, None, 2_000_000_000, 4) == \
+        VideoVerifier.describe_mode('demux', 5, 10.0)
+
+
+def _store(cache_file, video_path, ffmpeg_version, mode):
+    cache = VerificationCache(cache_file, ffmpeg_version, mode)
+    results = ResultStore()
+    results[video_path] = (True, None, video_path.stat().st_size, {})
+    cache.store_results(results)
+    return cache
+
+
+def test_entry_not_reused_under_other_abort_semantics(tmp_path):
+    video_path = tmp_path / 'a.mp4'
+    video_path.write_bytes(b'data')
+    cache_file = tmp_path / 'cache.db'
+    _store(cache_file, video_path, 'ffmpeg 6', VideoVerifier.describe_mode('full', 5, 10.0, ())).close()
+
+    cache = VerificationCache(cache_file, 'ffmpeg 6', VideoVerifier.describe_mode('full', 5, 10.0))
+    assert cache.lookup(FileScanner.describe(video_path)) is None
+    cache.close()
+
+
+def test_prune_evicts_other_ffmpeg_versions(tmp_path):
+    video_path = tmp_path / 'a.mp4'
+    video_path.write_bytes(b'data')
+    cache_file = tmp_path / 'cache.db'
+    _store(cache_file, video_path, 'ffmpeg 5', 'full').close()
+
+    cache = VerificationCache(cache_file, 'ffmpeg 6', 'full')
+    assert cache.prune() == 1
+    cache.close()
+
+    cache = VerificationCache(cache_file, 'ffmpeg 5', 'full')
+    assert cache.lookup(FileScanner.describe(video_path)) is None
+    cache.close()
+
+
+def test_prune_keeps_current_unchanged_entries(tmp_path):
+    video_path = tmp_path / 'a.mp4'
+    video_path.write_bytes(b'data')
+    cache_file = tmp_path / 'cache.db'
+    _store(cache_file, video_path, 'ffmpeg 6', 'full').close()
+
+    cache = VerificationCache(cache_file, 'ffmpeg 6', 'full')
+    assert cache.prune() == 0
+    assert cache.lookup(FileScanner.describe(video_path)) is not None
+    cache.close()
+
+
+def _cached_paths(cache_file):
+    cache = VerificationCache(cache_file, 'ffmpeg 6', 'full')
+    rows = {path for path, in cache._conn.execute("SELECT path FROM results")}
+    cache.close()
+    return rows
+
+
+def test_results_are_committed_as_they_arrive(tmp_path):
+    video_paths = []
+    for index in range(COMMIT_EVERY + 1):
+        video_path = tmp_path / f'{index}.mp4'
+        video_path.write_bytes(b'data')
+        video_paths.append(video_path)
+    cache_file = tmp_path / 'cache.db'
+    cache = VerificationCache(cache_file, 'ffmpeg 6', 'full')
+
+    cache.add(tmp_path / 'slow.mp4', (False, "Verification timed out (>300 seconds)", 4, {}))
+    for video_path in video_paths[:COMMIT_EVERY - 1]:
+        cache.add(video_path, (True, None, 4, {}))
+    assert _cached_paths(cache_file) == set()
+    cache.add(video_paths[COMMIT_EVERY - 1], (True, None, 4, {}))
+    assert len(_cached_paths(cache_file)) == COMMIT_EVERY
+
+    cache.add(video_paths[COMMIT_EVERY], (False, "moov atom not found", 4, {}))
+    cache.flush()
+    assert _cached_paths(cache_file) == {str(video_path) for video_path in video_paths}
+    cache.close()
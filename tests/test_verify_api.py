@@ -0,0 +1,87 @@
+"""Tests for the embeddable verification API (container mode, so no ffmpeg is needed)."""
+
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+from mp4_samples import build_mp4, write_mp4
+from verify_api import VerificationOutcome, VerificationSession, iter_verify, iter_verify_async
+
+
+@pytest.fixture
+def library(tmp_path):
+    for index in range(3):
+        write_mp4(tmp_path / f'good{index}.mp4')
+    (tmp_path / 'truncated.mp4').write_bytes(build_mp4()[:-50])
+    return tmp_path
+
+
+def _verdicts(outcomes):
+    return {outcome.path.name: outcome.is_valid for outcome in outcomes}
+
+
+EXPECTED = {'good0.mp4': True, 'good1.mp4': True, 'good2.mp4': True, 'truncated.mp4': False}
+
+
+@pytest.mark.parametrize('kwargs, error', [
+    ({'colour': 'red'}, TypeError),
+    ({'mode': 'thorough'}, ValueError),
+    ({'engine': 'threads'}, ValueError),
+    ({'schedule': 'random'}, ValueError),
+    ({'timeout': 600, 'retry_timeouts': [300]}, ValueError),
+])
+def test_invalid_options_raise_on_call(library, kwargs, error):
+    with pytest.raises(error):
+        iter_verify(library, **kwargs)
+    with pytest.raises(error):
+        iter_verify_async(library, **kwargs)
+    with pytest.raises(error):
+        VerificationSession(**kwargs)
+
+
+def test_directory_is_verified(library):
+    outcomes = list(iter_verify(library, mode='container', jobs=2, engine='asyncio'))
+    assert _verdicts(outcomes) == EXPECTED
+    truncated = next(outcome for outcome in outcomes if not outcome.is_valid)
+    assert truncated.codes and not truncated.timed_out
+
+
+def test_leaving_the_loop_early_stops_the_run(library):
+    outcomes = iter_verify(sorted(library.iterdir()), mode='container', jobs=1, engine='asyncio')
+    assert isinstance(next(outcomes), VerificationOutcome)
+    outcomes.close()
+
+
+def test_async_iterable_of_paths(library):
+    async def paths():
+        for video_path in sorted(library.iterdir()):
+            yield video_path
+
+    async def collect():
+        return [outcome async for outcome in iter_verify_async(paths(), mode='container', engine='asyncio')]
+
+    assert _verdicts(asyncio.run(collect())) == EXPECTED
+
+
+def test_session_verifies_submitted_files(library):
+    with VerificationSession(mode='container', jobs=2, engine='asyncio') as session:
+        def feed():
+            for video_path in sorted(library.iterdir()):
+                session.submit(video_path)
+            session.close()
+
+        feeder = threading.Thread(target=feed)
+        feeder.start()
+        assert _verdicts(session) == EXPECTED
+        feeder.join()
+    with pytest.raises(ValueError):
+        session.submit(library / 'good0.mp4')
+
+
+def test_outcome_reports_timeouts():
+    outcome = VerificationOutcome(Path('/a.mp4'), False, "Verification timed out (>300 seconds)", 10,
+                                  {'timed_out': True})
+    assert outcome.timed_out
+    assert outcome.codes == ['timeout']
@@ -0,0 +1,78 @@
+"""Tests for watch mode's change detection."""
+
+import pytest
+
+import watcher
+from watcher import DirectoryWatcher, _Inotify
+
+
+class _FakeInotify:
+    """Stands in for inotify; on_read runs before each read and may drop events."""
+
+    def __init__(self, on_read):
+        self.on_read = on_read
+        self.reads = 0
+        self.overflowed = False
+        self.unwatched = []
+
+    def read_changes(self, timeout):
+        self.reads += 1
+        if self.reads > 5:
+            raise RuntimeError("change was never yielded")
+        self.on_read(self)
+        return []
+
+    def close(self):
+        pass
+
+
+def _watch(monkeypatch, root_dir, on_read):
+    monkeypatch.setattr(watcher, '_Inotify', lambda _: _FakeInotify(on_read))
+    return DirectoryWatcher(root_dir, settle_seconds=0, poll_interval=0).watch()
+
+
+def test_overflow_rescans_for_missed_changes(tmp_path, monkeypatch):
+    (tmp_path / 'old.mp4').write_bytes(b'old')
+    (tmp_path / 'same.mp4').write_bytes(b'same')
+
+    def drop_events(inotify):
+        if inotify.reads == 1:
+            (tmp_path / 'old.mp4').write_bytes(b'rewritten')
+            (tmp_path / 'new.mp4').write_bytes(b'new')
+            inotify.overflowed = True
+
+    files = _watch(monkeypatch, tmp_path, drop_events)
+    assert {next(files).path, next(files).path} == {tmp_path / 'old.mp4', tmp_path / 'new.mp4'}
+
+
+def test_unwatched_directory_is_polled(tmp_path, monkeypatch):
+    subdirectory = tmp_path / 'course'
+    subdirectory.mkdir()
+
+    def cannot_watch(inotify):
+        if inotify.reads == 1:
+            inotify.unwatched.append(subdirectory)
+            (subdirectory / 'lesson.mp4').write_bytes(b'new')
+
+    files = _watch(monkeypatch, tmp_path, cannot_watch)
+    assert next(files).path == subdirectory / 'lesson.mp4'
+
+
+def test_new_directory_that_cannot_be_watched(tmp_path, monkeypatch):
+    try:
+        inotify = _Inotify(tmp_path)
+    except OSError:
+        pytest.skip("inotify not available")
+
+    def watch_limit(directory):
+        raise OSError(28, f"cannot watch {directory}: No space left on device")
+
+    monkeypatch.setattr(inotify, '_add_tree', watch_limit)
+    subdirectory = tmp_path / 'course'
+    subdirectory.mkdir()
+    (subdirectory / 'lesson.mp4').write_bytes(b'new')
+    try:
+        assert inotify.read_changes(5.0) == [subdirectory / 'lesson.mp4']
+        assert inotify.unwatched == [subdirectory]
+    finally:
+        inotify.close()